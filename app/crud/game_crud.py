@@ -9,6 +9,11 @@ from app.models.games.live_player_model import LivePlayer
 from app.models.games.game_result_model import GameResult
 from app.models.games.live_game_model import LiveGame
 from app.models.user_model import AuthedUser, User
+from app.types import CastleRights, MoveInfo, Point
+from app.game import move_codec
+from app.game.board_cache import board_cache
+from app.game.board import Board
+from app.game.position_history import PositionHistory, is_irreversible
 from app import enums
 
 
@@ -129,3 +134,89 @@ def fetch_live_game(db: Session, token: str) -> LiveGame | None:
     """
 
     return db.execute(select(LiveGame).filter_by(token=token)).scalar()
+
+
+def load_board(game: LiveGame) -> Board:
+    """
+    Get the board of a game, without parsing its fen if it is cached
+
+    :param game: the game to load the board of
+
+    :return: a new board, safe to make moves on
+    """
+
+    board = board_cache.get_board(game.fen, curr_player=game.turn_player)
+    for player in (game.player_white, game.player_black):
+        board.castle_rights[player.color] = CastleRights(
+            player.castle_rights_short, player.castle_rights_long
+        )
+    if game.en_passant is not None:
+        y, x = divmod(game.en_passant, board.board_width)
+        board.en_passant = Point(x, y)
+    return board
+
+
+def append_move(
+    game: LiveGame,
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+) -> None:
+    """
+    Add a move to the end of the move list of a game
+
+    :param game: the game the move was played in
+    :param from_pos: the position the piece moved from
+    :param to_pos: the position the piece moved to
+    :param move_info: the move metadata
+    """
+
+    game.moves += move_codec.encode_move(from_pos, to_pos, move_info)
+
+
+def make_move(
+    game: LiveGame,
+    board: Board,
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+) -> enums.DrawReason | None:
+    """
+    Make a move on the board of a game, record it in the move list
+    and the position history, and save the new position, the turn
+    and the castling rights to be committed together
+
+    :param game: the game the move is played in
+    :param board: the board of the game before the move, from `load_board`
+    :param from_pos: the position of the piece to move
+    :param to_pos: the position to move the piece to
+    :param move_info: the move metadata
+
+    :return: why the game is drawn after the move, or None if it isn't
+    """
+
+    history = PositionHistory.from_bytes(game.position_history)
+    if not history.hashes:
+        # the starting position of the game counts towards repetitions
+        history.push(board.zobrist_hash)
+
+    irreversible = is_irreversible(board, from_pos, move_info)
+    board.make_move(from_pos, to_pos, move_info)
+    history.push(board.zobrist_hash, irreversible)
+    game.position_history = history.to_bytes()
+
+    append_move(game, from_pos, to_pos, move_info)
+    game.fen = board.to_fen()
+    game.en_passant = (
+        board.en_passant.y * board.board_width + board.en_passant.x
+        if board.en_passant
+        else None
+    )
+    for player in (game.player_white, game.player_black):
+        castle_rights = board.castle_rights[player.color]
+        player.castle_rights_short = castle_rights.short
+        player.castle_rights_long = castle_rights.long
+        if player.color == board.turn:
+            game.turn_player_id = player.player_id
+
+    return history.draw_reason()
@@ -5,6 +5,12 @@ from sqlalchemy.orm import Session
 from fastapi import status, WebSocketException, HTTPException, Depends, Path
 import redis.asyncio as aioredis
 
+from app.services.legal_moves_cache import (
+    legal_moves_cache_inst,
+    ABCLegalMovesCache,
+)
+from app.services.game_executor import game_executor_inst, GameExecutor
+from app.services.bot_service import bot_service_inst, BotService
 from app.services.ws_service.ws_server import WSServer
 from app.services.auth_service import oauth2_scheme
 from app.services.ws_service import ws_server_inst
@@ -32,9 +38,26 @@ def get_ws_server():
     return ws_server_inst
 
 
+def get_legal_moves_cache():
+    return legal_moves_cache_inst
+
+
+def get_game_executor():
+    return game_executor_inst
+
+
+def get_bot_service():
+    return bot_service_inst
+
+
 DBDep = Annotated[Session, Depends(get_db)]
 RedisDep = Annotated[aioredis.Redis, Depends(get_redis)]
 WSServerDep = Annotated[WSServer, Depends(get_ws_server)]
+LegalMovesCacheDep = Annotated[
+    ABCLegalMovesCache, Depends(get_legal_moves_cache)
+]
+GameExecutorDep = Annotated[GameExecutor, Depends(get_game_executor)]
+BotServiceDep = Annotated[BotService, Depends(get_bot_service)]
 
 ConfigDep = Annotated[Config, Depends(get_config)]
 TokensDep = Annotated[user_schema.AuthTokens, Depends(oauth2_scheme)]
@@ -21,6 +21,11 @@ class GameResult(Enum):
     DRAW = "draw"
 
 
+class DrawReason(Enum):
+    THREEFOLD_REPETITION = "threefold repetition"
+    FIFTY_MOVES = "fifty moves"
+
+
 class UserType(Enum):
     AUTHED = "authed"
     GUEST = "guest"
@@ -31,6 +36,7 @@ class NotationType(Enum):
     CASTLE = "castle"
     VERTICAL_CASTLE = "vertical_castle"
     IL_VATICANO = "il_vaticano"
+    EN_PASSANT = "en_passant"
 
 
 class PieceType(Enum):
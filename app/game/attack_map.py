@@ -0,0 +1,192 @@
+from typing import NamedTuple, Iterable
+
+from app.game.bitboard import BitBoard, iter_squares
+from app.types import PieceInfo, Point
+from app.game.pieces import PIECES, Pawn
+from app.game.board import Board
+from app import enums
+
+
+class PieceMaps(NamedTuple):
+    color: enums.Color
+    # every square the piece looks at, including the first blocker of each ray.
+    # the maps only need to be recomputed when one of these squares changes
+    sight: int
+    # the squares the piece could capture on, including defended pieces
+    attacks: int
+    # the squares the piece could move to
+    targets: int
+
+
+class AttackMap:
+    """
+    Per-color masks of the attacked squares of a board,
+    kept up to date incrementally as pieces move.
+
+    Only pieces that look at a changed square are recomputed,
+    and only when the map is queried.
+    """
+
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self._bitboard = BitBoard.from_board(board)
+        self._tables = self._bitboard.tables
+
+        self._pieces: dict[int, PieceMaps] = {}
+        self._attacked = {color: 0 for color in enums.Color}
+        self._targets = {color: 0 for color in enums.Color}
+
+        # every square starts dirty so the first query computes everything
+        self._dirty = self._bitboard.occupied
+        # the en passant square the pawn maps were computed with
+        self._en_passant = board.en_passant
+        board.add_listener(self)
+
+    def detach(self) -> None:
+        """Stop tracking the board"""
+
+        self.board.remove_listener(self)
+
+    def square_changed(self, point: Point, piece: PieceInfo | None) -> None:
+        square = self._tables.square(point)
+        if piece is None:
+            self._bitboard.remove_piece(square)
+        else:
+            self._bitboard.set_piece(square, piece)
+
+        self._dirty |= 1 << square
+
+    def _compute(self, square: int, occupied: int) -> PieceMaps | None:
+        piece = self._bitboard.piece_at(square)
+        if piece is None or piece.piece_type not in PIECES:
+            return None
+
+        piece_cls = PIECES[piece.piece_type]
+        if issubclass(piece_cls, Pawn):
+            return self._compute_pawn(square, piece, occupied)
+
+        tables = self._tables
+        sight = attacks = quiet = 0
+        for offset in piece_cls.offsets:
+            if offset.slide:
+                reach = tables.slide(square, offset.x, offset.y, occupied)
+            else:
+                reach = tables.steps[(offset.x, offset.y)][square]
+
+            sight |= reach
+            if offset.can_capture:
+                attacks |= reach
+            else:
+                quiet |= reach
+
+        own = self._bitboard.colors[piece.color]
+        targets = (attacks & ~own) | (quiet & ~occupied)
+        return PieceMaps(piece.color, sight, attacks, targets)
+
+    def _compute_pawn(
+        self,
+        square: int,
+        pawn: PieceInfo,
+        occupied: int,
+    ) -> PieceMaps:
+        """Pawns push straight and capture diagonally"""
+
+        tables = self._tables
+        attacks = tables.pawn_attacks[pawn.color][square]
+        sight = (
+            attacks
+            | tables.pawn_pushes[pawn.color][square]
+            | tables.pawn_double_pushes[pawn.color][square]
+        )
+        targets = self._bitboard.targets(square, occupied)
+        return PieceMaps(pawn.color, sight, attacks, targets)
+
+    def _sync_en_passant(self) -> None:
+        """
+        The en passant square is not a square change,
+        so the pawns that look at the old or the new square are marked dirty
+        """
+
+        en_passant = self.board.en_passant
+        if en_passant == self._en_passant:
+            return
+
+        for point in (self._en_passant, en_passant):
+            if point is not None:
+                self._dirty |= 1 << self._tables.square(point)
+
+        self._en_passant = en_passant
+        self._bitboard.en_passant = (
+            None if en_passant is None else self._tables.square(en_passant)
+        )
+
+    def _refresh(self) -> None:
+        self._sync_en_passant()
+        dirty = self._dirty
+        if not dirty:
+            return
+
+        # the pieces on the changed squares and the pieces that look at them
+        affected = set(iter_squares(dirty))
+        affected.update(
+            square
+            for square, maps in self._pieces.items()
+            if maps.sight & dirty
+        )
+
+        occupied = self._bitboard.occupied
+        for square in affected:
+            maps = self._compute(square, occupied)
+            if maps is None:
+                self._pieces.pop(square, None)
+            else:
+                self._pieces[square] = maps
+
+        attacked = {color: 0 for color in enums.Color}
+        targets = {color: 0 for color in enums.Color}
+        for maps in self._pieces.values():
+            attacked[maps.color] |= maps.attacks
+            targets[maps.color] |= maps.targets
+
+        self._attacked = attacked
+        self._targets = targets
+        self._dirty = 0
+
+    def attacked(self, color: enums.Color) -> int:
+        """Get a mask of every square attacked by a color"""
+
+        self._refresh()
+        return self._attacked[color]
+
+    def targets(self, color: enums.Color) -> int:
+        """Get a mask of every square a color could move to"""
+
+        self._refresh()
+        return self._targets[color]
+
+    def pieces(self, color: enums.Color) -> int:
+        """Get a mask of every square occupied by a color"""
+
+        return self._bitboard.colors[color]
+
+    def is_attacked(self, point: Point, by: enums.Color) -> bool:
+        return bool(self.attacked(by) >> self._tables.square(point) & 1)
+
+    def any_attacked(self, points: Iterable[Point], by: enums.Color) -> bool:
+        """
+        Check if any of the points is attacked,
+        for example the squares a king castles through
+        """
+
+        attacked = self.attacked(by)
+        return any(
+            attacked >> self._tables.square(point) & 1 for point in points
+        )
+
+    def in_check(self, color: enums.Color) -> bool:
+        """Check if any king of a color is attacked"""
+
+        kings = self._bitboard.pieces.get(
+            PieceInfo(enums.PieceType.KING, color), 0
+        )
+        return bool(kings & self.attacked(color.invert()))
@@ -0,0 +1,360 @@
+from typing import Sequence
+import re
+
+import numpy as np
+
+from app.game.bitboard import get_tables
+from app.game.move_tables import get_castles
+from app.game.pieces import PIECES, King, Pawn
+from app.schemas.config_schema import CONFIG
+from app.types import CastleRights, Point
+from app import enums
+
+# the code of each piece type in an encoded board.
+# white pieces are positive, black pieces are negative and empty squares are 0
+PIECE_CODES: dict[enums.PieceType, int] = {
+    piece_type: code for code, piece_type in enumerate(enums.PieceType, 1)
+}
+
+# invalid fen characters are mapped to a code no piece has
+_INVALID = np.iinfo(np.int8).min
+_CODE_TABLE = np.full(256, _INVALID, dtype=np.int8)
+_CODE_TABLE[ord(".")] = 0
+for _piece_type, _code in PIECE_CODES.items():
+    _CODE_TABLE[ord(_piece_type.value)] = -_code
+    _CODE_TABLE[ord(_piece_type.value.upper())] = _code
+
+_DIGITS = re.compile(r"\d+")
+
+
+def encode_fens(
+    fens: Sequence[str],
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> np.ndarray:
+    """
+    Encode positions into an `(N, board_height, board_width)` int8 array
+    with the codes of `PIECE_CODES`
+
+    :param fens: the positions to encode
+    :param board_width: the width of every board
+    :param board_height: the height of every board
+
+    :raises ValueError: a fen has the wrong size or an unknown piece
+    """
+
+    expanded: list[str] = []
+    for fen in fens:
+        ranks = fen.split("/")
+        if len(ranks) != board_height:
+            raise ValueError(
+                f"There are {len(ranks)} ranks, {board_height} necessary"
+            )
+
+        for rank in ranks:
+            squares = _DIGITS.sub(lambda match: "." * int(match[0]), rank)
+            if len(squares) != board_width:
+                raise ValueError(
+                    f"Rank {rank} has {len(squares)} squares, {board_width} necessary"
+                )
+            expanded.append(squares)
+
+    characters = np.frombuffer("".join(expanded).encode(), dtype=np.uint8)
+    boards = _CODE_TABLE[characters]
+    if (boards == _INVALID).any():
+        raise ValueError("Unknown piece in fen")
+
+    return boards.reshape(len(fens), board_height, board_width)
+
+
+def _shift(mask: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """Move every square of a stack of masks by x and y squares"""
+
+    height, width = mask.shape[1:]
+    shifted = np.zeros_like(mask)
+    if abs(dx) >= width or abs(dy) >= height:
+        return shifted
+
+    shifted[
+        :,
+        max(dy, 0) : height + min(dy, 0),
+        max(dx, 0) : width + min(dx, 0),
+    ] = mask[
+        :,
+        max(-dy, 0) : height + min(-dy, 0),
+        max(-dx, 0) : width + min(-dx, 0),
+    ]
+    return shifted
+
+
+def _castle_moves(
+    side: np.ndarray,
+    castle_rights: Sequence[CastleRights],
+) -> list[tuple[int, int, int]]:
+    """
+    Find the castling targets of every king, including the ghost squares
+    like `BitBoard.side_legal_moves`
+
+    :param side: the encoded boards, with the pieces of the side to move positive
+    :param castle_rights: the castling rights of the side to move on each board
+
+    :return: the board, origin square and target square of every castling move
+    """
+
+    height, width = side.shape[1:]
+    king = PIECE_CODES[enums.PieceType.KING]
+    rook = PIECE_CODES[enums.PieceType.ROOK]
+    castles = get_castles(King, width, height)
+
+    moves: list[tuple[int, int, int]] = []
+    for n, y, x in zip(*np.nonzero(side == king)):
+        n, y, x = int(n), int(y), int(x)
+        board = side[n]
+        origin = y * width + x
+        for castle in castles[Point(x, y)]:
+            if (
+                not castle.is_allowed(castle_rights[n])
+                or board[castle.rook.y, castle.rook.x] != rook
+                or any(board[point.y, point.x] for point in castle.between)
+            ):
+                continue
+
+            moves.extend(
+                (n, origin, point.y * width + point.x)
+                for point in (castle.king_dest, *castle.ghosts)
+            )
+
+    return moves
+
+
+def _en_passant_mask(
+    side: np.ndarray,
+    en_passant: Sequence[Point | None],
+    signs: np.ndarray,
+) -> np.ndarray:
+    """
+    Mark the en passant square of every board
+    where the pawn that just double pushed is still there
+
+    :param side: the encoded boards, with the pieces of the side to move positive
+    :param en_passant: the en passant square of each board
+    :param signs: 1 on the boards white moves on and -1 on the others
+    """
+
+    mask = np.zeros_like(side, dtype=bool)
+    pawn = PIECE_CODES[enums.PieceType.PAWN]
+    for n, point in enumerate(en_passant):
+        if point is None:
+            continue
+
+        # the pushed pawn moved away from the side to move
+        color = enums.Color.WHITE if signs[n] > 0 else enums.Color.BLACK
+        captured_y = point.y - Pawn.direction(color)
+        mask[n, point.y, point.x] = side[n, captured_y, point.x] == -pawn
+
+    return mask
+
+
+def _pawn_moves(
+    side: np.ndarray,
+    signs: np.ndarray,
+    en_passant: np.ndarray,
+) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """
+    Find the pushes and captures of every pawn.
+    Pawns move in a different direction for each color,
+    so the boards of each color are shifted separately.
+
+    :param side: the encoded boards, with the pieces of the side to move positive
+    :param signs: 1 on the boards white moves on and -1 on the others
+    :param en_passant: the en passant squares from `_en_passant_mask`
+
+    :return: the flat target and origin of every move
+    """
+
+    height, width = side.shape[1:]
+    empty = side == 0
+    captures = (side < 0) | en_passant
+
+    moves: list[np.ndarray] = []
+    origins: list[np.ndarray] = []
+
+    def add(reached: np.ndarray, step: int) -> None:
+        found = np.flatnonzero(reached)
+        if len(found):
+            moves.append(found)
+            origins.append(found - step)
+
+    for color, sign in ((enums.Color.WHITE, 1), (enums.Color.BLACK, -1)):
+        dy = Pawn.direction(color)
+        start_rank = Pawn.start_rank(color, height)
+        on_color = signs == sign
+
+        for piece_type, piece in PIECES.items():
+            if not issubclass(piece, Pawn):
+                continue
+
+            sources = (side == PIECE_CODES[piece_type]) & on_color
+            if not sources.any():
+                continue
+
+            pushes = _shift(sources, 0, dy) & empty
+            add(pushes, dy * width)
+            if piece.can_double_push:
+                started = np.zeros_like(pushes)
+                started[:, start_rank + dy] = pushes[:, start_rank + dy]
+                add(_shift(started, 0, dy) & empty, dy * 2 * width)
+
+            for dx in (-1, 1):
+                add(_shift(sources, dx, dy) & captures, dy * width + dx)
+
+    return moves, origins
+
+
+def move_arrays(
+    boards: np.ndarray,
+    colors: Sequence[enums.Color],
+    castle_rights: Sequence[CastleRights] | None = None,
+    en_passant: Sequence[Point | None] | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Generate the moves of the side to move on every board at once.
+    Sliding pieces move one square per iteration on every board together,
+    and a ray stops once it hits a piece.
+
+    :param boards: the boards encoded by `encode_fens`
+    :param colors: the side to move on each board
+    :param castle_rights: the castling rights of the side to move on each board,
+        defaults to every right
+    :param en_passant: the en passant square of each board, defaults to none
+
+    :return: the board index, origin square and target square of every move,
+        with square `(x, y)` stored as `y * board_width + x`
+    """
+
+    count, height, width = boards.shape
+    if castle_rights is None:
+        castle_rights = [CastleRights()] * count
+
+    # flip the black boards so the side to move is always positive
+    signs = np.array(
+        [1 if color == enums.Color.WHITE else -1 for color in colors],
+        dtype=np.int8,
+    ).reshape(count, 1, 1)
+    side = boards * signs
+    empty = side == 0
+    enemy = side < 0
+
+    # every move is found as an index into the flattened boards,
+    # so the origin is a fixed distance away from the target
+    size = height * width
+    moves: list[np.ndarray] = []
+    origins: list[np.ndarray] = []
+    for piece_type, piece in PIECES.items():
+        sources = side == PIECE_CODES[piece_type]
+        if issubclass(piece, Pawn) or not sources.any():
+            continue
+
+        for offset in piece.offsets:
+            step = offset.y * width + offset.x
+            heads = sources
+            distance = 0
+            while True:
+                heads = _shift(heads, offset.x, offset.y)
+                distance += 1
+
+                quiet = heads & empty
+                reached = quiet | heads & enemy if offset.can_capture else quiet
+                found = np.flatnonzero(reached)
+                if len(found):
+                    moves.append(found)
+                    origins.append(found - step * distance)
+
+                # rays only continue through empty squares
+                heads = quiet
+                if not offset.slide or not heads.any():
+                    break
+
+    en_passant_mask = (
+        np.zeros_like(empty)
+        if en_passant is None
+        else _en_passant_mask(side, en_passant, signs.ravel())
+    )
+    pawn_moves, pawn_origins = _pawn_moves(side, signs, en_passant_mask)
+    moves.extend(pawn_moves)
+    origins.extend(pawn_origins)
+
+    castles = _castle_moves(side, castle_rights)
+    if castles:
+        n, origin, target = np.array(castles, dtype=np.intp).T
+        moves.append(n * size + target)
+        origins.append(n * size + origin)
+
+    if not moves:
+        no_moves = np.zeros(0, dtype=np.intp)
+        return no_moves, no_moves, no_moves
+
+    flat_targets = np.concatenate(moves)
+    board_indexes, targets = np.divmod(flat_targets, size)
+    return (
+        board_indexes,
+        np.concatenate(origins) - board_indexes * size,
+        targets,
+    )
+
+
+def batch_legal_moves(
+    fens: Sequence[str],
+    colors: enums.Color | Sequence[enums.Color],
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+    castle_rights: Sequence[CastleRights] | None = None,
+    en_passant: Sequence[Point | None] | None = None,
+) -> list[dict[Point, list[Point]]]:
+    """
+    Get every legal move of the side to move on many positions at once
+    with NumPy, for offline jobs with too many positions to loop over.
+    The moves are the same as `bitboard.calc_legal_moves` on each position.
+
+    :param fens: the positions to generate the moves for
+    :param colors: the side to move, either for every position or for each one
+    :param board_width: the width of every board
+    :param board_height: the height of every board
+    :param castle_rights: the castling rights of the side to move on each position,
+        defaults to every right like `Board.from_fen`
+    :param en_passant: the en passant square of each position, defaults to none
+
+    :return: for each position, a dictionary of each piece position
+        and the positions it can move to
+    """
+
+    if isinstance(colors, enums.Color):
+        colors = [colors] * len(fens)
+
+    boards = encode_fens(fens, board_width, board_height)
+    board_indexes, origins, targets = move_arrays(
+        boards, colors, castle_rights, en_passant
+    )
+
+    # sort by board, piece and target so the moves come out
+    # in the same order as the bitboard generator
+    order = np.lexsort((targets, origins, board_indexes))
+    points = get_tables(board_width, board_height).points
+
+    legal_moves: list[dict[Point, list[Point]]] = [{} for _ in fens]
+    piece_key: tuple[int, int] | None = None
+    piece_targets: list[Point] = []
+    for n, origin, target in zip(
+        board_indexes[order].tolist(),
+        origins[order].tolist(),
+        targets[order].tolist(),
+    ):
+        if (n, origin) != piece_key:
+            piece_key = (n, origin)
+            piece_targets = legal_moves[n][points[origin]] = []
+        elif piece_targets[-1] is points[target]:
+            # castling can reach a square the king can also step to
+            continue
+        piece_targets.append(points[target])
+
+    return legal_moves
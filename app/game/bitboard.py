@@ -0,0 +1,469 @@
+from typing import Iterator, Self
+from functools import cache
+
+from app.models.games.live_player_model import LivePlayer
+from app.game.move_tables import CastleMove, get_castles
+from app.types import CastleRights, PieceInfo, Point
+from app.game.pieces import (
+    CAPTURE_MOVE,
+    QUIET_MOVE,
+    PieceMoves,
+    PIECES,
+    King,
+    Pawn,
+)
+from app.schemas.config_schema import CONFIG
+from app.game.board_cache import board_cache
+from app.game.board import Board
+from app import enums
+
+
+class BitTables:
+    """
+    Masks that only depend on the size of the board.
+    Square `(x, y)` is stored in bit `y * board_width + x`.
+    """
+
+    def __init__(self, board_width: int, board_height: int) -> None:
+        self.board_width = board_width
+        self.board_height = board_height
+        self.board_mask = (1 << board_width * board_height) - 1
+        self.points = [
+            Point(x, y) for y in range(board_height) for x in range(board_width)
+        ]
+
+        files = [
+            sum(1 << y * board_width + x for y in range(board_height))
+            for x in range(board_width)
+        ]
+        # the bits that wrapped around to the other side of the board
+        # after shifting by x squares to the right / left
+        self._wrap_right = [sum(files[:dx]) for dx in range(board_width)]
+        self._wrap_left = [
+            sum(files[board_width - dx :]) for dx in range(board_width)
+        ]
+
+        # the square a piece could step to and the squares it could slide to
+        # from every square in every direction, ignoring blockers
+        self.steps: dict[tuple[int, int], list[int]] = {}
+        self.rays: dict[tuple[int, int], list[int]] = {}
+        squares = range(board_width * board_height)
+        for piece in PIECES.values():
+            for offset in piece.offsets:
+                direction = (offset.x, offset.y)
+                if direction in self.rays:
+                    continue
+
+                self.steps[direction] = [
+                    self.shift(1 << square, *direction) for square in squares
+                ]
+                self.rays[direction] = [
+                    self._build_ray(1 << square, *direction)
+                    for square in squares
+                ]
+
+        # the single pushes, double pushes and captures of the pawns
+        # of each color from every square
+        self.pawn_pushes: dict[enums.Color, list[int]] = {}
+        self.pawn_double_pushes: dict[enums.Color, list[int]] = {}
+        self.pawn_attacks: dict[enums.Color, list[int]] = {}
+        self.last_ranks: dict[enums.Color, int] = {}
+        for color in enums.Color:
+            dy = Pawn.direction(color)
+            start_rank = Pawn.start_rank(color, board_height)
+            self.pawn_pushes[color] = [
+                self.shift(1 << square, 0, dy) for square in squares
+            ]
+            self.pawn_double_pushes[color] = [
+                (
+                    self.shift(1 << square, 0, dy * 2)
+                    if square // board_width == start_rank
+                    else 0
+                )
+                for square in squares
+            ]
+            self.pawn_attacks[color] = [
+                self.shift(1 << square, -1, dy) | self.shift(1 << square, 1, dy)
+                for square in squares
+            ]
+            last_rank = Pawn.last_rank(color, board_height)
+            self.last_ranks[color] = sum(
+                1 << last_rank * board_width + x for x in range(board_width)
+            )
+
+    def shift(self, bits: int, dx: int, dy: int) -> int:
+        """Move every bit of a mask by x and y squares"""
+
+        amount = dy * self.board_width + dx
+        bits = bits << amount if amount >= 0 else bits >> -amount
+
+        if dx > 0:
+            bits &= ~self._wrap_right[dx]
+        elif dx < 0:
+            bits &= ~self._wrap_left[-dx]
+        return bits & self.board_mask
+
+    def _build_ray(self, bit: int, dx: int, dy: int) -> int:
+        ray = 0
+        while bit := self.shift(bit, dx, dy):
+            ray |= bit
+        return ray
+
+    def slide(self, square: int, dx: int, dy: int, occupied: int) -> int:
+        """
+        Get the squares a piece can slide to in a direction,
+        including the first blocker
+
+        :param square: the square the piece is on
+        :param dx: the x direction to slide in
+        :param dy: the y direction to slide in
+        :param occupied: a mask of every piece on the board
+        """
+
+        rays = self.rays[(dx, dy)]
+        ray = rays[square]
+        blockers = ray & occupied
+        if not blockers:
+            return ray
+
+        # the closest blocker is the lowest bit when sliding towards
+        # higher squares and the highest bit otherwise
+        if dy * self.board_width + dx > 0:
+            blocker = (blockers & -blockers).bit_length() - 1
+        else:
+            blocker = blockers.bit_length() - 1
+        return ray ^ rays[blocker]
+
+    def square(self, point: Point) -> int:
+        return point.y * self.board_width + point.x
+
+    def point(self, square: int) -> Point:
+        return self.points[square]
+
+
+def iter_squares(bits: int) -> Iterator[int]:
+    """Iterate over the squares of the set bits of a mask, lowest first"""
+
+    while bits:
+        bit = bits & -bits
+        yield bit.bit_length() - 1
+        bits ^= bit
+
+
+@cache
+def get_tables(board_width: int, board_height: int) -> BitTables:
+    return BitTables(board_width, board_height)
+
+
+class BitBoard:
+    """
+    A board that stores one occupancy mask per piece type and color.
+    Moves for a whole side are generated with shifts and masks
+    and give the same results as the `PIECES` move generators.
+    """
+
+    def __init__(
+        self,
+        board_width: int = CONFIG.board_width,
+        board_height: int = CONFIG.board_height,
+        curr_player: LivePlayer | None = None,
+    ) -> None:
+        self.board_width = board_width
+        self.board_height = board_height
+        self.tables = get_tables(board_width, board_height)
+
+        self.pieces: dict[PieceInfo, int] = {}
+        self.colors: dict[enums.Color, int] = {
+            color: 0 for color in enums.Color
+        }
+        self._mailbox: list[PieceInfo | None] = [None] * (
+            board_width * board_height
+        )
+
+        self.castle_rights = {color: CastleRights() for color in enums.Color}
+        if curr_player:
+            self.castle_rights[curr_player.color] = CastleRights(
+                curr_player.castle_rights_short,
+                curr_player.castle_rights_long,
+            )
+
+        # the square a pawn passed over with a double push on the last move
+        self.en_passant: int | None = None
+
+    @classmethod
+    def from_board(cls, board: Board) -> Self:
+        bitboard = cls(board.board_width, board.board_height)
+        bitboard.castle_rights = board.castle_rights.copy()
+        if board.en_passant is not None:
+            bitboard.en_passant = bitboard.tables.square(board.en_passant)
+
+        for point, piece in board.items():
+            bitboard.set_piece(bitboard.tables.square(point), piece)
+        return bitboard
+
+    @classmethod
+    def from_fen(
+        cls,
+        fen: str,
+        board_width: int = CONFIG.board_width,
+        board_height: int = CONFIG.board_height,
+        curr_player: LivePlayer | None = None,
+    ) -> Self:
+        return cls.from_board(
+            board_cache.get_board(fen, board_width, board_height, curr_player)
+        )
+
+    @property
+    def occupied(self) -> int:
+        return self.colors[enums.Color.WHITE] | self.colors[enums.Color.BLACK]
+
+    def piece_at(self, square: int) -> PieceInfo | None:
+        return self._mailbox[square]
+
+    def set_piece(self, square: int, piece: PieceInfo) -> None:
+        self.remove_piece(square)
+
+        bit = 1 << square
+        self.pieces[piece] = self.pieces.get(piece, 0) | bit
+        self.colors[piece.color] |= bit
+        self._mailbox[square] = piece
+
+    def remove_piece(self, square: int) -> None:
+        piece = self._mailbox[square]
+        if piece is None:
+            return
+
+        bit = 1 << square
+        self.pieces[piece] &= ~bit
+        self.colors[piece.color] &= ~bit
+        self._mailbox[square] = None
+
+    def targets(
+        self,
+        square: int,
+        occupied: int | None = None,
+    ) -> int:
+        """
+        Get a mask of the squares a piece can move to, not including castling
+
+        :param square: the square of the piece
+        :param occupied: a precomputed occupancy mask, to reuse across pieces
+        """
+
+        piece = self._mailbox[square]
+        if piece is None or piece.piece_type not in PIECES:
+            return 0
+        if occupied is None:
+            occupied = self.occupied
+
+        piece_cls = PIECES[piece.piece_type]
+        if issubclass(piece_cls, Pawn):
+            return self._pawn_targets(square, piece, piece_cls, occupied)
+
+        own = self.colors[piece.color]
+        steps = self.tables.steps
+        targets = 0
+        for offset in piece_cls.offsets:
+            if offset.slide:
+                reach = self.tables.slide(square, offset.x, offset.y, occupied)
+            else:
+                reach = steps[(offset.x, offset.y)][square]
+
+            targets |= reach & ~(own if offset.can_capture else occupied)
+
+        return targets
+
+    def _pawn_targets(
+        self,
+        square: int,
+        pawn: PieceInfo,
+        pawn_cls: type[Pawn],
+        occupied: int,
+    ) -> int:
+        tables = self.tables
+        targets = tables.pawn_pushes[pawn.color][square] & ~occupied
+        if targets and pawn_cls.can_double_push:
+            targets |= tables.pawn_double_pushes[pawn.color][square] & ~occupied
+
+        attacks = tables.pawn_attacks[pawn.color][square]
+        targets |= attacks & self.colors[pawn.color.invert()]
+
+        en_passant = self.en_passant_capture(square, pawn)
+        if en_passant is not None and attacks >> en_passant & 1:
+            targets |= 1 << en_passant
+        return targets
+
+    def en_passant_capture(self, square: int, pawn: PieceInfo) -> int | None:
+        """
+        Get the en passant square if the pawn is next to the pawn
+        that just double pushed
+
+        :param square: the square of the capturing pawn
+        :param pawn: the capturing pawn
+        """
+
+        if self.en_passant is None:
+            return None
+
+        # the pushed pawn is on the rank of the capturing pawn
+        width = self.board_width
+        captured = self.en_passant % width + square // width * width
+        victim = self._mailbox[captured]
+        if (
+            victim is None
+            or victim.piece_type != enums.PieceType.PAWN
+            or victim.color == pawn.color
+        ):
+            return None
+        return self.en_passant
+
+    def castles(
+        self,
+        square: int,
+        occupied: int | None = None,
+    ) -> list[CastleMove]:
+        """
+        Find the castling moves of a king
+
+        :param square: the square of the king
+        :param occupied: a precomputed occupancy mask, to reuse across pieces
+        """
+
+        king = self._mailbox[square]
+        if king is None:
+            return []
+        if occupied is None:
+            occupied = self.occupied
+
+        castles = get_castles(King, self.board_width, self.board_height)
+        rook = PieceInfo(enums.PieceType.ROOK, king.color)
+        castle_rights = self.castle_rights[king.color]
+        return [
+            castle
+            for castle in castles[self.tables.point(square)]
+            if castle.is_allowed(castle_rights)
+            and not castle.between_mask & occupied
+            and self._mailbox[self.tables.square(castle.rook)] == rook
+        ]
+
+    def side_targets(self, color: enums.Color) -> dict[int, int]:
+        """
+        Get the move targets of every piece of a color in one pass
+
+        :param color: the color to generate the moves for
+
+        :return: a dictionary of each piece square and a mask of its targets
+        """
+
+        occupied = self.occupied
+        return {
+            square: self.targets(square, occupied)
+            for square in iter_squares(self.colors[color])
+        }
+
+    def side_legal_moves(self, color: enums.Color) -> dict[Point, list[Point]]:
+        """
+        Get the legal moves of every piece of a color in one pass.
+        Castling ghost squares are included as targets of the king.
+
+        :param color: the color to generate the moves for
+
+        :return: a dictionary of each piece position and the positions
+            it can move to, in the layout of `game_schema.LegalMoves`
+        """
+
+        occupied = self.occupied
+        points = self.tables.points
+        kings = self.pieces.get(PieceInfo(enums.PieceType.KING, color), 0)
+
+        legal_moves: dict[Point, list[Point]] = {}
+        for square in iter_squares(self.colors[color]):
+            targets = self.targets(square, occupied)
+            if kings >> square & 1:
+                for castle in self.castles(square, occupied):
+                    targets |= castle.ghosts_mask
+                    targets |= 1 << self.tables.square(castle.king_dest)
+
+            if targets:
+                legal_moves[points[square]] = [
+                    points[target] for target in iter_squares(targets)
+                ]
+
+        return legal_moves
+
+    def calc_legal_moves(self, position: Point) -> PieceMoves:
+        """
+        Get the legal moves of a piece in the same format as `PIECES`
+
+        :param position: the position of the piece
+        """
+
+        square = self.tables.square(position)
+        piece = self._mailbox[square]
+        if piece is None:
+            raise KeyError(position)
+
+        points = self.tables.points
+        enemy = self.colors[piece.color.invert()]
+        targets = self.targets(square)
+
+        piece_cls = PIECES[piece.piece_type]
+        if issubclass(piece_cls, Pawn):
+            return self._pawn_moves(square, piece, piece_cls, targets)
+
+        legal_moves = PieceMoves()
+        for target in iter_squares(targets):
+            legal_moves.moves[points[target]] = (
+                CAPTURE_MOVE if enemy >> target & 1 else QUIET_MOVE
+            )
+
+        if piece.piece_type != enums.PieceType.KING:
+            return legal_moves
+
+        for castle in self.castles(square):
+            legal_moves.merge_moves(King.castle(castle))
+
+        return legal_moves
+
+    def _pawn_moves(
+        self,
+        square: int,
+        pawn: PieceInfo,
+        pawn_cls: type[Pawn],
+        targets: int,
+    ) -> PieceMoves:
+        points = self.tables.points
+        enemy = self.colors[pawn.color.invert()]
+        last_rank = self.tables.last_ranks[pawn.color]
+
+        legal_moves = PieceMoves()
+        for target in iter_squares(targets):
+            if not enemy >> target & 1 and target == self.en_passant:
+                captured = target % self.board_width + (
+                    square // self.board_width * self.board_width
+                )
+                metadata = pawn_cls.en_passant_move(points[captured])
+            else:
+                metadata = pawn_cls.move_info(
+                    bool(enemy >> target & 1), bool(last_rank >> target & 1)
+                )
+            legal_moves.moves[points[target]] = metadata
+
+        return legal_moves
+
+
+def calc_legal_moves(
+    board: Board,
+    color: enums.Color,
+) -> dict[Point, list[Point]]:
+    """
+    Get every legal move of a color in one call
+
+    :param board: the board to generate the moves on
+    :param color: the color to generate the moves for
+
+    :return: a dictionary of each piece position and the positions
+        it can move to, ready to be sent as `game_schema.LegalMoves`
+    """
+
+    return BitBoard.from_board(board).side_legal_moves(color)
@@ -1,12 +1,37 @@
-from typing import Self
+from typing import NamedTuple, Iterator, Iterable, Protocol, Self
 import re
 
+from app.types import CastleRights, PieceInfo, MoveInfo, Point
 from app.models.games.live_player_model import LivePlayer
 from app.schemas.config_schema import CONFIG
-from app.types import PieceInfo, Point
+from app.game import zobrist
 from app import enums
 
 
+class UndoRecord(NamedTuple):
+    # every square the move changed and the piece that was on it before
+    squares: tuple[tuple[Point, PieceInfo | None], ...]
+    castle_rights: dict[enums.Color, CastleRights]
+    turn: enums.Color
+    en_passant: Point | None
+
+
+class SquareListener(Protocol):
+    def square_changed(self, point: Point, piece: PieceInfo | None) -> None:
+        pass
+
+
+class BoardSnapshot(NamedTuple):
+    board_width: int
+    board_height: int
+    pieces: tuple[tuple[Point, PieceInfo], ...]
+    fen_ranks: tuple[str | None, ...]
+    castle_rights: tuple[tuple[enums.Color, CastleRights], ...]
+    turn: enums.Color
+    pieces_hash: int
+    en_passant: Point | None = None
+
+
 class Board:
     def __init__(
         self,
@@ -17,13 +42,75 @@ class Board:
         self.board_width = board_width
         self.board_height = board_height
         self._board: dict[Point, PieceInfo] = {}
+        self._undo_stack: list[UndoRecord] = []
 
+        # the zobrist hash of the pieces, updated whenever a square changes.
+        # castling rights and the turn are mixed in by `zobrist_hash`
+        self._zobrist = zobrist.get_keys(board_width, board_height)
+        self._pieces_hash = 0
+
+        # the fen of each rank, None if it changed since it was last serialized
+        self._fen_ranks: list[str | None] = [str(board_width)] * board_height
+
+        # notified whenever a square changes, see `add_listener`
+        self._listeners: list[SquareListener] = []
+
+        # the board only knows the castling rights of the current player,
+        # the other player is assumed to still have them
+        self.castle_rights = {color: CastleRights() for color in enums.Color}
         if curr_player:
-            self.castle_rights_short = curr_player.castle_rights_short
-            self.castle_rights_long = curr_player.castle_rights_long
+            self.turn = curr_player.color
+            self.castle_rights[curr_player.color] = CastleRights(
+                curr_player.castle_rights_short,
+                curr_player.castle_rights_long,
+            )
         else:
-            self.castle_rights_short = True
-            self.castle_rights_long = True
+            self.turn = enums.Color.WHITE
+
+        # the square a pawn passed over with a double push on the last move,
+        # where it can be captured en passant
+        self.en_passant: Point | None = None
+
+    @property
+    def castle_rights_short(self) -> bool:
+        return self.castle_rights[self.turn].short
+
+    @castle_rights_short.setter
+    def castle_rights_short(self, value: bool) -> None:
+        self.castle_rights[self.turn] = self.castle_rights[self.turn]._replace(
+            short=value
+        )
+
+    @property
+    def castle_rights_long(self) -> bool:
+        return self.castle_rights[self.turn].long
+
+    @castle_rights_long.setter
+    def castle_rights_long(self, value: bool) -> None:
+        self.castle_rights[self.turn] = self.castle_rights[self.turn]._replace(
+            long=value
+        )
+
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        A 64 bit hash of the position, the turn,
+        the castling rights and the en passant square
+        """
+
+        keys = self._zobrist
+        position_hash = self._pieces_hash
+        for color, castle_rights in self.castle_rights.items():
+            if castle_rights.short:
+                position_hash ^= keys.castle_short[color]
+            if castle_rights.long:
+                position_hash ^= keys.castle_long[color]
+
+        if self.turn == enums.Color.BLACK:
+            position_hash ^= keys.black_to_move
+        if self.en_passant is not None:
+            position_hash ^= keys.en_passant_square(self.en_passant)
+        return position_hash
 
     @classmethod
     def from_fen(
@@ -34,9 +121,42 @@ class Board:
         curr_player: LivePlayer | None = None,
     ) -> Self:
         board = cls(board_width, board_height, curr_player)
-        board._board = board._parse_fen(fen)
+        pieces = board._parse_fen(fen)
+        board._load(pieces)
+        board._pieces_hash = board._hash_pieces(pieces.items())
+
+        # the fen was just validated, so its ranks can be reused by `to_fen`
+        board._fen_ranks = fen.split("/")
+        return board
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "BoardSnapshot") -> Self:
+        """Create a new board from a snapshot without parsing any fen"""
+
+        board = cls(snapshot.board_width, snapshot.board_height)
+        board._load(dict(snapshot.pieces))
+        board._pieces_hash = snapshot.pieces_hash
+        board._fen_ranks = list(snapshot.fen_ranks)
+        board.castle_rights = dict(snapshot.castle_rights)
+        board.turn = snapshot.turn
+        board.en_passant = snapshot.en_passant
         return board
 
+    def snapshot(self) -> "BoardSnapshot":
+        """Create an immutable copy of the position"""
+
+        self.to_fen()
+        return BoardSnapshot(
+            self.board_width,
+            self.board_height,
+            tuple(self.items()),
+            tuple(self._fen_ranks),
+            tuple(self.castle_rights.items()),
+            self.turn,
+            self._pieces_hash,
+            self.en_passant,
+        )
+
     def _parse_fen(self, fen: str) -> dict[Point, PieceInfo]:
         """
         Parse fen into a board
@@ -80,21 +200,109 @@ class Board:
 
         return board
 
+    def to_fen(self) -> str:
+        """
+        Serialize the board into a fen.
+        Only the ranks that changed since the last call are rebuilt.
+        """
+
+        ranks = self._fen_ranks
+        for y_coord, rank in enumerate(ranks):
+            if rank is None:
+                ranks[y_coord] = self._rank_to_fen(y_coord)
+
+        return "/".join(rank for rank in ranks if rank is not None)
+
+    def _rank_to_fen(self, y_coord: int) -> str:
+        rank = ""
+        empty = 0
+        for x_coord in range(self.board_width):
+            piece = self[Point(x_coord, y_coord)]
+            if piece is None:
+                empty += 1
+                continue
+
+            if empty:
+                rank += str(empty)
+                empty = 0
+
+            letter = piece.piece_type.value
+            rank += (
+                letter.upper() if piece.color == enums.Color.WHITE else letter
+            )
+
+        if empty:
+            rank += str(empty)
+        return rank
+
+    def add_listener(self, listener: SquareListener) -> None:
+        """
+        Notify an object whenever a square changes,
+        so it can keep derived state up to date incrementally.
+        Loading a fen or a snapshot does not notify listeners.
+        """
+
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: SquareListener) -> None:
+        self._listeners.remove(listener)
+
+    def _hash_pieces(self, pieces: Iterable[tuple[Point, PieceInfo]]) -> int:
+        pieces_hash = 0
+        for point, piece in pieces:
+            pieces_hash ^= self._zobrist.piece(point, piece)
+        return pieces_hash
+
+    def _load(self, pieces: dict[Point, PieceInfo]) -> None:
+        """Replace every piece on the board"""
+
+        self._board = pieces
+
+    def _set_square(self, point: Point, piece: PieceInfo) -> None:
+        self._board[point] = piece
+
+    def _clear_square(self, point: Point) -> None:
+        self._board.pop(point, None)
+
     def __setitem__(self, point: Point, piece: PieceInfo) -> None:
         if self.is_out_of_bound(point):
             raise ValueError(f"Point ({point.x}, {point.y}) is out of bound")
 
-        self._board[point] = piece
+        old_piece = self[point]
+        if old_piece is not None:
+            self._pieces_hash ^= self._zobrist.piece(point, old_piece)
+        self._pieces_hash ^= self._zobrist.piece(point, piece)
+
+        self._set_square(point, piece)
+        self._fen_ranks[point.y] = None
+        for listener in self._listeners:
+            listener.square_changed(point, piece)
 
     def __getitem__(self, point: Point) -> PieceInfo | None:
         return self._board.get(point)
 
+    def __delitem__(self, point: Point) -> None:
+        old_piece = self[point]
+        if old_piece is None:
+            return
+
+        self._pieces_hash ^= self._zobrist.piece(point, old_piece)
+        self._clear_square(point)
+        self._fen_ranks[point.y] = None
+        for listener in self._listeners:
+            listener.square_changed(point, None)
+
     def __contains__(self, item: Point) -> bool:
         return item in self._board
 
     def get_piece(self, point: Point) -> PieceInfo:
         return self._board[point]
 
+    def items(self) -> Iterator[tuple[Point, PieceInfo]]:
+        """Iterate over every piece on the board and its position"""
+
+        return iter(self._board.items())
+
     def is_out_of_bound(self, point: Point):
         """Check if a point is out of the boundaries of the board"""
 
@@ -104,3 +312,132 @@ class Board:
             or point.y < 0
             or point.y >= self.board_height
         )
+
+    def make_move(
+        self,
+        from_pos: Point,
+        to_pos: Point,
+        metadata: MoveInfo | None = None,
+    ) -> None:
+        """
+        Move a piece in place and push an undo record onto the undo stack.
+        The move is not validated.
+
+        :param from_pos: the position of the piece to move
+        :param to_pos: the position to move the piece to
+        :param metadata: the move metadata, for side effect moves and captures
+        """
+
+        moves = {from_pos: to_pos}
+        captures: tuple[Point, ...] = ()
+        if metadata is not None:
+            moves.update(metadata.side_effect_moves)
+            captures = metadata.side_effect_captures
+
+        # remember every square the move touches before changing anything
+        changed = {point: self[point] for point in captures}
+        for origin, destination in moves.items():
+            changed[origin] = self[origin]
+            changed[destination] = self[destination]
+
+        self._undo_stack.append(
+            UndoRecord(
+                tuple(changed.items()),
+                self.castle_rights.copy(),
+                self.turn,
+                self.en_passant,
+            )
+        )
+
+        for point in captures:
+            del self[point]
+        for origin in moves:
+            del self[origin]
+        for origin, destination in moves.items():
+            piece = changed[origin]
+            if piece is not None:
+                self[destination] = piece
+
+        piece = changed[from_pos]
+        if piece is not None and metadata is not None and metadata.promote_to:
+            self[to_pos] = PieceInfo(metadata.promote_to, piece.color)
+
+        self._update_castle_rights(changed, moves)
+        self._update_en_passant(piece, from_pos, to_pos)
+        self.turn = self.turn.invert()
+
+    def unmake_move(self) -> None:
+        """
+        Undo the last move made with `make_move`
+
+        :raises IndexError: no moves were made
+        """
+
+        squares, castle_rights, turn, en_passant = self._undo_stack.pop()
+        for point, piece in squares:
+            if piece is None:
+                del self[point]
+            else:
+                self[point] = piece
+
+        self.castle_rights = castle_rights
+        self.turn = turn
+        self.en_passant = en_passant
+
+    def _update_en_passant(
+        self,
+        piece: PieceInfo | None,
+        from_pos: Point,
+        to_pos: Point,
+    ) -> None:
+        """
+        Remember the square a pawn passed over with a double push,
+        so the next move can capture it en passant
+        """
+
+        if (
+            piece is not None
+            and piece.piece_type == enums.PieceType.PAWN
+            and from_pos.x == to_pos.x
+            and abs(to_pos.y - from_pos.y) == 2
+        ):
+            self.en_passant = Point(from_pos.x, (from_pos.y + to_pos.y) // 2)
+        else:
+            self.en_passant = None
+
+    def _update_castle_rights(
+        self,
+        changed: dict[Point, PieceInfo | None],
+        moves: dict[Point, Point],
+    ) -> None:
+        """
+        Revoke castling rights when a king moves,
+        or when a rook leaves or is captured on its starting square
+
+        :param changed: the pieces on the squares the move changed, before the move
+        :param moves: the origin and destination of every piece that moved
+        """
+
+        for point, piece in changed.items():
+            if piece is None:
+                continue
+
+            rights = self.castle_rights[piece.color]
+            if piece.piece_type == enums.PieceType.KING and point in moves:
+                self.castle_rights[piece.color] = CastleRights(False, False)
+                continue
+
+            home_rank = (
+                self.board_height - 1 if piece.color == enums.Color.WHITE else 0
+            )
+            if (
+                piece.piece_type != enums.PieceType.ROOK
+                or point.y != home_rank
+                or self[point] == piece
+            ):
+                continue
+
+            if point.x == 0:
+                self.castle_rights[piece.color] = rights._replace(long=False)
+            elif point.x == self.board_width - 1:
+                self.castle_rights[piece.color] = rights._replace(short=False)
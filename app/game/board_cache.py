@@ -0,0 +1,73 @@
+from app.models.games.live_player_model import LivePlayer
+from app.game.board import BoardSnapshot, Board
+from app.utils.lru_cache import CacheStats, LRUCache
+from app.schemas.config_schema import CONFIG
+from app.types import CastleRights
+from app import enums
+
+BoardCacheKey = tuple[str, int, int, enums.Color | None, CastleRights]
+
+
+class BoardCache:
+    """
+    Cache parsed boards by fen and castling rights,
+    so the same position is not parsed over and over
+    """
+
+    def __init__(self, maxsize: int = CONFIG.board_cache_size) -> None:
+        self._cache: LRUCache[BoardCacheKey, BoardSnapshot] = LRUCache(maxsize)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get_board(
+        self,
+        fen: str,
+        board_width: int = CONFIG.board_width,
+        board_height: int = CONFIG.board_height,
+        curr_player: LivePlayer | None = None,
+    ) -> Board:
+        """
+        Get a board for a fen, parsing it only if it isn't cached.
+        A new board is returned every time, so it is safe to mutate it.
+
+        :param fen: the fen of the board
+        :param board_width: the width of the board
+        :param board_height: the height of the board
+        :param curr_player: the player whose turn it is
+
+        :return: the board
+        """
+
+        key: BoardCacheKey = (
+            fen,
+            board_width,
+            board_height,
+            curr_player.color if curr_player else None,
+            (
+                CastleRights(
+                    curr_player.castle_rights_short,
+                    curr_player.castle_rights_long,
+                )
+                if curr_player
+                else CastleRights()
+            ),
+        )
+
+        snapshot = self._cache.get(key)
+        if snapshot is not None:
+            return Board.from_snapshot(snapshot)
+
+        board = Board.from_fen(fen, board_width, board_height, curr_player)
+        self._cache.put(key, board.snapshot())
+        return board
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+board_cache = BoardCache()
@@ -0,0 +1,376 @@
+from typing import NamedTuple
+import resource
+import time
+
+from app.game.movegen import MoveGenerator, pieces_moves
+from app.schemas.config_schema import CONFIG
+from app.types import CastleRights, Move, PieceInfo, Point
+from app.utils.lru_cache import LRUCache
+from app.game.board_cache import board_cache
+from app.game.board import Board
+from app import enums
+
+PIECE_VALUES: dict[enums.PieceType, int] = {
+    enums.PieceType.KING: 0,
+    enums.PieceType.QUEEN: 900,
+    enums.PieceType.ROOK: 500,
+    enums.PieceType.KNOOK: 700,
+    enums.PieceType.XOOK: 450,
+    enums.PieceType.ANTIQUEEN: 600,
+    enums.PieceType.ARCHBISHOP: 250,
+    enums.PieceType.BISHOP: 330,
+    enums.PieceType.HORSIE: 320,
+    enums.PieceType.PAWN: 100,
+    enums.PieceType.CHILD_PAWN: 80,
+}
+
+# moves are pseudo-legal, so the game is decided by capturing the king
+MATE_SCORE = 1_000_000
+# any score past this is a mate, searches never get this many plies deep
+MATE_BOUND = MATE_SCORE - 1000
+
+# how often the clock is checked, in nodes
+CHECK_TIME_EVERY = 1024
+
+# transposition table bounds
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    score: int
+    bound: int
+    move: Move | None
+
+
+class SearchResult(NamedTuple):
+    move: Move | None
+    score: int
+    # the deepest fully searched depth
+    depth: int
+    nodes: int
+    seconds: float
+    tt_entries: int
+    # the peak memory of the searching process, in kilobytes
+    max_rss_kb: int
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def allocate_time(time_remaining: float, increment: float) -> float:
+    """
+    Decide how long to search a move for.
+    Assumes about 30 more moves, spends most of the increment,
+    and never uses more than half of the remaining time.
+
+    :param time_remaining: the seconds left on the clock
+    :param increment: the seconds added to the clock after each move
+    """
+
+    budget = time_remaining / 30 + increment * 0.75
+    return max(min(budget, time_remaining / 2), 0.01)
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """
+    Make a mate score relative to the node it is stored for,
+    so it stays correct when the position is reached at another ply
+    """
+
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    """Make a stored mate score relative to the root again"""
+
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def evaluate(board: Board) -> int:
+    """Score the material balance from the view of the side to move"""
+
+    score = 0
+    for _, piece in board.items():
+        value = PIECE_VALUES[piece.piece_type]
+        score += value if piece.color == board.turn else -value
+    return score
+
+
+class Searcher:
+    """
+    Searches positions with iterative deepening alpha-beta.
+    The transposition table is kept between searches,
+    so searching the moves of the same game gets faster.
+    """
+
+    def __init__(
+        self,
+        tt_size: int = CONFIG.bot_tt_size,
+        generator: MoveGenerator = pieces_moves,
+    ) -> None:
+        self.table: LRUCache[int, TTEntry] = LRUCache(tt_size)
+        self.generator = generator
+
+        self.nodes = 0
+        self._deadline = 0.0
+
+    def search(
+        self,
+        board: Board,
+        time_limit: float,
+        max_depth: int = CONFIG.bot_max_depth,
+    ) -> SearchResult:
+        """
+        Find the best move for the side to move.
+        Every depth is searched in turn until the time runs out,
+        and the best move of the deepest finished depth is returned.
+
+        :param board: the position to search, it is restored before returning
+        :param time_limit: how many seconds to search for
+        :param max_depth: the deepest depth to search
+        """
+
+        start = time.perf_counter()
+        self._deadline = start + time_limit
+        self.nodes = 0
+
+        best_move: Move | None = None
+        best_score = 0
+        depth = 0
+        try:
+            for search_depth in range(1, max_depth + 1):
+                best_score = self._negamax(
+                    board, search_depth, -MATE_SCORE - 1, MATE_SCORE + 1, 0
+                )
+                entry = self.table.get(board.zobrist_hash)
+                best_move = entry.move if entry else best_move
+                depth = search_depth
+
+                # no need to search deeper once the game is decided
+                if abs(best_score) >= MATE_SCORE - max_depth:
+                    break
+        except SearchTimeout:
+            pass
+
+        # fall back to any move if not even the first depth finished
+        if best_move is None:
+            moves = self.generator(board)
+            best_move = moves[0] if moves else None
+
+        return SearchResult(
+            best_move,
+            best_score,
+            depth,
+            self.nodes,
+            time.perf_counter() - start,
+            len(self.table),
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        )
+
+    def _negamax(
+        self,
+        board: Board,
+        depth: int,
+        alpha: int,
+        beta: int,
+        ply: int,
+    ) -> int:
+        self._visit()
+        if depth == 0:
+            return self._quiescence(board, alpha, beta, ply)
+
+        key = board.zobrist_hash
+        entry = self.table.get(key)
+        if entry and entry.depth >= depth and ply:
+            entry_score = score_from_table(entry.score, ply)
+            if entry.bound == EXACT:
+                return entry_score
+            if entry.bound == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_score
+
+        moves = self._order_moves(board, self.generator(board), entry)
+        if not moves:
+            return 0
+
+        original_alpha = alpha
+        best_score = -MATE_SCORE - 1
+        best_move = moves[0]
+        for move in moves:
+            from_pos, to_pos, metadata = move
+            if self._captures_king(board, to_pos):
+                score = MATE_SCORE - ply
+            else:
+                board.make_move(from_pos, to_pos, metadata)
+                try:
+                    score = -self._negamax(
+                        board, depth - 1, -beta, -alpha, ply + 1
+                    )
+                finally:
+                    board.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.put(
+            key,
+            TTEntry(depth, score_to_table(best_score, ply), bound, best_move),
+        )
+
+        return best_score
+
+    def _quiescence(
+        self,
+        board: Board,
+        alpha: int,
+        beta: int,
+        ply: int,
+    ) -> int:
+        """Only search captures, so the evaluation isn't made mid exchange"""
+
+        self._visit()
+        captures = [
+            move for move in self.generator(board) if move[2].is_capture
+        ]
+        # a king left to be captured loses, whatever the material
+        if any(self._captures_king(board, move[1]) for move in captures):
+            return MATE_SCORE - ply
+
+        stand_pat = evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        for from_pos, to_pos, metadata in self._order_moves(
+            board, captures, None
+        ):
+            board.make_move(from_pos, to_pos, metadata)
+            try:
+                score = -self._quiescence(board, -beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+
+        return alpha
+
+    def _visit(self) -> None:
+        """Count a node and stop the search once the time is up"""
+
+        self.nodes += 1
+        if (
+            self.nodes % CHECK_TIME_EVERY == 0
+            and time.perf_counter() > self._deadline
+        ):
+            raise SearchTimeout()
+
+    @staticmethod
+    def _captures_king(board: Board, to_pos: Point) -> bool:
+        piece = board[to_pos]
+        return piece is not None and piece.piece_type == enums.PieceType.KING
+
+    @staticmethod
+    def _order_moves(
+        board: Board,
+        moves: list[Move],
+        entry: TTEntry | None,
+    ) -> list[Move]:
+        """
+        Search the best move of the previous search first,
+        then captures of the most valuable pieces by the least valuable pieces
+        """
+
+        def priority(move: Move) -> int:
+            from_pos, to_pos, metadata = move
+            if entry and entry.move == move:
+                return -MATE_SCORE
+            if not metadata.is_capture:
+                return 0
+
+            # en passant captures a piece off the destination square
+            victim: PieceInfo = board[to_pos] or board.get_piece(
+                metadata.side_effect_captures[0]
+            )
+            attacker: PieceInfo = board.get_piece(from_pos)
+            if victim.piece_type == enums.PieceType.KING:
+                return -MATE_SCORE + 1
+            return -PIECE_VALUES[victim.piece_type] * 10 + (
+                PIECE_VALUES[attacker.piece_type] // 100
+            )
+
+        return sorted(moves, key=priority)
+
+
+# each worker process keeps its own searcher, so its transposition table
+# is reused between the moves it searches
+_searcher: Searcher | None = None
+
+
+def get_searcher() -> Searcher:
+    global _searcher
+    if _searcher is None:
+        _searcher = Searcher()
+    return _searcher
+
+
+def find_best_move(
+    fen: str,
+    turn: enums.Color,
+    castle_rights: dict[enums.Color, CastleRights],
+    time_limit: float,
+    max_depth: int = CONFIG.bot_max_depth,
+    en_passant: Point | None = None,
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> SearchResult:
+    """
+    Search a position with the searcher of the current process.
+    The arguments and the result are small and picklable,
+    so it can be submitted to a process pool.
+
+    :param fen: the position to search
+    :param turn: the side to move
+    :param castle_rights: the castling rights of both colors
+    :param time_limit: how many seconds to search for
+    :param max_depth: the deepest depth to search
+    :param en_passant: the square a pawn can be captured en passant on
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+    """
+
+    board = board_cache.get_board(fen, board_width, board_height)
+    board.turn = turn
+    board.castle_rights = castle_rights.copy()
+    board.en_passant = en_passant
+    return get_searcher().search(board, time_limit, max_depth)
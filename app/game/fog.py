@@ -0,0 +1,184 @@
+from app.game.attack_map import AttackMap
+from app.game.bitboard import get_tables, iter_squares
+from app.schemas.game_schema import MoveMade
+from app.types import PieceInfo, Point
+from app.game.board import Board
+from app import enums
+
+# the fen character of a square the player can't see
+HIDDEN_SQUARE = "?"
+
+
+class FogOfWar:
+    """
+    The squares each color can see in `Variant.FOG_OF_WAR`.
+    A color sees the squares of its own pieces and every square
+    one of its pieces could move to.
+
+    Visibility comes from an `AttackMap`, so only the pieces affected by a move
+    are recomputed, and redacted fens only rebuild the ranks that changed.
+    """
+
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self.attack_map = AttackMap(board)
+        self._tables = get_tables(board.board_width, board.board_height)
+
+        self._rank_masks = [
+            sum(
+                1 << y * board.board_width + x for x in range(board.board_width)
+            )
+            for y in range(board.board_height)
+        ]
+
+        # the redacted ranks of each color, the visible squares they were
+        # built with and the squares that changed since they were built
+        self._ranks: dict[enums.Color, list[str]] = {
+            color: [""] * board.board_height for color in enums.Color
+        }
+        self._ranks_visible = {color: 0 for color in enums.Color}
+        self._changed = {
+            color: self._tables.board_mask for color in enums.Color
+        }
+
+        # the fen letter of every square, None for empty squares
+        self._letters: list[str | None] = [None] * len(self._tables.points)
+        for point, piece in board.items():
+            self.square_changed(point, piece)
+
+        board.add_listener(self)
+
+    def detach(self) -> None:
+        """Stop tracking the board"""
+
+        self.attack_map.detach()
+        self.board.remove_listener(self)
+
+    def square_changed(self, point: Point, piece: PieceInfo | None) -> None:
+        square = self._tables.square(point)
+        if piece is None:
+            self._letters[square] = None
+        elif piece.color == enums.Color.WHITE:
+            self._letters[square] = piece.piece_type.value.upper()
+        else:
+            self._letters[square] = piece.piece_type.value
+
+        for color in enums.Color:
+            self._changed[color] |= 1 << square
+
+    def visible(self, color: enums.Color) -> int:
+        """Get a mask of every square a color can see"""
+
+        return self.attack_map.targets(color) | self.attack_map.pieces(color)
+
+    def is_visible(self, point: Point, color: enums.Color) -> bool:
+        return bool(self.visible(color) >> self._tables.square(point) & 1)
+
+    def visible_pieces(self, color: enums.Color) -> dict[Point, PieceInfo]:
+        """Get the pieces a color can see and their positions"""
+
+        visible = self.visible(color) & (
+            self.attack_map.pieces(enums.Color.WHITE)
+            | self.attack_map.pieces(enums.Color.BLACK)
+        )
+        points = self._tables.points
+        return {
+            points[square]: self.board.get_piece(points[square])
+            for square in iter_squares(visible)
+        }
+
+    def redacted_fen(self, color: enums.Color) -> str:
+        """
+        Serialize the board as a color sees it,
+        with every hidden square replaced by `HIDDEN_SQUARE`
+        """
+
+        visible = self.visible(color)
+        dirty = self._changed[color] | (visible ^ self._ranks_visible[color])
+
+        ranks = self._ranks[color]
+        if dirty:
+            for y_coord, rank_mask in enumerate(self._rank_masks):
+                if dirty & rank_mask:
+                    ranks[y_coord] = self._rank_to_fen(y_coord, visible)
+
+        self._ranks_visible[color] = visible
+        self._changed[color] = 0
+        return "/".join(ranks)
+
+    def _rank_to_fen(self, y_coord: int, visible: int) -> str:
+        width = self.board.board_width
+        start = y_coord * width
+        visible >>= start
+
+        rank = ""
+        empty = 0
+        for letter in self._letters[start : start + width]:
+            if not visible & 1:
+                letter = HIDDEN_SQUARE
+            visible >>= 1
+
+            if letter is None:
+                empty += 1
+                continue
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += letter
+
+        if empty:
+            rank += str(empty)
+        return rank
+
+    def redact_move(
+        self,
+        move: MoveMade,
+        color: enums.Color,
+        visible_before: int,
+    ) -> MoveMade:
+        """
+        Filter a move event for a player after the move was made on the board.
+        Pieces are shown moving between squares the player could see.
+        A piece that moved out of sight is removed from its visible origin,
+        and a piece that came out of the fog appears on its destination.
+        The notation is hidden unless the whole move was visible.
+
+        :param move: the move event to filter
+        :param color: the color of the player the move is sent to
+        :param visible_before: the squares the player could see before the move,
+            from `visible`
+        """
+
+        visible_after = self.visible(color)
+        square = self._tables.square
+
+        moved: dict[Point, Point] = {}
+        disappeared: list[Point] = []
+        appeared: dict[Point, PieceInfo] = {}
+        for origin, destination in move.moved.items():
+            origin_visible = visible_before >> square(origin) & 1
+            destination_visible = visible_after >> square(destination) & 1
+
+            if origin_visible and destination_visible:
+                moved[origin] = destination
+            elif origin_visible:
+                disappeared.append(origin)
+            elif destination_visible:
+                appeared[destination] = self.board.get_piece(destination)
+
+        captured = [
+            point
+            for point in move.captured
+            if visible_before >> square(point) & 1
+        ]
+
+        fully_visible = moved == move.moved and captured == move.captured
+        return move.model_copy(
+            update={
+                "notation": move.notation if fully_visible else "",
+                "moved": moved,
+                "captured": captured,
+                "disappeared": disappeared,
+                "appeared": appeared,
+            }
+        )
@@ -0,0 +1,260 @@
+from typing import Iterator, Self
+
+from app.game.move_tables import get_castles
+from app.schemas.config_schema import CONFIG
+from app.game.pieces import King, Pawn
+from app.schemas.game_schema import MoveMade
+from app.types import Move, MoveInfo, Point
+from app import enums
+
+MOVE_SIZE = 3
+
+# the squares are packed as `origin * squares + destination` into 2 bytes
+MAX_SQUARES = 256
+
+NOTATION_CODES: dict[enums.NotationType, int] = {
+    notation_type: code for code, notation_type in enumerate(enums.NotationType)
+}
+NOTATION_TYPES = list(NOTATION_CODES)
+
+# 0 is reserved for moves without a promotion
+PROMOTION_CODES: dict[enums.PieceType, int] = {
+    piece_type: code for code, piece_type in enumerate(enums.PieceType, 1)
+}
+PROMOTION_TYPES: list[enums.PieceType | None] = [None, *PROMOTION_CODES]
+
+# flag byte layout: capture bit, 3 notation bits, 4 promotion bits
+_CAPTURE_FLAG = 0b1
+_NOTATION_SHIFT = 1
+_NOTATION_MASK = 0b111
+_PROMOTION_SHIFT = 4
+
+
+def _check_board_size(board_width: int, board_height: int) -> int:
+    squares = board_width * board_height
+    if squares > MAX_SQUARES:
+        raise ValueError(
+            f"A {board_width}x{board_height} board doesn't fit in the move format"
+        )
+    return squares
+
+
+def encode_move(
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> bytes:
+    """
+    Encode a move into `MOVE_SIZE` bytes, the origin and destination
+    squares packed into 2 bytes and then a byte of flags.
+    Side effects are not stored, `decode_move` rebuilds them from the squares.
+
+    :param from_pos: the position the piece moved from
+    :param to_pos: the position the piece moved to
+    :param move_info: the move metadata, side effects are not stored
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+
+    :raises ValueError: the board is too big for the format
+    """
+
+    squares = _check_board_size(board_width, board_height)
+    origin = from_pos.y * board_width + from_pos.x
+    destination = to_pos.y * board_width + to_pos.x
+
+    flags = (
+        (_CAPTURE_FLAG if move_info.is_capture else 0)
+        | NOTATION_CODES[move_info.notation_type] << _NOTATION_SHIFT
+        | PROMOTION_CODES.get(move_info.promote_to, 0) << _PROMOTION_SHIFT
+    )
+    return (origin * squares + destination).to_bytes(2, "big") + bytes((flags,))
+
+
+def _side_effects(
+    from_pos: Point,
+    to_pos: Point,
+    notation_type: enums.NotationType,
+    board_width: int,
+    board_height: int,
+) -> MoveInfo | None:
+    """Rebuild the metadata of the moves that have side effects"""
+
+    match notation_type:
+        case enums.NotationType.CASTLE | enums.NotationType.VERTICAL_CASTLE:
+            castles = get_castles(King, board_width, board_height)
+            for castle in castles.get(from_pos, ()):
+                if castle.king_dest == to_pos:
+                    return castle.move_info
+            raise ValueError(f"No castling move from {from_pos} to {to_pos}")
+        case enums.NotationType.EN_PASSANT:
+            return Pawn.en_passant_move(Point(to_pos.x, from_pos.y))
+        case enums.NotationType.IL_VATICANO:
+            # not generated yet, so there is no rule to rebuild it with
+            raise ValueError("Il vaticano moves are not supported")
+    return None
+
+
+def decode_move(
+    data: bytes,
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> Move:
+    """
+    Decode a move encoded by `encode_move`, with its side effects
+
+    :param data: the `MOVE_SIZE` bytes of the move
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+
+    :raises ValueError: the move is malformed or not supported
+    """
+
+    if len(data) != MOVE_SIZE:
+        raise ValueError(f"A move is {MOVE_SIZE} bytes, not {len(data)}")
+
+    squares = _check_board_size(board_width, board_height)
+    origin, destination = divmod(int.from_bytes(data[:2], "big"), squares)
+    if origin >= squares:
+        raise ValueError(f"Square {origin} is out of the board")
+
+    flags = data[2]
+    notation_code = flags >> _NOTATION_SHIFT & _NOTATION_MASK
+    promotion_code = flags >> _PROMOTION_SHIFT
+    if notation_code >= len(NOTATION_TYPES) or promotion_code >= len(
+        PROMOTION_TYPES
+    ):
+        raise ValueError(f"Invalid move flags {flags:#010b}")
+
+    from_pos = Point(origin % board_width, origin // board_width)
+    to_pos = Point(destination % board_width, destination // board_width)
+    notation_type = NOTATION_TYPES[notation_code]
+
+    move_info = _side_effects(
+        from_pos, to_pos, notation_type, board_width, board_height
+    ) or MoveInfo(
+        notation_type,
+        is_capture=bool(flags & _CAPTURE_FLAG),
+        promote_to=PROMOTION_TYPES[promotion_code],
+    )
+    return from_pos, to_pos, move_info
+
+
+def to_move_made(
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+    notation: str = "",
+) -> MoveMade:
+    """
+    Build the move sent to the clients
+
+    :param from_pos: the position the piece moved from
+    :param to_pos: the position the piece moved to
+    :param move_info: the move metadata
+    :param notation: the notation of the move
+    """
+
+    captured = list(move_info.side_effect_captures)
+    if move_info.is_capture and not captured:
+        captured.append(to_pos)
+
+    return MoveMade(
+        notation=notation,
+        moved={from_pos: to_pos, **dict(move_info.side_effect_moves)},
+        captured=captured,
+    )
+
+
+class MoveList:
+    """
+    The append-only move list of a game.
+    Moves are stored encoded, so the list can be saved
+    and streamed as is and only decoded when replayed.
+    """
+
+    def __init__(
+        self,
+        data: bytes = b"",
+        board_width: int = CONFIG.board_width,
+        board_height: int = CONFIG.board_height,
+    ) -> None:
+        if len(data) % MOVE_SIZE:
+            raise ValueError(
+                f"The move list is not made of {MOVE_SIZE} byte moves"
+            )
+
+        _check_board_size(board_width, board_height)
+        self.board_width = board_width
+        self.board_height = board_height
+        self._data = bytearray(data)
+
+    @classmethod
+    def from_moves(
+        cls,
+        moves: list[Move],
+        board_width: int = CONFIG.board_width,
+        board_height: int = CONFIG.board_height,
+    ) -> Self:
+        move_list = cls(b"", board_width, board_height)
+        for move in moves:
+            move_list.append(*move)
+        return move_list
+
+    def __len__(self) -> int:
+        return len(self._data) // MOVE_SIZE
+
+    def __bytes__(self) -> bytes:
+        return bytes(self._data)
+
+    def __getitem__(self, index: int) -> Move:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        start = index * MOVE_SIZE
+        return decode_move(
+            bytes(self._data[start : start + MOVE_SIZE]),
+            self.board_width,
+            self.board_height,
+        )
+
+    def __iter__(self) -> Iterator[Move]:
+        return self.since(0)
+
+    def append(
+        self, from_pos: Point, to_pos: Point, move_info: MoveInfo
+    ) -> bytes:
+        """
+        Add a move to the end of the list
+
+        :param from_pos: the position the piece moved from
+        :param to_pos: the position the piece moved to
+        :param move_info: the move metadata
+
+        :return: the encoded move, to append to stored copies of the list
+        """
+
+        data = encode_move(
+            from_pos, to_pos, move_info, self.board_width, self.board_height
+        )
+        self._data += data
+        return data
+
+    def since(self, index: int) -> Iterator[Move]:
+        """
+        Decode the moves played from an index on,
+        for example to catch up a client that already has the first moves
+
+        :param index: the index of the first move to decode
+        """
+
+        data = bytes(self._data[index * MOVE_SIZE :])
+        for start in range(0, len(data), MOVE_SIZE):
+            yield decode_move(
+                data[start : start + MOVE_SIZE],
+                self.board_width,
+                self.board_height,
+            )
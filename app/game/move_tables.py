@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from typing import NamedTuple, TYPE_CHECKING
+from functools import cache
+
+from app.types import CastleRights, MoveInfo, Offset, Point
+from app import enums
+
+if TYPE_CHECKING:
+    from app.game.pieces import Piece, King
+
+
+class Ray(NamedTuple):
+    # every square in the direction of the offset, ordered from the closest
+    squares: tuple[Point, ...]
+    can_capture: bool
+
+
+def build_ray(
+    position: Point,
+    offset: Offset,
+    board_width: int,
+    board_height: int,
+) -> Ray:
+    """
+    Walk an offset from a position until the edge of the board
+
+    :param position: the square to start from
+    :param offset: the offset to walk
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+
+    :return: the squares in the direction of the offset
+    """
+
+    squares: list[Point] = []
+    while True:
+        position += offset
+        if not (
+            0 <= position.x < board_width and 0 <= position.y < board_height
+        ):
+            break
+
+        squares.append(position)
+        if not offset.slide:
+            break
+
+    return Ray(tuple(squares), offset.can_capture)
+
+
+@cache
+def get_rays(
+    piece: type[Piece],
+    board_width: int,
+    board_height: int,
+) -> dict[Point, tuple[Ray, ...]]:
+    """
+    Get the rays of a piece for every square of the board.
+    The table is built the first time it is requested and cached afterwards.
+
+    :param piece: the piece to build the table for
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+
+    :return: a dictionary of each square and the non-empty rays from it
+    """
+
+    table: dict[Point, tuple[Ray, ...]] = {}
+    for y in range(board_height):
+        for x in range(board_width):
+            position = Point(x, y)
+            rays = (
+                build_ray(position, offset, board_width, board_height)
+                for offset in piece.offsets
+            )
+            table[position] = tuple(ray for ray in rays if ray.squares)
+
+    return table
+
+
+class CastleMove(NamedTuple):
+    """Everything about a castling move that only depends on the board size"""
+
+    rook: Point
+    king_dest: Point
+    rook_dest: Point
+    # the squares between the king and the rook, which must be empty
+    between: tuple[Point, ...]
+    # the squares that redirect to the castling move when clicked
+    ghosts: tuple[Point, ...]
+    # the same squares as masks, with square `(x, y)` in bit `y * board_width + x`
+    between_mask: int
+    ghosts_mask: int
+    move_info: MoveInfo
+    # which castling rights allow the move, either one is enough
+    short: bool
+    long: bool
+
+    def is_allowed(self, castle_rights: CastleRights) -> bool:
+        return (self.short and castle_rights.short) or (
+            self.long and castle_rights.long
+        )
+
+
+def build_castle_move(
+    king_pos: Point,
+    rook: Point,
+    king_dest: Point,
+    rook_dest: Point,
+    notation_type: enums.NotationType,
+    short: bool,
+    long: bool,
+    board_width: int,
+) -> CastleMove:
+    """
+    Build a castling move along a rank or a file
+
+    :param king_pos: the square of the king
+    :param rook: the square of the rook
+    :param king_dest: the square the king castles to
+    :param rook_dest: the square the rook castles to
+    :param notation_type: the notation type of the move
+    :param short: whether short castling rights allow the move
+    :param long: whether long castling rights allow the move
+    :param board_width: the width of the board
+    """
+
+    vertical = king_pos.x == rook.x
+    king_coord, rook_coord = (
+        (king_pos.y, rook.y) if vertical else (king_pos.x, rook.x)
+    )
+
+    def point(coord: int) -> Point:
+        return (
+            Point(king_pos.x, coord) if vertical else Point(coord, king_pos.y)
+        )
+
+    between = tuple(
+        point(coord)
+        for coord in range(
+            min(king_coord, rook_coord) + 1, max(king_coord, rook_coord)
+        )
+    )
+
+    # all the squares between the king and the rook should be clickable,
+    # but redirect to the actual square
+    if rook_coord < king_coord:
+        ghost_range = range(rook_coord + 1, king_coord - 1)
+    else:
+        ghost_range = range(king_coord + 2, rook_coord)
+    ghosts = tuple(
+        point(coord) for coord in ghost_range if point(coord) != king_dest
+    )
+
+    return CastleMove(
+        rook,
+        king_dest,
+        rook_dest,
+        between,
+        ghosts,
+        sum(1 << square.y * board_width + square.x for square in between),
+        sum(1 << square.y * board_width + square.x for square in ghosts),
+        MoveInfo(
+            notation_type=notation_type,
+            side_effect_moves=((rook, rook_dest),),
+        ),
+        short,
+        long,
+    )
+
+
+@cache
+def get_castles(
+    king: type[King],
+    board_width: int,
+    board_height: int,
+) -> dict[Point, tuple[CastleMove, ...]]:
+    """
+    Get the castling moves a king could make from every square of the board.
+    Whether the rook is there, the path is empty and the rights allow it
+    is checked when generating moves.
+
+    :param king: the king class, for the castling squares
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+
+    :return: a dictionary of each square and the castling moves from it
+    """
+
+    distance = king.vertical_castle_distance
+
+    table: dict[Point, tuple[CastleMove, ...]] = {}
+    for y in range(board_height):
+        for x in range(board_width):
+            king_pos = Point(x, y)
+            castles: list[CastleMove] = []
+
+            # castle with the rooks in the corners of the rank
+            for rook_x, (king_x, rook_dest_x), short in (
+                (0, king.long_castle_x, False),
+                (board_width - 1, king.short_castle_x, True),
+            ):
+                if rook_x == x:
+                    continue
+
+                castles.append(
+                    build_castle_move(
+                        king_pos,
+                        Point(rook_x, y),
+                        Point(king_x, y),
+                        Point(rook_dest_x, y),
+                        enums.NotationType.CASTLE,
+                        short,
+                        not short,
+                        board_width,
+                    )
+                )
+
+            # castle with a rook at the end of the file,
+            # the king moves towards it and the rook jumps over the king
+            for rook_y in (0, board_height - 1):
+                direction = 1 if rook_y > y else -1
+                if abs(rook_y - y) <= distance:
+                    continue
+
+                castles.append(
+                    build_castle_move(
+                        king_pos,
+                        Point(x, rook_y),
+                        Point(x, y + direction * distance),
+                        Point(x, y + direction * (distance - 1)),
+                        enums.NotationType.VERTICAL_CASTLE,
+                        True,
+                        True,
+                        board_width,
+                    )
+                )
+
+            table[king_pos] = tuple(castles)
+
+    return table
@@ -0,0 +1,40 @@
+from typing import Callable
+
+from app.game.bitboard import BitBoard
+from app.game.board import Board
+from app.game.pieces import PIECES
+from app.types import Move
+
+MoveGenerator = Callable[[Board], list[Move]]
+
+
+def pieces_moves(board: Board) -> list[Move]:
+    """Generate the moves of the side to move with the `PIECES` classes"""
+
+    moves: list[Move] = []
+    for position, piece in list(board.items()):
+        if piece.color != board.turn or piece.piece_type not in PIECES:
+            continue
+
+        legal_moves = PIECES[piece.piece_type].calc_legal_moves(board, position)
+        for destination, metadata in legal_moves.moves.items():
+            moves.append((position, destination, metadata))
+
+    return moves
+
+
+def bitboard_moves(board: Board) -> list[Move]:
+    """Generate the moves of the side to move with a `BitBoard`"""
+
+    bit_board = BitBoard.from_board(board)
+
+    moves: list[Move] = []
+    for position, piece in list(board.items()):
+        if piece.color != board.turn or piece.piece_type not in PIECES:
+            continue
+
+        legal_moves = bit_board.calc_legal_moves(position)
+        for destination, metadata in legal_moves.moves.items():
+            moves.append((position, destination, metadata))
+
+    return moves
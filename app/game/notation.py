@@ -0,0 +1,129 @@
+from app.types import MoveInfo, PieceInfo, Point
+from app.game.board import Board
+from app import enums
+
+FILES = "abcdefghijklmnopqrstuvwxyz"
+
+CASTLE_SHORT = "O-O"
+CASTLE_LONG = "O-O-O"
+VERTICAL_CASTLE = "O-O-V"
+IL_VATICANO = "Il Vaticano"
+
+PAWN_TYPES = {enums.PieceType.PAWN, enums.PieceType.CHILD_PAWN}
+
+
+def square_name(point: Point, board_height: int) -> str:
+    """Name a square by its file from the left and its rank from white's side"""
+
+    return f"{FILES[point.x]}{board_height - point.y}"
+
+
+class Notator:
+    """
+    Notates the moves of a position.
+    Disambiguation is read from the legal moves of the whole side,
+    indexed by target once, so notating every move stays cheap.
+    """
+
+    def __init__(
+        self, board: Board, side_moves: dict[Point, list[Point]]
+    ) -> None:
+        """
+        :param board: the position before the moves are made
+        :param side_moves: the legal moves of the side to notate,
+            from `bitboard.calc_legal_moves` or the legal moves cache
+        """
+
+        self.board = board
+
+        # the pieces that can reach each square
+        self._reached_by: dict[Point, list[Point]] = {}
+        for origin, targets in side_moves.items():
+            for target in targets:
+                self._reached_by.setdefault(target, []).append(origin)
+
+    def notate(
+        self, from_pos: Point, to_pos: Point, move_info: MoveInfo
+    ) -> str:
+        """
+        Get the notation of a move
+
+        :param from_pos: the position of the piece to move
+        :param to_pos: the position to move the piece to
+        :param move_info: the move metadata
+        """
+
+        match move_info.notation_type:
+            case enums.NotationType.CASTLE:
+                return CASTLE_SHORT if to_pos.x > from_pos.x else CASTLE_LONG
+            case enums.NotationType.VERTICAL_CASTLE:
+                return VERTICAL_CASTLE
+            case enums.NotationType.IL_VATICANO:
+                return IL_VATICANO
+
+        piece = self.board.get_piece(from_pos)
+        capture = "x" if move_info.is_capture else ""
+        destination = square_name(to_pos, self.board.board_height)
+
+        if piece.piece_type in PAWN_TYPES:
+            # pawns are only named by their file, and only when capturing
+            origin = FILES[from_pos.x] if capture else ""
+            notation = f"{origin}{capture}{destination}"
+        else:
+            notation = (
+                piece.piece_type.value.upper()
+                + self._disambiguation(from_pos, to_pos, piece)
+                + capture
+                + destination
+            )
+
+        if move_info.promote_to:
+            notation += f"={move_info.promote_to.value.upper()}"
+        return notation
+
+    def _disambiguation(
+        self,
+        from_pos: Point,
+        to_pos: Point,
+        piece: PieceInfo,
+    ) -> str:
+        """
+        Name the file, the rank or both of the moving piece
+        when another piece of the same type can reach the same square
+        """
+
+        rivals = [
+            origin
+            for origin in self._reached_by.get(to_pos, ())
+            if origin != from_pos and self.board[origin] == piece
+        ]
+        if not rivals:
+            return ""
+
+        file = FILES[from_pos.x]
+        rank = str(self.board.board_height - from_pos.y)
+        if all(rival.x != from_pos.x for rival in rivals):
+            return file
+        if all(rival.y != from_pos.y for rival in rivals):
+            return rank
+        return file + rank
+
+
+def notate(
+    board: Board,
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+    side_moves: dict[Point, list[Point]],
+) -> str:
+    """
+    Get the notation of a single move
+
+    :param board: the position before the move is made
+    :param from_pos: the position of the piece to move
+    :param to_pos: the position to move the piece to
+    :param move_info: the move metadata
+    :param side_moves: the legal moves of the side that moves
+    """
+
+    return Notator(board, side_moves).notate(from_pos, to_pos, move_info)
@@ -0,0 +1,145 @@
+from typing import Iterable
+from dataclasses import dataclass, asdict
+import argparse
+import json
+import time
+
+from app.game.movegen import MoveGenerator, bitboard_moves, pieces_moves
+from app.schemas.config_schema import CONFIG
+from app.types import Move
+from app.game.notation import Notator
+from app.game.bitboard import BitBoard
+from app.game.board import Board
+
+
+def notated_moves(board: Board) -> list[Move]:
+    """
+    Generate the moves of the side to move with a `BitBoard`
+    and notate every one of them, to benchmark notation with move generation
+    """
+
+    bit_board = BitBoard.from_board(board)
+    notator = Notator(board, bit_board.side_legal_moves(board.turn))
+
+    moves = bitboard_moves(board)
+    for move in moves:
+        notator.notate(*move)
+    return moves
+
+
+GENERATORS: dict[str, MoveGenerator] = {
+    "pieces": pieces_moves,
+    "bitboard": bitboard_moves,
+    "notation": notated_moves,
+}
+
+# positions that exercise sliding, jumping, captures and castling
+PERFT_POSITIONS = [
+    CONFIG.default_fen,
+    "rhnxqkbahr/10/c8c/10/10/10/10/C8C/10/RHNXQKBAHR",
+    "r4k3r/10/10/4q5/10/10/5Q4/10/10/R4K3R",
+    "10/2h4x2/4n5/1c6b1/10/10/1B6C1/5N4/2X4H2/10",
+]
+
+
+def perft(
+    board: Board,
+    depth: int,
+    generator: MoveGenerator = pieces_moves,
+) -> int:
+    """
+    Count the positions reachable in exactly `depth` moves.
+    Moves are pseudo-legal, the same as the move generators.
+
+    :param board: the board to search, it is restored before returning
+    :param depth: how many moves deep to search
+    :param generator: the move generator to use
+    """
+
+    if depth == 0:
+        return 1
+
+    moves = generator(board)
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for from_pos, to_pos, metadata in moves:
+        board.make_move(from_pos, to_pos, metadata)
+        nodes += perft(board, depth - 1, generator)
+        board.unmake_move()
+
+    return nodes
+
+
+@dataclass
+class PerftResult:
+    fen: str
+    depth: int
+    generator: str
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self) | {"nodes_per_second": self.nodes_per_second}
+
+
+def run_perft(
+    fens: Iterable[str],
+    depth: int,
+    generator: str = "pieces",
+) -> list[PerftResult]:
+    """
+    Run perft on multiple positions and time each one
+
+    :param fens: the positions to search
+    :param depth: how many moves deep to search
+    :param generator: the name of the move generator in `GENERATORS`
+    """
+
+    results: list[PerftResult] = []
+    for fen in fens:
+        board = Board.from_fen(fen)
+
+        start = time.perf_counter()
+        nodes = perft(board, depth, GENERATORS[generator])
+        seconds = time.perf_counter() - start
+
+        results.append(PerftResult(fen, depth, generator, nodes, seconds))
+
+    return results
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Count the leaf nodes of the move tree "
+        "to benchmark and cross check move generators"
+    )
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument(
+        "--fen",
+        action="append",
+        help="a position to search, can be repeated. "
+        "defaults to the default fen and the perft test positions",
+    )
+    parser.add_argument(
+        "--generator",
+        choices=list(GENERATORS),
+        default="pieces",
+    )
+    parsed = parser.parse_args(args)
+
+    results = run_perft(
+        parsed.fen or PERFT_POSITIONS,
+        parsed.depth,
+        parsed.generator,
+    )
+    print(json.dumps([result.to_dict() for result in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
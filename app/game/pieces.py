@@ -1,15 +1,20 @@
 from dataclasses import dataclass, field
 from abc import ABC
 
-from app.schemas.game_schema import MoveMetadata
+from app.types import MoveInfo, Offset, Point
+from app.game import move_tables
 from app.game.board import Board
-from app.types import PieceInfo, Offset, Point
 from app import enums
 
+# move info is immutable, so the common cases are shared instead of
+# allocating a new one for every square
+QUIET_MOVE = MoveInfo()
+CAPTURE_MOVE = MoveInfo(is_capture=True)
 
-@dataclass
+
+@dataclass(slots=True)
 class PieceMoves:
-    moves: dict[Point, MoveMetadata] = field(default_factory=dict)
+    moves: dict[Point, MoveInfo] = field(default_factory=dict)
     ghosts: dict[Point, Point] = field(default_factory=dict)
 
     def merge_moves(self, legal_moves: "PieceMoves") -> None:
@@ -31,66 +36,25 @@ class Piece(ABC):
         :param position: the current position of the piece
         """
 
-        legal_moves = PieceMoves()
-        for offset in cls.offsets:
-            moves = cls._check_offset(board, position, offset)
-            legal_moves.merge_moves(moves)
-
-        return legal_moves
-
-    @classmethod
-    def _check_offset(
-        cls,
-        board: Board,
-        position: Point,
-        offset: Offset,
-    ) -> PieceMoves:
-        """
-        Get a list of all the legal moves in a certain direction
-
-        :param board: the chessboard to scan
-        :param position: the current position of the piece
-        :param offset: the offset to add to the current position
+        curr_color = board.get_piece(position).color
+        rays = move_tables.get_rays(cls, board.board_width, board.board_height)
 
-        :return: every point the piece could go to and its metadata
-        """
-
-        curr_piece = board.get_piece(position)
         legal_moves = PieceMoves()
-        while True:
-            position += offset
-
-            # stop searching if out of bound
-            if board.is_out_of_bound(position):
-                break
-
-            can_capture = (
-                cls.can_capture(board, curr_piece, position)
-                and offset.can_capture
-            )
-            is_piece = board[position] is not None
-
-            # check if there is an uncapturable piece in the way
-            if is_piece and not can_capture:
-                break
-
-            legal_moves.moves[position] = MoveMetadata(is_capture=is_piece)
-
-            # is this the final time the piece can move in this direction?
-            if not offset.slide or is_piece:
+        moves = legal_moves.moves
+        for squares, can_capture in rays[position]:
+            for square in squares:
+                piece = board[square]
+                if piece is None:
+                    moves[square] = QUIET_MOVE
+                    continue
+
+                # stop at the first piece, capture it if possible
+                if can_capture and piece.color != curr_color:
+                    moves[square] = CAPTURE_MOVE
                 break
 
         return legal_moves
 
-    @staticmethod
-    def can_capture(
-        board: Board,
-        capturer: PieceInfo,
-        captured_pos: Point,
-    ) -> bool:
-        captured = board[captured_pos]
-        return captured is not None and capturer.color != captured.color
-
 
 # region Piece Implementation
 
@@ -123,116 +87,62 @@ class King(Piece):
     # king x position, rook x position
     short_castle_x: tuple[int, int] = (8, 7)
     long_castle_x: tuple[int, int] = (2, 3)
+    # how many squares the king moves when castling along a file
+    vertical_castle_distance = 2
 
     @classmethod
     def calc_legal_moves(cls, board: Board, position: Point) -> PieceMoves:
         legal_moves = super().calc_legal_moves(board, position)
 
-        # find castling moves
-        legal_moves.merge_moves(
-            cls.castle(
-                board,
-                position,
-                Point(0, position.y),
-            )
-        )
-
-        legal_moves.merge_moves(
-            cls.castle(
-                board,
-                position,
-                Point(board.board_width - 1, position.y),
-            )
+        castles = move_tables.get_castles(
+            cls, board.board_width, board.board_height
         )
+        for castle in castles[position]:
+            if cls.can_castle_with(board, position, castle):
+                legal_moves.merge_moves(cls.castle(castle))
 
         return legal_moves
 
-    @classmethod
-    def castle(
-        cls,
-        board: Board,
-        king_pos: Point,
-        rook_pos: Point,
-    ) -> PieceMoves:
+    @staticmethod
+    def castle(castle: move_tables.CastleMove) -> PieceMoves:
         """
-        Perform castling move if possible
+        Get the moves of a castling move
 
-        :param board: the chessboard
-        :param king_pos: the position of the king
-        :param rook_pos: the position of the potential rook to castle with
+        :param castle: the castling move, from `move_tables.get_castles`
 
-        :return: the castling moves if found, an empty dictionary otherwise
+        :return: the king destination and the ghost squares that redirect to it
         """
 
-        if not cls.can_castle_with(board, king_pos, rook_pos):
-            return PieceMoves()
-
-        if rook_pos.x < king_pos.x:
-            king_x, rook_x = cls.long_castle_x
-            ghost_range = range(rook_pos.x + 1, king_pos.x - 1)
-        else:
-            king_x, rook_x = cls.short_castle_x
-            ghost_range = range(king_pos.x + 2, rook_pos.x)
-
-        king_dest = Point(king_x, king_pos.y)
-        rook_dest = Point(rook_x, rook_pos.y)
-
-        # all the points between the king and the rook should be clickable,
-        # but redirect to the actual point
-        ghost_moves = {
-            Point(x, king_pos.y): king_dest
-            for x in ghost_range
-            if x != king_dest.x
-        }
-
-        moves = PieceMoves(
-            moves={
-                king_dest: MoveMetadata(
-                    notation_type=enums.NotationType.CASTLE,
-                    side_effect_moves={rook_pos: rook_dest},
-                )
-            },
-            ghosts=ghost_moves,
+        return PieceMoves(
+            moves={castle.king_dest: castle.move_info},
+            ghosts=dict.fromkeys(castle.ghosts, castle.king_dest),
         )
 
-        return moves
-
     @staticmethod
     def can_castle_with(
         board: Board,
         king_pos: Point,
-        castle_with_pos: Point,
+        castle: move_tables.CastleMove,
     ) -> bool:
         """
-        Determine whether castling is possible with a given rook
+        Determine whether a castling move is possible
 
         :param board: the chessboard
         :param king_pos: the position of the king
-        :param castle_with_pos: the position of the rook with whom to castle with
+        :param castle: the castling move, from `move_tables.get_castles`
 
         :return: true if possible, false otherwise
         """
 
-        castle_with = board[castle_with_pos]
-
-        is_path_blocked = any(
-            Point(x, king_pos.y) in board
-            for x in range(king_pos.x + 1, castle_with_pos.x)
-        )
-
-        is_long = castle_with_pos.x < king_pos.x
-        has_castling_rights = (is_long and board.castle_rights_long) or (
-            not is_long and board.castle_rights_short
-        )
+        king = board.get_piece(king_pos)
+        castle_with = board[castle.rook]
 
         return (
-            not is_path_blocked
-            and has_castling_rights
-            # same rank
-            and castle_with_pos.y == king_pos.y
-            # correct piece type
+            castle.is_allowed(board.castle_rights[king.color])
             and castle_with is not None
             and castle_with.piece_type == enums.PieceType.ROOK
+            and castle_with.color == king.color
+            and not any(point in board for point in castle.between)
         )
 
 
@@ -281,6 +191,130 @@ class Archbishop(Piece):
     offsets = [Offset(2, 0), Offset(-2, 0), Offset(0, 2), Offset(0, -2)]
 
 
+class Antiqueen(Piece):
+    # a nightrider, slides along the horsie jumps
+    offsets = [
+        Offset(1, 2),
+        Offset(1, -2),
+        Offset(-1, 2),
+        Offset(-1, -2),
+        Offset(2, 1),
+        Offset(2, -1),
+        Offset(-2, 1),
+        Offset(-2, -1),
+    ]
+
+
+class Pawn(Piece):
+    # pawns move towards the enemy and capture differently than they move,
+    # so their moves are generated by `calc_legal_moves` instead
+    offsets = []
+
+    can_double_push = True
+    # the piece a pawn turns into on the last rank
+    promotion = enums.PieceType.QUEEN
+
+    @staticmethod
+    def direction(color: enums.Color) -> int:
+        """The y direction the pawns of a color move in"""
+
+        return -1 if color == enums.Color.WHITE else 1
+
+    @staticmethod
+    def start_rank(color: enums.Color, board_height: int) -> int:
+        return board_height - 2 if color == enums.Color.WHITE else 1
+
+    @staticmethod
+    def last_rank(color: enums.Color, board_height: int) -> int:
+        return 0 if color == enums.Color.WHITE else board_height - 1
+
+    @classmethod
+    def calc_legal_moves(cls, board: Board, position: Point) -> PieceMoves:
+        color = board.get_piece(position).color
+        dy = cls.direction(color)
+        promotes = position.y + dy == cls.last_rank(color, board.board_height)
+        quiet_move = cls.move_info(False, promotes)
+
+        legal_moves = PieceMoves()
+        moves = legal_moves.moves
+
+        push = Point(position.x, position.y + dy)
+        if not board.is_out_of_bound(push) and push not in board:
+            moves[push] = quiet_move
+
+            double_push = Point(position.x, position.y + dy * 2)
+            if (
+                cls.can_double_push
+                and position.y == cls.start_rank(color, board.board_height)
+                and double_push not in board
+            ):
+                moves[double_push] = QUIET_MOVE
+
+        for dx in (-1, 1):
+            target = Point(position.x + dx, position.y + dy)
+            if board.is_out_of_bound(target):
+                continue
+
+            piece = board[target]
+            if piece is not None:
+                if piece.color != color:
+                    moves[target] = cls.move_info(True, promotes)
+            elif target == board.en_passant:
+                captured = Point(target.x, position.y)
+                if cls.can_capture_en_passant(board, color, captured):
+                    moves[target] = cls.en_passant_move(captured)
+
+        return legal_moves
+
+    @classmethod
+    def move_info(cls, is_capture: bool, promotes: bool) -> MoveInfo:
+        """Get the metadata of a push or a capture"""
+
+        if not promotes:
+            return CAPTURE_MOVE if is_capture else QUIET_MOVE
+        return MoveInfo(is_capture=is_capture, promote_to=cls.promotion)
+
+    @staticmethod
+    def en_passant_move(captured: Point) -> MoveInfo:
+        """
+        Get the metadata of an en passant capture
+
+        :param captured: the square of the pawn that just double pushed
+        """
+
+        return MoveInfo(
+            enums.NotationType.EN_PASSANT,
+            is_capture=True,
+            side_effect_captures=(captured,),
+        )
+
+    @staticmethod
+    def can_capture_en_passant(
+        board: Board,
+        color: enums.Color,
+        captured: Point,
+    ) -> bool:
+        """
+        Check there is an enemy pawn to capture en passant
+
+        :param board: the chessboard
+        :param color: the color of the capturing pawn
+        :param captured: the square of the pawn that just double pushed
+        """
+
+        piece = board[captured]
+        return (
+            piece is not None
+            and piece.piece_type == enums.PieceType.PAWN
+            and piece.color != color
+        )
+
+
+class ChildPawn(Pawn):
+    # a pawn that can never double push
+    can_double_push = False
+
+
 class Xook(Piece):
     offsets = [
         # move like a bishop
@@ -307,4 +341,7 @@ PIECES: dict[enums.PieceType, type[Piece]] = {
     enums.PieceType.KNOOK: Knook,
     enums.PieceType.ARCHBISHOP: Archbishop,
     enums.PieceType.XOOK: Xook,
+    enums.PieceType.ANTIQUEEN: Antiqueen,
+    enums.PieceType.PAWN: Pawn,
+    enums.PieceType.CHILD_PAWN: ChildPawn,
 }
@@ -0,0 +1,96 @@
+from typing import Self
+from array import array
+import sys
+
+from app.types import MoveInfo, Point
+from app.game.board import Board
+from app import enums
+
+REPETITIONS = 3
+# fifty moves of each player
+FIFTY_MOVE_PLIES = 100
+
+PAWN_TYPES = {enums.PieceType.PAWN, enums.PieceType.CHILD_PAWN}
+
+
+def is_irreversible(board: Board, from_pos: Point, move_info: MoveInfo) -> bool:
+    """
+    Check if a move resets the history, before it is made
+
+    :param board: the position before the move
+    :param from_pos: the position of the piece to move
+    :param move_info: the move metadata
+    """
+
+    return (
+        move_info.is_capture
+        or board.get_piece(from_pos).piece_type in PAWN_TYPES
+    )
+
+
+class PositionHistory:
+    """
+    The hashes of every position since the last irreversible move,
+    stored as an array of 64 bit integers.
+    No earlier position can repeat, and the fifty-move count starts there.
+    """
+
+    def __init__(self, hashes: array | None = None) -> None:
+        self.hashes = hashes if hashes is not None else array("Q")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """
+        Load a history saved with `to_bytes`
+
+        :raises ValueError: the data is not made of 64 bit hashes
+        """
+
+        hashes = array("Q")
+        hashes.frombytes(data)
+        if sys.byteorder == "big":
+            hashes.byteswap()
+        return cls(hashes)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the hashes as little endian 64 bit integers"""
+
+        if sys.byteorder == "big":
+            hashes = array("Q", self.hashes)
+            hashes.byteswap()
+            return hashes.tobytes()
+        return self.hashes.tobytes()
+
+    @property
+    def halfmove_clock(self) -> int:
+        """How many moves were made since the last irreversible move"""
+
+        return max(len(self.hashes) - 1, 0)
+
+    def push(self, position_hash: int, irreversible: bool = False) -> None:
+        """
+        Record the position after a move
+
+        :param position_hash: the zobrist hash of the position
+        :param irreversible: whether the move was a capture or a pawn move
+        """
+
+        if irreversible:
+            del self.hashes[:]
+        self.hashes.append(position_hash)
+
+    def repetitions(self) -> int:
+        """How many times the current position occurred"""
+
+        if not self.hashes:
+            return 0
+        return self.hashes.count(self.hashes[-1])
+
+    def draw_reason(self) -> enums.DrawReason | None:
+        """Get why the game is drawn, or None if it isn't"""
+
+        if self.repetitions() >= REPETITIONS:
+            return enums.DrawReason.THREEFOLD_REPETITION
+        if self.halfmove_clock >= FIFTY_MOVE_PLIES:
+            return enums.DrawReason.FIFTY_MOVES
+        return None
@@ -0,0 +1,91 @@
+from typing import Sequence
+
+from app.game.bitboard import BitBoard, get_tables
+from app.schemas.config_schema import CONFIG
+from app.game import batch, engine, move_tables, zobrist
+from app.types import CastleRights
+from app.game.pieces import PIECES
+from app import enums
+
+# the tasks run in worker processes, so they take a fen instead of a board
+# and return squares as `y * board_width + x` to keep pickling cheap
+CompactMoves = dict[int, list[int]]
+
+
+def warm_up(
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> None:
+    """
+    Build every cached table a worker needs up front,
+    so the first task it runs isn't slower than the rest
+    """
+
+    for piece in PIECES.values():
+        move_tables.get_rays(piece, board_width, board_height)
+    get_tables(board_width, board_height)
+    zobrist.get_keys(board_width, board_height)
+    engine.get_searcher()
+
+
+def legal_moves(
+    fen: str,
+    color: enums.Color,
+    castle_rights: CastleRights = CastleRights(),
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> CompactMoves:
+    """
+    Get every legal move of a color
+
+    :param fen: the position
+    :param color: the color to generate the moves for
+    :param castle_rights: the castling rights of the color
+    :param board_width: the width of the board
+    :param board_height: the height of the board
+
+    :return: the square of each piece and the squares it can move to
+    """
+
+    bit_board = BitBoard.from_fen(fen, board_width, board_height)
+    bit_board.castle_rights[color] = castle_rights
+
+    tables = bit_board.tables
+    return {
+        tables.square(origin): [tables.square(target) for target in targets]
+        for origin, targets in bit_board.side_legal_moves(color).items()
+    }
+
+
+def batch_legal_moves(
+    fens: Sequence[str],
+    colors: Sequence[enums.Color],
+    board_width: int = CONFIG.board_width,
+    board_height: int = CONFIG.board_height,
+) -> list[CompactMoves]:
+    """
+    Get every legal move of the side to move of many positions,
+    with the vectorized batch generator
+
+    :param fens: the positions
+    :param colors: the side to move of each position
+    :param board_width: the width of every board
+    :param board_height: the height of every board
+    """
+
+    boards = batch.encode_fens(fens, board_width, board_height)
+    board_indexes, origins, targets = batch.move_arrays(boards, colors)
+
+    moves: list[dict[int, set[int]]] = [{} for _ in fens]
+    for n, origin, target in zip(
+        board_indexes.tolist(), origins.tolist(), targets.tolist()
+    ):
+        moves[n].setdefault(origin, set()).add(target)
+
+    return [
+        {
+            origin: sorted(piece_targets[origin])
+            for origin in sorted(piece_targets)
+        }
+        for piece_targets in moves
+    ]
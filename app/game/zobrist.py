@@ -0,0 +1,44 @@
+from functools import cache
+import random
+
+from app.types import PieceInfo, Point
+from app import enums
+
+# the keys are generated from a fixed seed so every worker
+# hashes the same position to the same value
+ZOBRIST_SEED = 2024
+
+
+class ZobristKeys:
+    """Random 64 bit keys for every feature of a position"""
+
+    def __init__(self, board_width: int, board_height: int) -> None:
+        self.board_width = board_width
+
+        rng = random.Random(ZOBRIST_SEED)
+        squares = board_width * board_height
+
+        self.pieces: dict[PieceInfo, list[int]] = {
+            PieceInfo(piece_type, color): [
+                rng.getrandbits(64) for _ in range(squares)
+            ]
+            for piece_type in enums.PieceType
+            for color in enums.Color
+        }
+        self.castle_short = {
+            color: rng.getrandbits(64) for color in enums.Color
+        }
+        self.castle_long = {color: rng.getrandbits(64) for color in enums.Color}
+        self.black_to_move = rng.getrandbits(64)
+        self.en_passant = [rng.getrandbits(64) for _ in range(squares)]
+
+    def piece(self, point: Point, piece: PieceInfo) -> int:
+        return self.pieces[piece][point.y * self.board_width + point.x]
+
+    def en_passant_square(self, point: Point) -> int:
+        return self.en_passant[point.y * self.board_width + point.x]
+
+
+@cache
+def get_keys(board_width: int, board_height: int) -> ZobristKeys:
+    return ZobristKeys(board_width, board_height)
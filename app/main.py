@@ -7,6 +7,7 @@ from fastapi import FastAPI
 
 from app.schemas.config_schema import CONFIG
 from app.services.ws_service import ws_server_inst
+from app.services.game_executor import game_executor_inst
 from app.schemas import response_schema
 from app.utils import common
 from app.crud import user_crud
@@ -31,10 +32,15 @@ async def lifespan(app: FastAPI):
 
     scheduler.start()
 
+    game_executor_inst.start()
+
     await ws_server_inst.connect_pubsub()
+    ws_server_inst.presence.start()
     yield
+    await ws_server_inst.presence.stop()
     await ws_server_inst.disconnect_pubsub()
 
+    game_executor_inst.shutdown()
     scheduler.shutdown()
 
 
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import mapped_column, relationship, Mapped
-from sqlalchemy import func, ForeignKey, DateTime, CHAR
+from sqlalchemy import func, ForeignKey, DateTime, LargeBinary, CHAR
 
 from app.db import Base
 from app import enums
@@ -42,6 +42,8 @@ class GameResult(Base, kw_only=True):
     increment: Mapped[int]
 
     results: Mapped[enums.GameResult]
+    # the move list of the game, encoded by `move_codec`
+    moves: Mapped[bytes] = mapped_column(LargeBinary, default=b"")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     ended_at: Mapped[datetime] = mapped_column(
@@ -6,6 +6,8 @@ from sqlalchemy import (
     CheckConstraint,
     ForeignKey,
     DateTime,
+    LargeBinary,
+    SmallInteger,
     VARCHAR,
     CHAR,
 )
@@ -58,7 +60,21 @@ class LiveGame(Base, kw_only=True):
         index=True,
     )
 
+    @property
+    def turn_player(self) -> LivePlayer:
+        if self.turn_player_id == self.player_white.player_id:
+            return self.player_white
+        return self.player_black
+
     fen: Mapped[str] = mapped_column(VARCHAR(128))
+    # every move played, encoded by `move_codec` and only ever appended to
+    moves: Mapped[bytes] = mapped_column(LargeBinary, default=b"")
+    # the position hashes since the last irreversible move,
+    # see `position_history.PositionHistory`
+    position_history: Mapped[bytes] = mapped_column(LargeBinary, default=b"")
+    # the square a pawn can be captured en passant on after the last move,
+    # as `y * board_width + x`, the fen doesn't include it
+    en_passant: Mapped[int | None] = mapped_column(SmallInteger, default=None)
 
     variant: Mapped[enums.Variant]
     time_control: Mapped[int]
@@ -19,11 +19,22 @@ router = APIRouter(prefix="/live-game/{token}", tags=["live-game"])
         }
     },
 )
-def get_live_game(db: deps.DBDep, token: str):
+async def get_live_game(
+    db: deps.DBDep,
+    legal_moves_cache: deps.LegalMovesCacheDep,
+    token: str,
+):
     """Fetch everything neccasary to load a game"""
 
     game = game_crud.fetch_live_game(db, token)
     if not game:
         raise HTTPException(HTTPStatus.NOT_FOUND, "Game Not Found")
 
-    return game
+    board = game_crud.load_board(game)
+    legal_moves = await legal_moves_cache.get_legal_moves(
+        board, game.turn_player.color
+    )
+
+    return game_schema.LiveGame.model_validate(
+        game, from_attributes=True
+    ).model_copy(update={"legal_moves": legal_moves})
@@ -1,3 +1,4 @@
+from typing import Literal
 import os
 
 from pydantic_settings import SettingsConfigDict, BaseSettings
@@ -36,6 +37,38 @@ class Config(BaseSettings):
     default_fen: str = (
         "rhnxqkbahr/ddpdppdpdd/c8c/10/10/10/10/C8C/DDPDPPDPDD/RHNXQKBAHR"
     )
+    board_cache_size: int = 4096
+
+    # share the legal moves cache between workers through redis
+    legal_moves_cache_redis: bool = False
+    legal_moves_cache_size: int = 10000
+    legal_moves_cache_ttl: int = 3600
+
+    # run game computations in worker processes instead of threads,
+    # so they don't compete with the event loop for the GIL
+    game_executor_mode: Literal["thread", "process"] = "process"
+    game_executor_workers: int = 2
+
+    # publish websocket emits to a channel per user and room, so each worker
+    # only receives the messages of its own clients, or to one global channel
+    ws_pubsub_routing: Literal["global", "targeted"] = "targeted"
+    # the most pubsub messages delivered per wakeup of the listener
+    ws_pubsub_batch_size: int = 256
+    # the most messages queued for a websocket client, and what to do
+    # when a slow client fills its queue
+    ws_send_queue_size: int = 256
+    ws_send_overflow: Literal["drop_oldest", "coalesce", "disconnect"] = (
+        "disconnect"
+    )
+
+    # seconds a user or room member stays registered as online in redis
+    # without a heartbeat, and to collect registry changes before writing
+    presence_ttl: int = 30
+    presence_flush_interval: float = 0.05
+
+    # how deep and with how many transposition table entries the bot searches
+    bot_max_depth: int = 6
+    bot_tt_size: int = 200_000
 
     model_config = SettingsConfigDict(env_file=os.getenv("ENV") or ".env")
 
@@ -1,10 +1,10 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Self
 
 from pydantic import BaseModel, Field
 
 from app.schemas import user_schema
-from app.types import StrPoint
+from app.types import Base64Data, MoveInfo, PieceInfo, StrPoint
 from app import enums
 
 
@@ -55,6 +55,10 @@ class LiveGame(BaseModel):
     turn_player_id: int
 
     fen: str
+    # every move played so far, encoded by `move_codec`
+    moves: Base64Data = b""
+    # the moves of the side to move, so the client doesn't have to ask
+    legal_moves: dict[StrPoint, list[StrPoint]] = {}
 
 
 class MoveMetadata(BaseModel):
@@ -63,6 +67,26 @@ class MoveMetadata(BaseModel):
     is_capture: bool = False
     side_effect_captures: list[StrPoint] = []
     side_effect_moves: dict[StrPoint, StrPoint] = {}
+    promote_to: enums.PieceType | None = None
+
+    @classmethod
+    def from_move_info(cls, move_info: MoveInfo) -> Self:
+        return cls(
+            notation_type=move_info.notation_type,
+            is_capture=move_info.is_capture,
+            side_effect_captures=list(move_info.side_effect_captures),
+            side_effect_moves=dict(move_info.side_effect_moves),
+            promote_to=move_info.promote_to,
+        )
+
+    def to_move_info(self) -> MoveInfo:
+        return MoveInfo(
+            self.notation_type,
+            self.is_capture,
+            tuple(self.side_effect_captures),
+            tuple(self.side_effect_moves.items()),
+            self.promote_to,
+        )
 
 
 class LegalMoves(BaseModel):
@@ -74,5 +98,9 @@ class MoveMade(BaseModel):
 
     moved: dict[StrPoint, StrPoint]
     captured: list[StrPoint]
+    # in fog of war, the pieces that moved out of sight
+    # and the pieces that moved into sight
+    disappeared: list[StrPoint] = []
+    appeared: dict[StrPoint, PieceInfo] = {}
 
     legal_moves: dict[StrPoint, list[StrPoint]] = {}
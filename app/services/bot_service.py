@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+from app.services.game_executor import GameExecutor, game_executor_inst
+from app.schemas.config_schema import CONFIG
+from app.types import CastleRights, Point
+from app.game import engine
+from app import enums
+
+
+@dataclass
+class BotMetrics:
+    searches: int = 0
+    nodes: int = 0
+    seconds: float = 0.0
+    # the deepest depth finished by the last search
+    last_depth: int = 0
+    # the size of the transposition table and the peak memory
+    # of the worker that ran the last search
+    tt_entries: int = 0
+    max_rss_kb: int = 0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class BotService:
+    """
+    Searches the moves of the bot with the game executor,
+    so the search never blocks the event loop
+    """
+
+    def __init__(
+        self,
+        executor: GameExecutor = game_executor_inst,
+        max_depth: int = CONFIG.bot_max_depth,
+    ) -> None:
+        self.executor = executor
+        self.max_depth = max_depth
+        self.metrics = BotMetrics()
+
+    async def choose_move(
+        self,
+        fen: str,
+        turn: enums.Color,
+        castle_rights: dict[enums.Color, CastleRights],
+        time_remaining: float,
+        increment: float,
+        en_passant: Point | None = None,
+    ) -> engine.SearchResult:
+        """
+        Search the best move of a position within the bot's time budget
+
+        :param fen: the position to search
+        :param turn: the color the bot plays
+        :param castle_rights: the castling rights of both colors
+        :param time_remaining: the seconds left on the bot's clock
+        :param increment: the increment of the game in seconds
+        :param en_passant: the square a pawn can be captured en passant on
+        """
+
+        result = await self.executor.run(
+            engine.find_best_move,
+            fen,
+            turn,
+            castle_rights,
+            engine.allocate_time(time_remaining, increment),
+            self.max_depth,
+            en_passant,
+        )
+
+        self.metrics.searches += 1
+        self.metrics.nodes += result.nodes
+        self.metrics.seconds += result.seconds
+        self.metrics.last_depth = result.depth
+        self.metrics.tt_entries = result.tt_entries
+        self.metrics.max_rss_kb = result.max_rss_kb
+        return result
+
+
+bot_service_inst = BotService()
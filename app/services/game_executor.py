@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Literal, TypeVar, Any
+import multiprocessing
+import asyncio
+import time
+import os
+
+from app.schemas.config_schema import CONFIG
+from app.game import tasks
+
+T = TypeVar("T")
+
+ExecutorMode = Literal["thread", "process"]
+
+
+@dataclass
+class TaskTimings:
+    count: int = 0
+    # seconds spent waiting for a free worker
+    wait_seconds: float = 0.0
+    # seconds spent running in the worker
+    run_seconds: float = 0.0
+
+    @property
+    def average_run_seconds(self) -> float:
+        return self.run_seconds / self.count if self.count else 0.0
+
+
+@dataclass
+class ExecutorMetrics:
+    # tasks that were submitted and did not finish yet
+    pending: int = 0
+    max_pending: int = 0
+    failures: int = 0
+    tasks: dict[str, TaskTimings] = field(default_factory=dict)
+
+
+def _run_timed(
+    func: Callable[..., T],
+    args: tuple,
+    submitted_at: float,
+) -> tuple[T, float, float]:
+    """
+    Run a task and measure how long it waited and ran.
+    The wall clock is used since the task may run in another process.
+    """
+
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+class GameExecutor:
+    """
+    Runs CPU heavy game computations off the event loop.
+
+    In process mode the tasks run in a pool of warm worker processes,
+    so they don't compete with the event loop for the GIL.
+    In thread mode they run in the default thread pool.
+    Tasks and their arguments must be picklable in process mode,
+    see `app.game.tasks`.
+    """
+
+    def __init__(
+        self,
+        mode: ExecutorMode = CONFIG.game_executor_mode,
+        workers: int = CONFIG.game_executor_workers,
+    ) -> None:
+        self.mode = mode
+        self.workers = workers
+        self.metrics = ExecutorMetrics()
+
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def queued(self) -> int:
+        """How many tasks are waiting for a free worker"""
+
+        if self.mode == "thread":
+            return 0
+        return max(self.metrics.pending - self.workers, 0)
+
+    def start(self) -> None:
+        """
+        Start the worker processes, so they are warm before the first task.
+        They are started from a clean server process instead of being forked
+        from this one, which has an event loop, threads and open connections.
+        """
+
+        if self.mode != "process" or self._executor is not None:
+            return
+
+        start_method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=tasks.warm_up,
+        )
+        # workers are only started when tasks are submitted
+        for _ in range(self.workers):
+            self._executor.submit(os.getpid)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a task and wait for its result without blocking the event loop
+
+        :param func: the task to run, a module level function in process mode
+        :param args: the arguments of the task
+        """
+
+        self.start()
+        metrics = self.metrics
+        metrics.pending += 1
+        metrics.max_pending = max(metrics.max_pending, metrics.pending)
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, _run_timed, func, args, time.time()
+        )
+        try:
+            result, wait_seconds, run_seconds = await future
+        except Exception:
+            metrics.failures += 1
+            raise
+        finally:
+            metrics.pending -= 1
+
+        timings = metrics.tasks.setdefault(func.__qualname__, TaskTimings())
+        timings.count += 1
+        timings.wait_seconds += wait_seconds
+        timings.run_seconds += run_seconds
+        return result
+
+
+game_executor_inst = GameExecutor()
@@ -0,0 +1,120 @@
+from abc import abstractmethod, ABC
+
+import redis.asyncio as aioredis
+
+from app.utils.lru_cache import CacheStats, LRUCache
+from app.schemas.config_schema import CONFIG
+from app.schemas import game_schema
+from app.game.board import Board
+from app.game import bitboard
+from app.types import Point
+from app.db import redis_client
+from app import enums
+
+LegalMovesDict = dict[Point, list[Point]]
+
+# the zobrist hash already includes the castling rights and the turn
+LegalMovesKey = tuple[int, enums.Color]
+
+
+class ABCLegalMovesCache(ABC):
+    """
+    Cache the legal moves of a whole side by position hash,
+    so the same position is only generated once
+    """
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, key: LegalMovesKey) -> LegalMovesDict | None:
+        pass
+
+    @abstractmethod
+    async def set(
+        self, key: LegalMovesKey, legal_moves: LegalMovesDict
+    ) -> None:
+        pass
+
+    async def get_legal_moves(
+        self,
+        board: Board,
+        color: enums.Color,
+    ) -> LegalMovesDict:
+        """
+        Get every legal move of a color, generating them only if not cached.
+        The result is shared between callers and must not be mutated.
+
+        :param board: the board to generate the moves on
+        :param color: the color to generate the moves for
+        """
+
+        key = (board.zobrist_hash, color)
+        legal_moves = await self.get(key)
+        if legal_moves is not None:
+            self.stats.hits += 1
+            return legal_moves
+
+        self.stats.misses += 1
+        legal_moves = bitboard.calc_legal_moves(board, color)
+        await self.set(key, legal_moves)
+        return legal_moves
+
+
+class MemoryLegalMovesCache(ABCLegalMovesCache):
+    """A bounded per-worker cache that evicts the least recently used position"""
+
+    def __init__(self, maxsize: int = CONFIG.legal_moves_cache_size) -> None:
+        super().__init__()
+        self._cache: LRUCache[LegalMovesKey, LegalMovesDict] = LRUCache(maxsize)
+
+    @property
+    def evictions(self) -> int:
+        return self._cache.stats.evictions
+
+    async def get(self, key: LegalMovesKey) -> LegalMovesDict | None:
+        return self._cache.get(key)
+
+    async def set(
+        self, key: LegalMovesKey, legal_moves: LegalMovesDict
+    ) -> None:
+        self._cache.put(key, legal_moves)
+
+
+class RedisLegalMovesCache(ABCLegalMovesCache):
+    """A cache shared by every worker, entries expire after a ttl"""
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        ttl: int = CONFIG.legal_moves_cache_ttl,
+        prefix: str = "legal_moves",
+    ) -> None:
+        super().__init__()
+        self._redis = redis_client
+        self._ttl = ttl
+        self._prefix = prefix
+
+    def _redis_key(self, key: LegalMovesKey) -> str:
+        position_hash, color = key
+        return f"{self._prefix}:{position_hash:016x}:{color.value}"
+
+    async def get(self, key: LegalMovesKey) -> LegalMovesDict | None:
+        data = await self._redis.get(self._redis_key(key))
+        if data is None:
+            return None
+
+        return game_schema.LegalMoves.model_validate_json(data).legal_moves
+
+    async def set(
+        self, key: LegalMovesKey, legal_moves: LegalMovesDict
+    ) -> None:
+        data = game_schema.LegalMoves(legal_moves=legal_moves).model_dump_json()
+        await self._redis.set(self._redis_key(key), data, ex=self._ttl)
+
+
+legal_moves_cache_inst: ABCLegalMovesCache = (
+    RedisLegalMovesCache(redis_client)
+    if CONFIG.legal_moves_cache_redis
+    else MemoryLegalMovesCache()
+)
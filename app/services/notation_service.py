@@ -0,0 +1,32 @@
+from app.services.legal_moves_cache import (
+    ABCLegalMovesCache,
+    legal_moves_cache_inst,
+)
+from app.types import MoveInfo, Point
+from app.game.board import Board
+from app.game import notation
+
+
+async def move_notation(
+    board: Board,
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+    legal_moves_cache: ABCLegalMovesCache = legal_moves_cache_inst,
+) -> str:
+    """
+    Notate a move before it is made.
+    The legal moves of the side are read from the cache,
+    where they already are after being sent to the player,
+    so disambiguation doesn't generate any moves.
+
+    :param board: the position before the move
+    :param from_pos: the position of the piece to move
+    :param to_pos: the position to move the piece to
+    :param move_info: the move metadata
+    :param legal_moves_cache: the cache of the legal moves of each position
+    """
+
+    color = board.get_piece(from_pos).color
+    side_moves = await legal_moves_cache.get_legal_moves(board, color)
+    return notation.notate(board, from_pos, to_pos, move_info, side_moves)
@@ -1,5 +1,6 @@
+from app.services.game_executor import game_executor_inst
 from app.db import redis_client
 
 from .ws_server import WSServer
 
-ws_server_inst = WSServer(redis_client)
+ws_server_inst = WSServer(redis_client, game_executor=game_executor_inst)
@@ -1,20 +1,24 @@
 from typing import Generator
 from abc import abstractmethod, ABC
 
-from fastapi import WebSocket
+from app.services.ws_service.client_sender import ClientSender
 
 
 class ABCWebsocketClientManager(ABC):
     @abstractmethod
-    def get_clients(self, id: str | int) -> Generator[WebSocket, None, None]:
+    def get_clients(self, id: str | int) -> Generator[ClientSender, None, None]:
         pass
 
     @abstractmethod
-    def add_client(self, user_id: int, client: WebSocket) -> None:
+    def add_client(self, user_id: int, client: ClientSender) -> None:
         pass
 
     @abstractmethod
-    def remove_client(self, user_id: int) -> None:
+    def is_hosting(self, id: str | int) -> bool:
+        """Check if a user is connected or a room has members on this worker"""
+
+    @abstractmethod
+    def remove_client(self, user_id: int, client: ClientSender) -> None:
         pass
 
     @abstractmethod
@@ -33,11 +37,14 @@ class ABCWebsocketClientManager(ABC):
 class WebsocketClientManager(ABCWebsocketClientManager):
     def __init__(self) -> None:
         self._rooms: dict[str, set[int]] = {}
-        self._clients: dict[int, WebSocket] = {}
+        # a user can be connected from several tabs and devices at once
+        self._clients: dict[int, set[ClientSender]] = {}
 
-    def get_clients(self, ids: str | int) -> Generator[WebSocket, None, None]:
+    def get_clients(
+        self, ids: str | int
+    ) -> Generator[ClientSender, None, None]:
         """
-        Get the clients connected to a room, or the client of a user
+        Get the clients connected to a room, or the clients of a user
 
         :param ids: a room name or a user id
 
@@ -45,20 +52,32 @@ class WebsocketClientManager(ABCWebsocketClientManager):
         """
 
         if isinstance(ids, int) or ids.isnumeric():
-            id = int(ids)
-            if id in self._clients:
-                yield self._clients[id]
+            yield from self._clients.get(int(ids), ())
             return
 
         client_ids = self._rooms.get(ids, set())
         for client_id in client_ids:
-            yield self._clients[client_id]
+            yield from self._clients.get(client_id, ())
+
+    def add_client(self, user_id: int, client: ClientSender) -> None:
+        if user_id not in self._clients:
+            self._clients[user_id] = {client}
+        else:
+            self._clients[user_id].add(client)
+
+    def is_hosting(self, id: str | int) -> bool:
+        if isinstance(id, int) or id.isnumeric():
+            return int(id) in self._clients
+        return id in self._rooms
 
-    def add_client(self, user_id: int, client: WebSocket) -> None:
-        self._clients[user_id] = client
+    def remove_client(self, user_id: int, client: ClientSender) -> None:
+        clients = self._clients.get(user_id)
+        if clients is None:
+            return
 
-    def remove_client(self, user_id: int) -> None:
-        self._clients.pop(user_id, None)
+        clients.discard(client)
+        if not clients:
+            self._clients.pop(user_id)
 
     def enter_room(self, room_name: str, user_id: int) -> None:
         if room_name not in self._rooms:
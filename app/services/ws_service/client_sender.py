@@ -0,0 +1,113 @@
+from collections import deque
+from typing import Literal
+import asyncio
+
+from fastapi import status, WebSocket
+
+from app.schemas.config_schema import CONFIG
+
+OverflowPolicy = Literal["drop_oldest", "coalesce", "disconnect"]
+
+
+class ClientSender:
+    """
+    Sends the messages of a websocket client from its own writer task,
+    so a slow client only delays its own messages and queueing one
+    never waits on the socket.
+
+    When the queue is full the overflow policy decides what to give up:
+    - drop_oldest: the oldest queued message
+    - coalesce: the queued message of the same event, since the newer
+      one replaces it, or the oldest message if there is none
+    - disconnect: the client, which has to reconnect and catch up
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = CONFIG.ws_send_queue_size,
+        overflow: OverflowPolicy = CONFIG.ws_send_overflow,
+    ) -> None:
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.overflow = overflow
+
+        self.dropped = 0
+        self.closed = False
+
+        self._queue: deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._write())
+
+    async def close(self) -> None:
+        """Stop the writer task, unsent messages are discarded"""
+
+        self.closed = True
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def send(self, message: str) -> None:
+        """
+        Queue a message to be sent
+
+        :param message: the text to send, `event:data` as emitted
+        """
+
+        if self.closed:
+            return
+
+        if len(self._queue) >= self.max_queue and not self._make_room(message):
+            return
+
+        self._queue.append(message)
+        self._ready.set()
+
+    def _make_room(self, message: str) -> bool:
+        """
+        Apply the overflow policy to a full queue
+
+        :return: whether the message can still be queued
+        """
+
+        if self.overflow == "disconnect":
+            # the writer task closes the socket, so nothing more is sent
+            self.closed = True
+            self.dropped += len(self._queue) + 1
+            self._queue.clear()
+            self._ready.set()
+            return False
+
+        self.dropped += 1
+        if self.overflow == "coalesce":
+            event = message.split(":", 1)[0] + ":"
+            for i in range(len(self._queue) - 1, -1, -1):
+                if self._queue[i].startswith(event):
+                    del self._queue[i]
+                    return True
+
+        self._queue.popleft()
+        return True
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    await self.websocket.send_text(self._queue.popleft())
+                self._ready.clear()
+
+                if self.closed:
+                    await self.websocket.close(
+                        code=status.WS_1013_TRY_AGAIN_LATER,
+                        reason="Too many unsent messages",
+                    )
+                    return
+        except Exception:
+            # the client is gone, its connection handler removes it
+            self.closed = True
+            self._queue.clear()
@@ -0,0 +1,223 @@
+import asyncio
+import time
+
+import redis.asyncio as aioredis
+
+from app.schemas.config_schema import CONFIG
+
+
+class PresenceRegistry:
+    """
+    Tracks which users are online and who is in which room across every
+    worker, so it can be checked without asking the other workers.
+
+    Every user and room is a redis hash. A user maps the workers hosting
+    them, and a room maps each member on each worker, to the time the
+    entry expires. A user stays in a room while any worker still has them.
+    The worker that hosts an entry renews it with a heartbeat, so the
+    entries of a worker that died expire on their own. Changes are
+    collected and written together in one pipeline.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        node_id: str,
+        ttl: int = CONFIG.presence_ttl,
+        flush_interval: float = CONFIG.presence_flush_interval,
+        prefix: str = "presence",
+    ) -> None:
+        """
+        :param redis_client: the redis client
+        :param node_id: the id of this worker
+        :param ttl: seconds an entry lives without a heartbeat
+        :param flush_interval: seconds to collect changes before writing them
+        :param prefix: the prefix of the redis keys
+        """
+
+        self._redis = redis_client
+        self.node_id = node_id
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._prefix = prefix
+
+        # what this worker hosts, to renew on every heartbeat
+        self._users: set[int] = set()
+        self._rooms: dict[str, set[int]] = {}
+
+        # the changes waiting to be written, the last change of a field wins
+        self._pending: dict[tuple[str, str], bool] = {}
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.failures = 0
+
+    def user_key(self, user_id: int) -> str:
+        return f"{self._prefix}:user:{user_id}"
+
+    def room_key(self, room_name: str) -> str:
+        return f"{self._prefix}:room:{room_name}"
+
+    def member_field(self, user_id: int) -> str:
+        return f"{user_id}:{self.node_id}"
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and remove the entries of this worker"""
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for user_id in list(self._users):
+            self.remove_user(user_id)
+        for room_name, members in list(self._rooms.items()):
+            for user_id in list(members):
+                self.leave_room(room_name, user_id)
+        await self.flush()
+
+    def add_user(self, user_id: int) -> None:
+        """Mark a user as connected to this worker"""
+
+        self._users.add(user_id)
+        self._queue(self.user_key(user_id), self.node_id, True)
+
+    def remove_user(self, user_id: int) -> None:
+        """Mark a user as no longer connected to this worker"""
+
+        self._users.discard(user_id)
+        self._queue(self.user_key(user_id), self.node_id, False)
+
+    def enter_room(self, room_name: str, user_id: int) -> None:
+        self._rooms.setdefault(room_name, set()).add(user_id)
+        self._queue(self.room_key(room_name), self.member_field(user_id), True)
+
+    def leave_room(self, room_name: str, user_id: int) -> None:
+        members = self._rooms.get(room_name)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                self._rooms.pop(room_name)
+        self._queue(self.room_key(room_name), self.member_field(user_id), False)
+
+    def close_room(self, room_name: str) -> None:
+        """
+        Remove the members this worker registered in a room.
+        Other workers keep renewing their own members, so they are left
+        for those workers to remove when they close the room.
+        """
+
+        key = self.room_key(room_name)
+        for user_id in self._rooms.pop(room_name, ()):
+            self._queue(key, self.member_field(user_id), False)
+
+    def _queue(self, key: str, field: str, present: bool) -> None:
+        self._pending[(key, field)] = present
+        self._changed.set()
+
+    def _queue_hosted(self) -> None:
+        """Queue a renewal of everything this worker hosts"""
+
+        for user_id in self._users:
+            self._pending[(self.user_key(user_id), self.node_id)] = True
+        for room_name, members in self._rooms.items():
+            key = self.room_key(room_name)
+            for user_id in members:
+                self._pending[(key, self.member_field(user_id))] = True
+
+    async def flush(self) -> None:
+        """Write the queued changes in one pipeline"""
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+
+        expires_at = time.time() + self.ttl
+        # a dict keeps the order the keys were written in
+        renewed: dict[str, None] = {}
+
+        pipe = self._redis.pipeline(transaction=False)
+        for (key, field), present in pending.items():
+            if present:
+                pipe.hset(key, field, expires_at)
+                renewed[key] = None
+            else:
+                pipe.hdel(key, field)
+        for key in renewed:
+            pipe.expire(key, self.ttl)
+
+        try:
+            await pipe.execute()
+        except aioredis.RedisError:
+            # retry with the next batch, newer changes win
+            self.failures += 1
+            self._pending = pending | self._pending
+            raise
+
+    async def _run(self) -> None:
+        heartbeat_interval = self.ttl / 3
+        next_heartbeat = 0.0
+
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait(),
+                    max(next_heartbeat - time.monotonic(), 0),
+                )
+            except TimeoutError:
+                pass
+
+            if time.monotonic() >= next_heartbeat:
+                self._queue_hosted()
+                next_heartbeat = time.monotonic() + heartbeat_interval
+
+            # let more changes gather into the same batch
+            await asyncio.sleep(self.flush_interval)
+            self._changed.clear()
+            try:
+                await self.flush()
+            except aioredis.RedisError:
+                pass
+
+    async def _live_fields(self, key: str) -> list[str]:
+        now = time.time()
+        entries: dict[bytes, bytes] = await self._redis.hgetall(key)
+        return [
+            field.decode()
+            for field, expires_at in entries.items()
+            if float(expires_at) > now
+        ]
+
+    async def user_nodes(self, user_id: int) -> list[str]:
+        """
+        Get the workers a user is connected to
+
+        :param user_id: the id of the user
+        """
+
+        return await self._live_fields(self.user_key(user_id))
+
+    async def is_online(self, user_id: int) -> bool:
+        """
+        Check if a user is connected to any worker
+
+        :param user_id: the id of the user
+        """
+
+        return bool(await self.user_nodes(user_id))
+
+    async def room_members(self, room_name: str) -> set[int]:
+        """
+        Get the ids of the users in a room on every worker
+
+        :param room_name: the name of the room
+        """
+
+        return {
+            int(field.split(":", 1)[0])
+            for field in await self._live_fields(self.room_key(room_name))
+        }
@@ -19,7 +19,12 @@ class WSRouter:
         return iter(self._event_handlers.items())
 
     def on_event(self, event: enums.WSEventIn):
-        """Register a function to a websocket event"""
+        """
+        Register a function to a websocket event.
+        The function gets the server and the event data. It should be async
+        and run CPU heavy game logic with `WSServer.compute`, so it runs on
+        the game executor instead of blocking the other clients.
+        """
 
         def decorator(func: EventHandlerFunc):
             self._event_handlers[event] = func
@@ -1,19 +1,50 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Callable, Literal, TypeVar, Any
 import inspect
 import asyncio
 import json
+import time
+import uuid
 
 from fastapi import status, WebSocketException, WebSocket
 import redis.asyncio as aioredis
 
+from app.services.ws_service.client_sender import ClientSender
+from app.services.ws_service.presence import PresenceRegistry
 from app.services.ws_service.client_manager import (
     ABCWebsocketClientManager,
     WebsocketClientManager,
 )
 from app.services.ws_service.ws_router import WSRouter
+from app.services.game_executor import GameExecutor
+from app.schemas.config_schema import CONFIG
 from app import enums
 
+PubsubRouting = Literal["global", "targeted"]
+
+T = TypeVar("T")
+
+
+@dataclass
+class PubsubMetrics:
+    messages: int = 0
+    # how many times the listener woke up, and the most messages it got at once
+    batches: int = 0
+    max_batch: int = 0
+    # seconds between publishing a message and queueing it for the clients
+    lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+
+    @property
+    def average_lag_seconds(self) -> float:
+        return self.lag_seconds / self.messages if self.messages else 0.0
+
+    @property
+    def average_batch(self) -> float:
+        return self.messages / self.batches if self.batches else 0.0
+
 
 class WSServer(WSRouter):
     def __init__(
@@ -21,12 +52,32 @@ class WSServer(WSRouter):
         redis_client: aioredis.Redis,
         pubsub_channel: str = "websocket_emits",
         client_manager: ABCWebsocketClientManager | None = None,
+        game_executor: GameExecutor | None = None,
+        routing: PubsubRouting = CONFIG.ws_pubsub_routing,
+        batch_size: int = CONFIG.ws_pubsub_batch_size,
+        presence: PresenceRegistry | None = None,
     ):
         self.clients = client_manager or WebsocketClientManager()
+        self.node_id = uuid.uuid4().hex
+        # the users and rooms of every worker, the client manager
+        # only knows about the ones of this worker
+        self.presence = presence or PresenceRegistry(redis_client, self.node_id)
+
+        # event handlers run heavy game computations with `compute`,
+        # so they don't stall the other websockets
+        self.game_executor = game_executor or GameExecutor("thread")
 
+        # in targeted routing every user and room has its own channel,
+        # and the worker only subscribes to the ones it hosts
+        self.routing = routing
         self._pubsub_channel = pubsub_channel
+        self._channels: set[str] = set()
+        self._pubsub: aioredis.client.PubSub | None = None
         self._redis = redis_client
 
+        self.batch_size = batch_size
+        self.pubsub_metrics = PubsubMetrics()
+
         super().__init__()
 
     async def connect_websocket(
@@ -43,13 +94,107 @@ class WSServer(WSRouter):
         """
 
         await websocket.accept()
-        self.clients.add_client(user_id, websocket)
+        client = await self.add_client(user_id, websocket)
 
         try:
             async for message in websocket.iter_text():
                 await self._handle_message(message)
         finally:
-            self.clients.remove_client(user_id)
+            await self.remove_client(user_id, client)
+
+    async def add_client(
+        self, user_id: int, websocket: WebSocket
+    ) -> ClientSender:
+        client = ClientSender(websocket)
+        client.start()
+        self.clients.add_client(user_id, client)
+        self.presence.add_user(user_id)
+        # only the first connection of the user subscribes
+        await self._subscribe(user_id)
+        return client
+
+    async def remove_client(self, user_id: int, client: ClientSender) -> None:
+        await client.close()
+        self.clients.remove_client(user_id, client)
+        if not self.clients.is_hosting(user_id):
+            self.presence.remove_user(user_id)
+        # and only the last one unsubscribes
+        await self._unsubscribe_unused(user_id)
+
+    async def enter_room(self, room_name: str, user_id: int) -> None:
+        self.clients.enter_room(room_name, user_id)
+        self.presence.enter_room(room_name, user_id)
+        await self._subscribe(room_name)
+
+    async def leave_room(self, room_name: str, user_id: int) -> None:
+        self.clients.leave_room(room_name, user_id)
+        self.presence.leave_room(room_name, user_id)
+        await self._unsubscribe_unused(room_name)
+
+    async def close_room(self, room_name: str) -> None:
+        self.clients.close_room(room_name)
+        self.presence.close_room(room_name)
+        await self._unsubscribe_unused(room_name)
+
+    async def compute(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a CPU heavy game computation on the game executor.
+        In process mode it runs in a worker process, so it doesn't hold
+        the GIL while the event loop delivers the messages of other clients.
+        Event handlers should use this for move validation and generation.
+
+        :param func: the task to run, a module level function
+            like the ones in `app.game.tasks`
+        :param args: the arguments of the task, picklable in process mode
+        """
+
+        return await self.game_executor.run(func, *args)
+
+    def channel(self, to: str | int) -> str:
+        """
+        Get the pubsub channel of a user or a room
+
+        :param to: an id of a user or a name of a room
+        """
+
+        if self.routing == "global":
+            return self._pubsub_channel
+
+        kind = "user" if isinstance(to, int) or to.isnumeric() else "room"
+        return f"{self._pubsub_channel}:{kind}:{to}"
+
+    @property
+    def node_channel(self) -> str:
+        """
+        The channel of this worker. In targeted routing it keeps the pubsub
+        connection subscribed while the worker has no clients
+        """
+
+        return f"{self._pubsub_channel}:node:{self.node_id}"
+
+    async def _subscribe(self, to: str | int) -> None:
+        channel = self.channel(to)
+        if channel in self._channels:
+            return
+
+        self._channels.add(channel)
+        if self._pubsub is not None:
+            await self._pubsub.subscribe(channel)
+
+    async def _unsubscribe_unused(self, to: str | int) -> None:
+        """Unsubscribe from a user or room once this worker doesn't host it"""
+
+        channel = self.channel(to)
+        if (
+            self.routing == "global"
+            or channel not in self._channels
+            or self.clients.is_hosting(to)
+        ):
+            return
+
+        self._channels.discard(channel)
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(channel)
 
     async def emit(
         self,
@@ -65,18 +210,24 @@ class WSServer(WSRouter):
         :param to: an id of a user or a name of a room
         """
 
+        # the publish time is sent along to measure the delivery lag
         data_str = json.dumps(data)
         await self._redis.publish(
-            self._pubsub_channel,
-            f"{to}:{event.value}:{data_str}",
+            self.channel(to),
+            f"{time.time()}:{to}:{event.value}:{data_str}",
         )
 
     def include_router(self, router: WSRouter):
         self._event_handlers.update(router)
 
     async def connect_pubsub(self) -> None:
+        if self.routing == "global":
+            self._channels.add(self._pubsub_channel)
+        else:
+            self._channels.add(self.node_channel)
+
         self._pubsub = self._redis.pubsub()
-        await self._pubsub.subscribe(self._pubsub_channel)
+        await self._pubsub.subscribe(*self._channels)
 
         self._pubsub_task = asyncio.create_task(self._handle_pubsub())
 
@@ -85,6 +236,7 @@ class WSServer(WSRouter):
         await self._pubsub_task
 
         await self._pubsub.aclose()
+        self._pubsub = None
 
     async def _handle_message(self, message: str) -> None:
         """
@@ -116,7 +268,9 @@ class WSServer(WSRouter):
         if not isinstance(data, dict):
             raise invalid_protocol_err
 
-        # await async functions, run other functions normally
+        # await async functions, run other functions in a thread.
+        # the handlers get the server, which can't be sent to a worker
+        # process, so their heavy work goes through `compute` instead
         if inspect.iscoroutinefunction(event_handler):
             await event_handler(self, data)
         else:
@@ -130,18 +284,54 @@ class WSServer(WSRouter):
 
         while True:
             try:
-                message = await self._pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=1
-                )
+                messages = await self._read_batch()
             except asyncio.CancelledError:
                 return
 
-            if not message or message["type"] != "message":
-                await asyncio.sleep(0)
-                continue
+            await self._deliver(messages)
+
+    async def _read_batch(self) -> list[bytes]:
+        """
+        Block until a message arrives, then take every message
+        that was already received, up to the batch size
+        """
+
+        assert self._pubsub is not None
+        pubsub = self._pubsub
+
+        batch: list[bytes] = []
+        while not batch or (
+            len(batch) < self.batch_size
+            and await pubsub.connection.can_read_destructive()
+        ):
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=None
+            )
+            if message and message["type"] == "message":
+                batch.append(message["data"])
 
-            data: bytes = message["data"]
-            clients_id, message = data.decode("utf-8").split(":", 1)
+        return batch
 
+    async def _deliver(self, batch: list[bytes]) -> None:
+        """
+        Send a batch of pubsub messages to the connected clients
+
+        :param batch: the raw messages, as published by `emit`
+        """
+
+        metrics = self.pubsub_metrics
+        metrics.batches += 1
+        metrics.max_batch = max(metrics.max_batch, len(batch))
+
+        for data in batch:
+            published_at, clients_id, message = data.decode("utf-8").split(
+                ":", 2
+            )
+            # only queued here, every client is written by its own task
             for client in self.clients.get_clients(clients_id):
-                await client.send_text(message)
+                client.send(message)
+
+            lag = max(time.time() - float(published_at), 0.0)
+            metrics.messages += 1
+            metrics.lag_seconds += lag
+            metrics.max_lag_seconds = max(metrics.max_lag_seconds, lag)
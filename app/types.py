@@ -1,8 +1,15 @@
 from typing import NamedTuple, Annotated
+import binascii
+import base64
 import json
 
 from pydantic_core import core_schema, PydanticCustomError
-from pydantic import GetPydanticSchema, PlainSerializer, Field
+from pydantic import (
+    GetPydanticSchema,
+    PlainSerializer,
+    BeforeValidator,
+    Field,
+)
 
 from app import enums
 
@@ -58,6 +65,54 @@ StrPoint = Annotated[
 ]
 
 
+def _decode_base64(value: bytes | str) -> bytes:
+    if not isinstance(value, str):
+        return value
+
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error:
+        raise PydanticCustomError("base64", "Invalid base64 data")
+
+
+# raw bytes in python, sent as a base64 string in json.
+# unlike pydantic's `Base64Bytes`, bytes read from the database aren't decoded
+Base64Data = Annotated[
+    bytes,
+    PlainSerializer(
+        lambda data: base64.b64encode(data).decode(),
+        return_type=str,
+        when_used="json",
+    ),
+    BeforeValidator(_decode_base64),
+]
+
+
 class PieceInfo(NamedTuple):
     piece_type: enums.PieceType
     color: enums.Color
+
+
+class CastleRights(NamedTuple):
+    short: bool = True
+    long: bool = True
+
+
+class MoveInfo(NamedTuple):
+    """
+    The metadata of a single move, without any validation.
+    Converted to `game_schema.MoveMetadata` at the api boundary.
+    """
+
+    notation_type: enums.NotationType = enums.NotationType.REGULAR
+
+    is_capture: bool = False
+    side_effect_captures: tuple[Point, ...] = ()
+    # pairs of the origin and destination of every other piece that moves
+    side_effect_moves: tuple[tuple[Point, Point], ...] = ()
+    # the piece a pawn turns into when it reaches the last rank
+    promote_to: enums.PieceType | None = None
+
+
+# a move as the move generators and the move codec pass it around
+Move = tuple[Point, Point, MoveInfo]
@@ -0,0 +1,58 @@
+from typing import TypeVar, Generic
+from dataclasses import dataclass
+
+import cachetools
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(cachetools.LRUCache, Generic[K, V]):
+    """A `cachetools.LRUCache` that counts its hits, misses and evictions"""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize)
+        self.stats = CacheStats()
+
+    def get(self, key: K) -> V | None:  # type: ignore[override]
+        """
+        Get a value and mark it as recently used
+
+        :param key: the key to look up
+
+        :return: the value, or None if it isn't cached
+        """
+
+        try:
+            value = self[key]
+        except KeyError:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self[key] = value
+
+    def popitem(self) -> tuple[K, V]:
+        # only called by cachetools to make room, and by `clear`
+        item = super().popitem()
+        self.stats.evictions += 1
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self.stats = CacheStats()
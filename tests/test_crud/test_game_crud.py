@@ -16,6 +16,8 @@ from tests.factories.user import (
     PlayerFactory,
 )
 from tests.factories.game import GameResultFactory, LiveGameFactory
+from app.types import MoveInfo, Point
+from app.game import move_codec
 from app.crud import game_crud
 from app import enums
 
@@ -187,3 +189,93 @@ class TestFetchLiveGame:
         LiveGameFactory.create()
         fetched_game = game_crud.fetch_live_game(db, "test token")
         assert not fetched_game
+
+
+def test_append_move(db: Session):
+    """Test moves are appended to the encoded move list of the game"""
+
+    game = LiveGameFactory.create()
+    moves = [
+        (Point(4, 8), Point(4, 6), MoveInfo()),
+        (Point(4, 1), Point(4, 3), MoveInfo()),
+    ]
+
+    for move in moves:
+        game_crud.append_move(game, *move)
+    db.flush()
+    db.refresh(game)
+
+    assert list(move_codec.MoveList(game.moves)) == moves
+
+
+def test_make_move_tracks_repetitions(db: Session):
+    """Test the position history is saved with the game after every move"""
+
+    game = LiveGameFactory.create(fen="h9/10/10/10/10/10/10/10/10/9H")
+    board = game_crud.load_board(game)
+    shuffle = [
+        (Point(9, 9), Point(8, 7)),
+        (Point(0, 0), Point(1, 2)),
+        (Point(8, 7), Point(9, 9)),
+        (Point(1, 2), Point(0, 0)),
+    ]
+
+    draw_reasons = [
+        game_crud.make_move(game, board, from_pos, to_pos, MoveInfo())
+        for from_pos, to_pos in shuffle * 2
+    ]
+    db.flush()
+    db.refresh(game)
+
+    assert draw_reasons[-1] == enums.DrawReason.THREEFOLD_REPETITION
+    assert not any(draw_reasons[:-1])
+    assert len(move_codec.MoveList(game.moves)) == 8
+    assert game.fen == "h9/10/10/10/10/10/10/10/10/9H"
+
+
+def test_load_board(db: Session):
+    """Test the board of a game is loaded for the side to move"""
+
+    game = LiveGameFactory.create()
+    game.turn_player_id = game.player_black.player_id
+    board = game_crud.load_board(game)
+
+    assert board.to_fen() == game.fen
+    assert board.turn == enums.Color.BLACK
+    assert game_crud.load_board(game) is not board
+
+
+def test_en_passant_is_saved(db: Session):
+    """Test a double push can be captured en passant after reloading"""
+
+    game = LiveGameFactory.create()
+    board = game_crud.load_board(game)
+    game_crud.make_move(game, board, Point(2, 8), Point(2, 6), MoveInfo())
+    db.flush()
+    db.refresh(game)
+
+    assert game_crud.load_board(game).en_passant == Point(2, 7)
+
+    game_crud.make_move(game, board, Point(2, 1), Point(2, 2), MoveInfo())
+    db.flush()
+    db.refresh(game)
+
+    assert game.en_passant is None
+    assert game_crud.load_board(game).en_passant is None
+
+
+def test_make_move_saves_the_position(db: Session):
+    """Test the game reloads into the same position that was played"""
+
+    game = LiveGameFactory.create(fen="r4k3r/10/10/10/10/10/10/10/10/R4K3R")
+    game.player_black.castle_rights_long = False
+    board = game_crud.load_board(game)
+
+    game_crud.make_move(game, board, Point(9, 9), Point(9, 8), MoveInfo())
+    db.flush()
+    db.refresh(game)
+
+    assert game.turn_player_id == game.player_black.player_id
+    assert not game.player_white.castle_rights_short
+    assert game.player_white.castle_rights_long
+    assert game_crud.load_board(game).zobrist_hash == board.zobrist_hash
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from tests.utils.boards import random_fen
+from app.game.attack_map import AttackMap
+from app.game.board import Board
+from app.game import movegen
+from app.types import Point
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_matches_rebuilt(seed: int):
+    """Test the incremental map matches a fresh map after random moves"""
+
+    rng = random.Random(seed)
+    board = Board.from_fen(random_fen(rng, 0.2))
+    attack_map = AttackMap(board)
+
+    for _ in range(15):
+        moves = movegen.pieces_moves(board)
+        if not moves:
+            board.turn = board.turn.invert()
+            continue
+
+        board.make_move(*rng.choice(moves))
+        if rng.random() < 0.2:
+            board.unmake_move()
+
+        fresh = AttackMap(board)
+        for color in enums.Color:
+            assert attack_map.attacked(color) == fresh.attacked(color)
+            assert attack_map.targets(color) == fresh.targets(color)
+        fresh.detach()
+
+
+def test_en_passant_targets():
+    """Test the en passant square is a target only right after the push"""
+
+    board = Board.from_fen("10/3p1p4/10/4P5/10/10/10/10/10/10")
+    board.turn = enums.Color.BLACK
+    attack_map = AttackMap(board)
+    en_passant = attack_map._tables.square(Point(3, 2))
+
+    board.make_move(Point(3, 1), Point(3, 3))
+    assert attack_map.targets(enums.Color.WHITE) >> en_passant & 1
+
+    board.make_move(Point(4, 3), Point(4, 2))
+    board.make_move(Point(5, 1), Point(5, 2))
+    assert not attack_map.targets(enums.Color.WHITE) >> en_passant & 1
+
+    board.unmake_move()
+    board.unmake_move()
+    assert attack_map.targets(enums.Color.WHITE) >> en_passant & 1
+
+
+def test_attacked_squares():
+    board = Board.from_fen("10/10/10/10/4R5/10/4p5/10/10/10")
+    attack_map = AttackMap(board)
+
+    assert attack_map.is_attacked(Point(4, 6), enums.Color.WHITE)
+    assert attack_map.is_attacked(Point(0, 4), enums.Color.WHITE)
+    assert not attack_map.is_attacked(Point(4, 7), enums.Color.WHITE)
+    assert not attack_map.is_attacked(Point(4, 4), enums.Color.BLACK)
+
+
+def test_knook_slides_do_not_attack():
+    """Test the non capturing rook moves of the knook are not attacks"""
+
+    board = Board.from_fen("10/10/10/10/4N5/10/10/10/10/10")
+    attack_map = AttackMap(board)
+
+    slide_square = attack_map._tables.square(Point(4, 7))
+    assert not attack_map.is_attacked(Point(4, 7), enums.Color.WHITE)
+    assert attack_map.targets(enums.Color.WHITE) >> slide_square & 1
+    assert attack_map.is_attacked(Point(5, 6), enums.Color.WHITE)
+
+
+def test_in_check():
+    board = Board.from_fen("10/10/10/10/4k5/10/10/10/10/4R5")
+    attack_map = AttackMap(board)
+    assert attack_map.in_check(enums.Color.BLACK)
+
+    board.make_move(Point(4, 9), Point(0, 9))
+    assert not attack_map.in_check(enums.Color.BLACK)
+
+    board.unmake_move()
+    assert attack_map.in_check(enums.Color.BLACK)
+
+
+def test_any_attacked():
+    """Test checking the squares a king castles through"""
+
+    board = Board.from_fen("10/10/10/10/10/10/10/10/7r2/R4K3R")
+    attack_map = AttackMap(board)
+
+    short_path = [Point(6, 9), Point(7, 9), Point(8, 9)]
+    long_path = [Point(4, 9), Point(3, 9), Point(2, 9)]
+    assert attack_map.any_attacked(short_path, enums.Color.BLACK)
+    assert not attack_map.any_attacked(long_path, enums.Color.BLACK)
+
+
+def test_detach():
+    board = Board.from_fen("10/10/10/10/4R5/10/10/10/10/10")
+    attack_map = AttackMap(board)
+    attack_map.detach()
+
+    board.make_move(Point(4, 4), Point(0, 0))
+    assert attack_map.is_attacked(Point(4, 0), enums.Color.WHITE)
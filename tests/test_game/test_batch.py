@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.game.batch import PIECE_CODES, batch_legal_moves, encode_fens
+from app.types import CastleRights, Point
+from app.game.board import Board
+from app.game import bitboard
+from app import enums
+
+from tests.utils.boards import random_fen
+
+pytestmark = pytest.mark.unit
+
+
+def test_encode_fens():
+    boards = encode_fens(["Q9/10/10/10/10/10/10/10/10/9k"] * 2)
+
+    assert boards.shape == (2, 10, 10)
+    assert boards.dtype == np.int8
+    assert boards[1, 0, 0] == PIECE_CODES[enums.PieceType.QUEEN]
+    assert boards[1, 9, 9] == -PIECE_CODES[enums.PieceType.KING]
+    assert np.count_nonzero(boards) == 4
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        "10/10/10/10/10/10/10/10/10",
+        "11/10/10/10/10/10/10/10/10/10",
+        "z9/10/10/10/10/10/10/10/10/10",
+    ],
+)
+def test_encode_invalid_fen(fen: str):
+    with pytest.raises(ValueError):
+        encode_fens([fen])
+
+
+def test_matches_bitboard():
+    """Test the batch generates the same moves as the bitboard on each position"""
+
+    rng = random.Random(0)
+    fens = [random_fen(rng, rng.choice([0.05, 0.15, 0.3])) for _ in range(100)]
+    colors = [rng.choice(list(enums.Color)) for _ in fens]
+    castle_rights = [
+        CastleRights(rng.random() < 0.7, rng.random() < 0.7) for _ in fens
+    ]
+
+    expected = []
+    for fen, color, rights in zip(fens, colors, castle_rights):
+        board = Board.from_fen(fen)
+        board.castle_rights[color] = rights
+        expected.append(bitboard.calc_legal_moves(board, color))
+
+    assert (
+        batch_legal_moves(fens, colors, castle_rights=castle_rights) == expected
+    )
+
+
+def test_en_passant():
+    board = Board.from_fen("10/3p1p4/10/4P5/10/10/10/10/10/10")
+    board.turn = enums.Color.BLACK
+    board.make_move(Point(3, 1), Point(3, 3))
+    fen = board.to_fen()
+
+    moves = batch_legal_moves(
+        [fen, fen], enums.Color.WHITE, en_passant=[board.en_passant, None]
+    )
+
+    assert moves[0] == bitboard.calc_legal_moves(board, enums.Color.WHITE)
+    assert moves[0][Point(4, 3)] == [Point(3, 2), Point(4, 2)]
+    assert moves[1][Point(4, 3)] == [Point(4, 2)]
+
+
+def test_single_color():
+    fens = [
+        "R4K3R/10/10/10/10/10/10/10/10/10",
+        "rhnxqkbahr/10/10/10/10/10/10/10/10/RHNXQKBAHR",
+    ]
+
+    assert batch_legal_moves(fens, enums.Color.BLACK) == [
+        bitboard.calc_legal_moves(Board.from_fen(fen), enums.Color.BLACK)
+        for fen in fens
+    ]
@@ -0,0 +1,152 @@
+import random
+
+import pytest
+
+from app.game.bitboard import BitBoard, get_tables
+from app.schemas.config_schema import CONFIG
+from tests.utils.boards import random_fen
+from app.schemas import game_schema
+from app.game.board import Board
+from app.game import bitboard, movegen
+from app.types import Point
+from app.game import pieces
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+PAWN_TYPES = {enums.PieceType.PAWN, enums.PieceType.CHILD_PAWN}
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_pieces(seed: int):
+    """Test the bitboard generates the same moves as `PIECES` on random positions"""
+
+    rng = random.Random(seed)
+    fen = random_fen(rng, rng.choice([0.05, 0.15, 0.3]))
+
+    board = Board.from_fen(fen)
+    board.castle_rights_short = rng.random() < 0.7
+    board.castle_rights_long = rng.random() < 0.7
+    bit_board = BitBoard.from_board(board)
+
+    for point, piece in board.items():
+        expected = pieces.PIECES[piece.piece_type].calc_legal_moves(
+            board, point
+        )
+        assert bit_board.calc_legal_moves(point) == expected, f"{fen} {point}"
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("color", enums.Color)
+def test_side_legal_moves(seed: int, color: enums.Color):
+    """Test the whole side moves match `PIECES` with the ghosts folded in"""
+
+    rng = random.Random(seed)
+    board = Board.from_fen(random_fen(rng, 0.15))
+
+    expected: dict[Point, set[Point]] = {}
+    for point, piece in board.items():
+        if piece.color != color:
+            continue
+
+        moves = pieces.PIECES[piece.piece_type].calc_legal_moves(board, point)
+        if moves.moves:
+            expected[point] = set(moves.moves) | set(moves.ghosts)
+
+    legal_moves = bitboard.calc_legal_moves(board, color)
+    assert {
+        point: set(targets) for point, targets in legal_moves.items()
+    } == expected
+
+
+def test_side_legal_moves_serializes():
+    board = Board.from_fen("K9/1p8/10/10/10/10/10/10/10/10")
+    legal_moves = game_schema.LegalMoves(
+        legal_moves=bitboard.calc_legal_moves(board, enums.Color.WHITE)
+    )
+
+    assert legal_moves.model_dump(mode="json") == {
+        "legal_moves": {"0,0": ["1,0", "0,1", "1,1"]}
+    }
+
+
+def test_side_targets():
+    """Test only the pieces of the requested color are included"""
+
+    bit_board = BitBoard.from_fen("R9/10/10/10/10/10/10/10/10/9r")
+    tables = bit_board.tables
+
+    side_targets = bit_board.side_targets(enums.Color.WHITE)
+    assert list(side_targets) == [tables.square(Point(0, 0))]
+
+
+@pytest.mark.parametrize(
+    "bits, dx, dy, expected",
+    [
+        (Point(9, 0), 1, 0, None),
+        (Point(0, 0), -1, 0, None),
+        (Point(0, 9), 0, 1, None),
+        (Point(8, 4), 2, 1, None),
+        (Point(4, 4), 2, 1, Point(6, 5)),
+        (Point(1, 4), -2, -1, None),
+    ],
+)
+def test_shift_does_not_wrap(
+    bits: Point,
+    dx: int,
+    dy: int,
+    expected: Point | None,
+):
+    tables = get_tables(10, 10)
+    shifted = tables.shift(1 << tables.square(bits), dx, dy)
+    assert shifted == (1 << tables.square(expected) if expected else 0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_pieces_in_playouts(seed: int):
+    """
+    Test the bitboard matches `PIECES` along random games from the default
+    position, biased towards pawn moves so they reach promotions
+    """
+
+    rng = random.Random(seed)
+    board = Board.from_fen(CONFIG.default_fen)
+
+    for _ in range(80):
+        bit_board = BitBoard.from_board(board)
+        moves = movegen.pieces_moves(board)
+        for point, piece in board.items():
+            if piece.color == board.turn:
+                expected = pieces.PIECES[piece.piece_type].calc_legal_moves(
+                    board, point
+                )
+                assert bit_board.calc_legal_moves(point) == expected
+
+        pawn_moves = [
+            move for move in moves if board[move[0]].piece_type in PAWN_TYPES
+        ]
+        if pawn_moves and rng.random() < 0.7:
+            moves = pawn_moves
+        board.make_move(*rng.choice(moves))
+
+
+def test_en_passant():
+    board = Board.from_fen("10/3p1p4/10/4P5/10/10/10/10/10/10")
+    board.turn = enums.Color.BLACK
+    board.make_move(Point(3, 1), Point(3, 3))
+
+    bit_board = BitBoard.from_board(board)
+    for point in (Point(4, 3), Point(5, 1)):
+        expected = pieces.PIECES[board[point].piece_type].calc_legal_moves(
+            board, point
+        )
+        assert bit_board.calc_legal_moves(point) == expected
+
+    moves = bit_board.calc_legal_moves(Point(4, 3)).moves
+    assert moves[Point(3, 2)].notation_type == enums.NotationType.EN_PASSANT
+
+    # the chance is gone after any other move
+    board.make_move(Point(4, 3), Point(4, 2))
+    board.make_move(Point(5, 1), Point(5, 3))
+    bit_board = BitBoard.from_board(board)
+    assert Point(3, 1) not in bit_board.calc_legal_moves(Point(4, 2)).moves
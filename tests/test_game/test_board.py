@@ -1,7 +1,9 @@
+from pytest_mock import MockerFixture
 import pytest
 
+from app.types import CastleRights, PieceInfo, MoveInfo, Point
 from app.game.board import Board
-from app.types import PieceInfo, Point
+from app.game import pieces
 from app import enums
 
 pytestmark = pytest.mark.unit
@@ -86,3 +88,254 @@ def test_raises_error_when_initializing_out_of_bound(
 
 def test_initializes_empty_without_fen():
     assert Board()._board == {}
+
+
+class TestMakeMove:
+    def test_moves_and_captures(self):
+        board = Board.from_fen("10/10/10/10/4R5/10/4p5/10/10/10")
+        rook = board.get_piece(Point(4, 4))
+
+        board.make_move(Point(4, 4), Point(4, 6), MoveInfo(is_capture=True))
+
+        assert board._board == {Point(4, 6): rook}
+        assert board.turn == enums.Color.BLACK
+
+    def test_side_effects(self):
+        """Test side effect moves and captures are applied"""
+
+        board = Board.from_fen("10/10/10/10/3pP5/10/10/10/10/10")
+        pawn = board.get_piece(Point(4, 4))
+
+        board.make_move(
+            Point(4, 4),
+            Point(3, 3),
+            MoveInfo(side_effect_captures=(Point(3, 4),)),
+        )
+
+        assert board._board == {Point(3, 3): pawn}
+
+    def test_castling(self):
+        board = Board.from_fen("10/10/10/10/10/10/10/10/10/5K3R")
+        king = board.get_piece(Point(5, 9))
+        rook = board.get_piece(Point(9, 9))
+
+        board.make_move(
+            Point(5, 9),
+            Point(8, 9),
+            MoveInfo(
+                notation_type=enums.NotationType.CASTLE,
+                side_effect_moves=((Point(9, 9), Point(7, 9)),),
+            ),
+        )
+
+        assert board._board == {Point(8, 9): king, Point(7, 9): rook}
+        assert board.castle_rights[enums.Color.WHITE] == CastleRights(
+            False, False
+        )
+
+    def test_vertical_castling(self):
+        board = Board.from_fen("5R4/10/10/10/10/10/10/10/10/5K4")
+        king = board.get_piece(Point(5, 9))
+        rook = board.get_piece(Point(5, 0))
+
+        board.make_move(
+            Point(5, 9),
+            Point(5, 7),
+            MoveInfo(
+                notation_type=enums.NotationType.VERTICAL_CASTLE,
+                side_effect_moves=((Point(5, 0), Point(5, 8)),),
+            ),
+        )
+
+        assert board._board == {Point(5, 7): king, Point(5, 8): rook}
+        assert board.castle_rights[enums.Color.WHITE] == CastleRights(
+            False, False
+        )
+
+    def test_en_passant(self):
+        board = Board.from_fen("10/3p6/10/4P5/10/10/10/10/10/10")
+        board.turn = enums.Color.BLACK
+        pawn = board.get_piece(Point(4, 3))
+
+        board.make_move(Point(3, 1), Point(3, 3))
+        assert board.en_passant == Point(3, 2)
+
+        legal_moves = pieces.Pawn.calc_legal_moves(board, Point(4, 3))
+        metadata = legal_moves.moves[Point(3, 2)]
+        assert metadata.notation_type == enums.NotationType.EN_PASSANT
+        assert metadata.side_effect_captures == (Point(3, 3),)
+
+        board.make_move(Point(4, 3), Point(3, 2), metadata)
+        assert board._board == {Point(3, 2): pawn}
+        assert board.en_passant is None
+
+        board.unmake_move()
+        assert board.en_passant == Point(3, 2)
+        board.unmake_move()
+        assert board.en_passant is None
+
+    def test_promotion(self):
+        board = Board.from_fen("10/4P5/10/10/10/10/10/10/10/10")
+
+        board.make_move(
+            Point(4, 1),
+            Point(4, 0),
+            MoveInfo(promote_to=enums.PieceType.QUEEN),
+        )
+        assert board._board == {
+            Point(4, 0): PieceInfo(enums.PieceType.QUEEN, enums.Color.WHITE)
+        }
+
+        board.unmake_move()
+        assert board._board == {
+            Point(4, 1): PieceInfo(enums.PieceType.PAWN, enums.Color.WHITE)
+        }
+
+    @pytest.mark.parametrize(
+        "from_pos, to_pos, expected_rights",
+        [
+            (Point(0, 9), Point(0, 7), CastleRights(True, False)),
+            (Point(9, 9), Point(9, 5), CastleRights(False, True)),
+            (Point(0, 5), Point(0, 6), CastleRights(True, True)),
+        ],
+        ids=["long rook moved", "short rook moved", "other rook moved"],
+    )
+    def test_rook_castle_rights(
+        self,
+        from_pos: Point,
+        to_pos: Point,
+        expected_rights: CastleRights,
+    ):
+        board = Board.from_fen("10/10/10/10/10/R9/10/10/10/R4K3R")
+
+        board.make_move(from_pos, to_pos)
+        assert board.castle_rights[enums.Color.WHITE] == expected_rights
+
+    def test_unmake_move(self):
+        """Test undoing moves restores the exact position"""
+
+        fen = "r4k3r/10/10/10/10/10/10/10/4q5/R4K3R"
+        board = Board.from_fen(fen)
+        original = dict(board._board)
+
+        board.make_move(Point(0, 9), Point(0, 0), MoveInfo(is_capture=True))
+        board.make_move(Point(4, 8), Point(5, 9), MoveInfo(is_capture=True))
+        board.make_move(
+            Point(9, 9),
+            Point(9, 0),
+            MoveInfo(is_capture=True),
+        )
+
+        board.unmake_move()
+        board.unmake_move()
+        board.unmake_move()
+
+        assert board._board == original
+        assert board.turn == enums.Color.WHITE
+        assert all(
+            rights == CastleRights() for rights in board.castle_rights.values()
+        )
+
+    def test_unmake_without_moves(self):
+        with pytest.raises(IndexError):
+            Board().unmake_move()
+
+
+class TestToFen:
+    @pytest.mark.parametrize(
+        "fen",
+        [
+            "10/10/10/10/10/10/10/10/10/10",
+            "rh7r/10/c8c/10/4B5/10/10/10/RrRRRRRRRR/10",
+            "rhnxqkbahr/ddpdppdpdd/c8c/10/10/10/10/C8C/DDPDPPDPDD/RHNXQKBAHR",
+        ],
+    )
+    def test_round_trip(self, fen: str):
+        assert Board.from_fen(fen).to_fen() == fen
+
+    def test_only_rebuilds_changed_ranks(self, mocker: MockerFixture):
+        board = Board.from_fen("10/10/10/10/4R5/10/4p5/10/10/10")
+        rank_to_fen = mocker.spy(board, "_rank_to_fen")
+
+        board.make_move(Point(4, 4), Point(4, 6))
+
+        assert board.to_fen() == "10/10/10/10/10/10/4R5/10/10/10"
+        assert sorted(call.args[0] for call in rank_to_fen.call_args_list) == [
+            4,
+            6,
+        ]
+
+    def test_after_unmake_move(self):
+        fen = "10/10/10/10/4R5/10/4p5/10/10/10"
+        board = Board.from_fen(fen)
+
+        board.make_move(Point(4, 4), Point(4, 6))
+        board.unmake_move()
+
+        assert board.to_fen() == fen
+
+
+def test_snapshot_round_trip():
+    board = Board.from_fen("10/10/10/10/4R5/10/4p5/10/10/10")
+    board.make_move(Point(4, 4), Point(4, 6))
+
+    restored = Board.from_snapshot(board.snapshot())
+
+    assert restored._board == board._board
+    assert restored.to_fen() == board.to_fen()
+    assert restored.turn == board.turn
+    assert restored.castle_rights == board.castle_rights
+
+
+class TestZobristHash:
+    fen = "r4k3r/10/10/10/10/10/10/10/4q5/R4K3R"
+
+    def test_matches_parsed_position(self):
+        """Test the incremental hash equals the hash of the parsed position"""
+
+        board = Board.from_fen(self.fen)
+        board.make_move(Point(4, 8), Point(4, 2))
+
+        parsed = Board.from_fen(board.to_fen())
+        parsed.turn = enums.Color.BLACK
+        assert board.zobrist_hash == parsed.zobrist_hash
+
+    def test_restored_after_unmake_move(self):
+        board = Board.from_fen(self.fen)
+        original_hash = board.zobrist_hash
+
+        board.make_move(Point(0, 9), Point(0, 0), MoveInfo(is_capture=True))
+        assert board.zobrist_hash != original_hash
+
+        board.unmake_move()
+        assert board.zobrist_hash == original_hash
+
+    def test_transposition(self):
+        """Test the same position reached in different orders hashes the same"""
+
+        board1 = Board.from_fen(self.fen)
+        board1.make_move(Point(5, 9), Point(5, 8))
+        board1.make_move(Point(5, 0), Point(5, 1))
+
+        board2 = Board.from_fen(self.fen)
+        board2.make_move(Point(5, 9), Point(4, 9))
+        board2.make_move(Point(5, 0), Point(5, 1))
+        board2.make_move(Point(4, 9), Point(5, 8))
+        board2.turn = enums.Color.WHITE
+
+        assert board1.zobrist_hash == board2.zobrist_hash
+
+    def test_includes_turn_castle_rights_and_en_passant(self):
+        board = Board.from_fen(self.fen)
+        hashes = {board.zobrist_hash}
+
+        board.castle_rights_short = False
+        hashes.add(board.zobrist_hash)
+
+        board.turn = enums.Color.BLACK
+        hashes.add(board.zobrist_hash)
+
+        board.en_passant = Point(3, 2)
+        hashes.add(board.zobrist_hash)
+
+        assert len(hashes) == 4
@@ -0,0 +1,57 @@
+import pytest
+
+from app.game.board_cache import BoardCache, board_cache
+from app.game.bitboard import BitBoard
+from app.types import Point
+
+pytestmark = pytest.mark.unit
+
+FEN = "10/10/10/10/4R5/10/4p5/10/10/10"
+
+
+def test_caches_parsed_boards():
+    cache = BoardCache(10)
+
+    first = cache.get_board(FEN)
+    second = cache.get_board(FEN)
+
+    assert first is not second
+    assert first._board == second._board
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_cached_boards_are_independent():
+    """Test mutating a board doesn't change the cached snapshot"""
+
+    cache = BoardCache(10)
+    cache.get_board(FEN).make_move(Point(4, 4), Point(4, 6))
+
+    assert cache.get_board(FEN).to_fen() == FEN
+
+
+def test_evicts_least_recently_used():
+    cache = BoardCache(2)
+    other_fen = "10/10/10/10/10/10/10/10/10/10"
+    third_fen = "R9/10/10/10/10/10/10/10/10/10"
+
+    cache.get_board(FEN)
+    cache.get_board(other_fen)
+    cache.get_board(FEN)
+    cache.get_board(third_fen)
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+    cache.get_board(FEN)
+    assert cache.stats.hits == 2
+
+
+def test_bitboard_uses_board_cache():
+    board_cache.clear()
+
+    BitBoard.from_fen(FEN)
+    bit_board = BitBoard.from_fen(FEN)
+
+    assert bit_board.piece_at(bit_board.tables.square(Point(4, 4))) is not None
+    assert (board_cache.stats.hits, board_cache.stats.misses) == (1, 1)
@@ -0,0 +1,130 @@
+import pytest
+
+from app.game.engine import (
+    MATE_SCORE,
+    Searcher,
+    allocate_time,
+    evaluate,
+    find_best_move,
+)
+from app.types import CastleRights, Point
+from app.game.board import Board
+from app.game import movegen, perft
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+def test_evaluate_is_from_side_to_move():
+    board = Board.from_fen("k9/10/10/10/10/10/10/10/10/Q8K")
+    assert evaluate(board) == 900
+
+    board.turn = enums.Color.BLACK
+    assert evaluate(board) == -900
+
+
+def test_captures_the_king():
+    board = Board.from_fen("5k4/10/10/10/10/10/5Q4/10/10/K9")
+    result = Searcher(1000).search(board, time_limit=5, max_depth=3)
+
+    assert result.move is not None
+    assert result.move[:2] == (Point(5, 6), Point(5, 0))
+    assert result.score == MATE_SCORE
+
+
+def test_wins_material():
+    """Test the bot takes a hanging queen instead of a defended rook"""
+
+    board = Board.from_fen("k9/10/2r7/10/10/10/2R1q5/10/10/K9")
+    result = Searcher(1000).search(board, time_limit=5, max_depth=2)
+
+    assert result.move is not None
+    assert result.move[:2] == (Point(2, 6), Point(4, 6))
+
+
+def test_restores_the_board():
+    board = Board.from_fen(perft.PERFT_POSITIONS[1])
+    fen = board.to_fen()
+    zobrist_hash = board.zobrist_hash
+
+    # the search is interrupted mid depth
+    result = Searcher(1000).search(board, time_limit=0.05, max_depth=20)
+
+    assert result.move is not None
+    assert board.to_fen() == fen
+    assert board.zobrist_hash == zobrist_hash
+
+
+def test_mate_scores_from_table():
+    """Test a mate stored at one ply is scored by its distance at another"""
+
+    fen = "10/2N7/3K6/10/5h4/10/10/Rq8/10/K8r"
+    fresh = Searcher(100_000).search(Board.from_fen(fen), 30, 3)
+
+    # search every reply first, so the mates are stored from the child's root
+    searcher = Searcher(100_000)
+    board = Board.from_fen(fen)
+    for from_pos, to_pos, metadata in movegen.pieces_moves(board):
+        board.make_move(from_pos, to_pos, metadata)
+        searcher.search(board, 30, 2)
+        board.unmake_move()
+
+    assert fresh.score == -MATE_SCORE + 3
+    assert searcher.search(board, 30, 3).score == fresh.score
+
+
+def test_quiescence_captures_king_before_stand_pat():
+    board = Board.from_fen("5k4/10/10/10/10/10/5Q4/10/10/K9")
+    score = Searcher(1000)._quiescence(board, -MATE_SCORE - 1, 0, 3)
+
+    assert score == MATE_SCORE - 3
+
+
+def test_reuses_transposition_table():
+    searcher = Searcher(100_000)
+    board = Board.from_fen(perft.PERFT_POSITIONS[3])
+
+    first = searcher.search(board, time_limit=10, max_depth=2)
+    second = searcher.search(board, time_limit=10, max_depth=2)
+
+    assert second.nodes < first.nodes
+    assert second.move == first.move
+    assert second.tt_entries <= 100_000
+
+
+@pytest.mark.parametrize(
+    "time_remaining, increment, expected",
+    [(300, 0, 10), (300, 4, 13), (10, 30, 5)],
+)
+def test_allocate_time(
+    time_remaining: float, increment: float, expected: float
+):
+    assert allocate_time(time_remaining, increment) == pytest.approx(expected)
+
+
+def test_find_best_move():
+    result = find_best_move(
+        "5k4/10/10/10/10/10/5Q4/10/10/K9",
+        enums.Color.WHITE,
+        {color: CastleRights() for color in enums.Color},
+        time_limit=5,
+        max_depth=2,
+    )
+
+    assert result.move is not None
+    assert result.move[:2] == (Point(5, 6), Point(5, 0))
+    assert result.nodes_per_second > 0
+    assert result.max_rss_kb > 0
+
+
+def test_find_best_move_en_passant():
+    fen = "k9/10/10/4Pp4/10/10/10/10/10/K9"
+    castle_rights = {color: CastleRights() for color in enums.Color}
+
+    result = find_best_move(
+        fen, enums.Color.WHITE, castle_rights, 5, 2, en_passant=Point(5, 2)
+    )
+
+    assert result.move is not None
+    assert result.move[:2] == (Point(4, 3), Point(5, 2))
+    assert result.score == 100
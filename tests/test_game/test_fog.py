@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from tests.utils.boards import random_fen
+from app.schemas.game_schema import MoveMade
+from app.game.fog import FogOfWar
+from app.game.board import Board
+from app.game import movegen
+from app.types import Point
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+def test_redacted_fen():
+    board = Board.from_fen("k9/10/10/10/10/10/10/10/10/R8K")
+    fog = FogOfWar(board)
+
+    assert fog.redacted_fen(enums.Color.WHITE) == "/".join(
+        ["k?????????", *["1?????????"] * 7, "1???????2", "R8K"]
+    )
+    assert fog.redacted_fen(enums.Color.BLACK) == "/".join(
+        ["k1????????", "2????????", *["??????????"] * 8]
+    )
+
+
+def test_visible_pieces():
+    board = Board.from_fen("k9/10/10/10/10/10/10/10/10/R8K")
+    fog = FogOfWar(board)
+
+    assert fog.is_visible(Point(0, 0), enums.Color.WHITE)
+    assert not fog.is_visible(Point(9, 0), enums.Color.WHITE)
+    assert fog.visible_pieces(enums.Color.BLACK) == {
+        Point(0, 0): board.get_piece(Point(0, 0))
+    }
+    assert fog.visible_pieces(enums.Color.WHITE) == dict(board.items())
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_matches_rebuilt(seed: int):
+    """Test the incremental fens match a fresh fog after random moves"""
+
+    rng = random.Random(seed)
+    board = Board.from_fen(random_fen(rng, 0.2))
+    fog = FogOfWar(board)
+
+    for _ in range(15):
+        moves = movegen.pieces_moves(board)
+        if not moves:
+            board.turn = board.turn.invert()
+            continue
+
+        board.make_move(*rng.choice(moves))
+        if rng.random() < 0.2:
+            board.unmake_move()
+
+        fresh = FogOfWar(board)
+        for color in enums.Color:
+            assert fog.redacted_fen(color) == fresh.redacted_fen(color)
+        fresh.detach()
+
+
+def test_redact_move():
+    board = Board.from_fen("k9/10/10/10/10/10/10/10/10/R8K")
+    fog = FogOfWar(board)
+    move = MoveMade(
+        notation="Kj2", moved={Point(9, 9): Point(9, 8)}, captured=[]
+    )
+
+    visible_before = fog.visible(enums.Color.BLACK)
+    board.make_move(Point(9, 9), Point(9, 8))
+    redacted = fog.redact_move(move, enums.Color.BLACK, visible_before)
+
+    assert redacted.moved == {}
+    assert redacted.notation == ""
+
+    visible_before = fog.visible(enums.Color.WHITE)
+    board.make_move(Point(0, 9), Point(0, 0))
+    move = MoveMade(
+        notation="Rxa10", moved={Point(0, 9): Point(0, 0)}, captured=[]
+    )
+    assert fog.redact_move(move, enums.Color.WHITE, visible_before) == move
+
+
+def test_redact_move_into_fog():
+    """Test a piece moving out of sight is removed from its old square"""
+
+    board = Board.from_fen("r8k/10/10/10/10/10/10/10/10/R8K")
+    fog = FogOfWar(board)
+    move = MoveMade(
+        notation="Rb1", moved={Point(0, 9): Point(1, 9)}, captured=[]
+    )
+
+    visible_before = fog.visible(enums.Color.BLACK)
+    board.make_move(Point(0, 9), Point(1, 9))
+    redacted = fog.redact_move(move, enums.Color.BLACK, visible_before)
+
+    assert redacted.moved == {}
+    assert redacted.disappeared == [Point(0, 9)]
+    assert redacted.appeared == {}
+    assert redacted.notation == ""
+
+
+def test_redact_move_out_of_fog():
+    """Test a piece coming out of the fog appears on its new square"""
+
+    board = Board.from_fen("r8k/10/10/10/10/10/10/10/10/1R7K")
+    fog = FogOfWar(board)
+    move = MoveMade(
+        notation="Ra1", moved={Point(1, 9): Point(0, 9)}, captured=[]
+    )
+
+    visible_before = fog.visible(enums.Color.BLACK)
+    board.make_move(Point(1, 9), Point(0, 9))
+    redacted = fog.redact_move(move, enums.Color.BLACK, visible_before)
+
+    assert redacted.moved == {}
+    assert redacted.disappeared == []
+    assert redacted.appeared == {Point(0, 9): board.get_piece(Point(0, 9))}
+    assert redacted.appeared[Point(0, 9)].color == enums.Color.WHITE
+    assert redacted.notation == ""
@@ -0,0 +1,159 @@
+import random
+
+from pydantic import TypeAdapter
+import pytest
+
+from app.schemas.config_schema import CONFIG
+from app.types import Base64Data, Move, MoveInfo, Point
+from app.game.board import Board
+from app.game import move_codec, movegen
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+def test_round_trips_games():
+    """Test every move of random games decodes to the same move"""
+
+    rng = random.Random(0)
+    for _ in range(5):
+        board = Board.from_fen(CONFIG.default_fen)
+        for _ in range(60):
+            moves = movegen.pieces_moves(board)
+            move = rng.choice(moves)
+
+            data = move_codec.encode_move(*move)
+            assert len(data) == move_codec.MOVE_SIZE
+            assert move_codec.decode_move(data) == move
+            board.make_move(*move)
+
+
+@pytest.mark.parametrize(
+    "move",
+    [
+        (
+            Point(5, 9),
+            Point(8, 9),
+            MoveInfo(
+                enums.NotationType.CASTLE,
+                side_effect_moves=((Point(9, 9), Point(7, 9)),),
+            ),
+        ),
+        (
+            Point(5, 9),
+            Point(5, 7),
+            MoveInfo(
+                enums.NotationType.VERTICAL_CASTLE,
+                side_effect_moves=((Point(5, 0), Point(5, 8)),),
+            ),
+        ),
+        (
+            Point(4, 3),
+            Point(3, 2),
+            MoveInfo(
+                enums.NotationType.EN_PASSANT,
+                is_capture=True,
+                side_effect_captures=(Point(3, 3),),
+            ),
+        ),
+        (
+            Point(4, 1),
+            Point(5, 0),
+            MoveInfo(is_capture=True, promote_to=enums.PieceType.QUEEN),
+        ),
+    ],
+    ids=["castle", "vertical castle", "en passant", "promotion"],
+)
+def test_rebuilds_side_effects(move: Move):
+    assert move_codec.decode_move(move_codec.encode_move(*move)) == move
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"\x00\x00", b"\xff\xff\x00", b"\x00\x00\x0e"],
+    ids=["too short", "out of the board", "unknown notation"],
+)
+def test_decode_invalid(data: bytes):
+    with pytest.raises(ValueError):
+        move_codec.decode_move(data)
+
+
+def test_decode_il_vaticano():
+    """Test il vaticano isn't decoded until a generator produces it"""
+
+    data = move_codec.encode_move(
+        Point(2, 5), Point(5, 5), MoveInfo(enums.NotationType.IL_VATICANO)
+    )
+    with pytest.raises(ValueError):
+        move_codec.decode_move(data)
+
+
+def test_board_too_big():
+    with pytest.raises(ValueError):
+        move_codec.encode_move(Point(0, 0), Point(1, 1), MoveInfo(), 17, 17)
+
+
+def test_to_move_made():
+    move_made = move_codec.to_move_made(
+        Point(4, 3),
+        Point(3, 2),
+        MoveInfo(
+            enums.NotationType.EN_PASSANT,
+            is_capture=True,
+            side_effect_captures=(Point(3, 3),),
+        ),
+        "exd7",
+    )
+
+    assert move_made.notation == "exd7"
+    assert move_made.moved == {Point(4, 3): Point(3, 2)}
+    assert move_made.captured == [Point(3, 3)]
+
+    capture = move_codec.to_move_made(
+        Point(0, 0), Point(0, 5), MoveInfo(is_capture=True)
+    )
+    assert capture.captured == [Point(0, 5)]
+
+
+class TestMoveList:
+    moves: list[Move] = [
+        (Point(4, 8), Point(4, 6), MoveInfo()),
+        (Point(4, 1), Point(4, 3), MoveInfo()),
+        (Point(3, 9), Point(7, 5), MoveInfo(is_capture=True)),
+    ]
+
+    def test_append_and_replay(self):
+        move_list = move_codec.MoveList()
+        for move in self.moves:
+            move_list.append(*move)
+
+        assert len(move_list) == 3
+        assert len(bytes(move_list)) == 3 * move_codec.MOVE_SIZE
+        assert list(move_list) == self.moves
+        assert move_list[-1] == self.moves[-1]
+        assert list(move_list.since(1)) == self.moves[1:]
+
+    def test_from_bytes(self):
+        data = bytes(move_codec.MoveList.from_moves(self.moves))
+
+        assert list(move_codec.MoveList(data)) == self.moves
+
+    def test_append_returns_encoded_move(self):
+        move_list = move_codec.MoveList.from_moves(self.moves[:2])
+        stored = bytes(move_list)
+
+        stored += move_list.append(*self.moves[2])
+        assert stored == bytes(move_list)
+
+    def test_invalid_length(self):
+        with pytest.raises(ValueError):
+            move_codec.MoveList(b"\x00\x00")
+
+
+def test_base64_data():
+    adapter = TypeAdapter(Base64Data)
+    data = move_codec.MoveList.from_moves(TestMoveList.moves)
+
+    encoded = adapter.dump_json(bytes(data))
+    assert adapter.validate_json(encoded) == bytes(data)
+    assert adapter.validate_python(bytes(data)) == bytes(data)
@@ -0,0 +1,82 @@
+import pytest
+
+from app.game.move_tables import build_ray, get_castles, get_rays, Ray
+from app.types import CastleRights, Offset, Point
+from app.game import pieces
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    "position, offset, expected",
+    [
+        (
+            Point(7, 4),
+            Offset(1, 0),
+            Ray((Point(8, 4), Point(9, 4)), True),
+        ),
+        (Point(9, 4), Offset(1, 0), Ray((), True)),
+        (Point(4, 4), Offset(1, 2, slide=False), Ray((Point(5, 6),), True)),
+        (
+            Point(4, 4),
+            Offset(0, 2, can_capture=False),
+            Ray((Point(4, 6), Point(4, 8)), False),
+        ),
+    ],
+    ids=[
+        "slides until the edge",
+        "starts on the edge",
+        "jumps once",
+        "keeps capture flag",
+    ],
+)
+def test_build_ray(position: Point, offset: Offset, expected: Ray):
+    assert build_ray(position, offset, 10, 10) == expected
+
+
+def test_get_rays_skips_empty_rays():
+    """Test a corner square only has rays that go into the board"""
+
+    rays = get_rays(pieces.Rook, 10, 10)[Point(0, 0)]
+    assert {ray.squares[0] for ray in rays} == {Point(1, 0), Point(0, 1)}
+
+
+def test_get_rays_is_cached():
+    assert get_rays(pieces.Queen, 10, 10) is get_rays(pieces.Queen, 10, 10)
+
+
+def test_get_castles():
+    castles = get_castles(pieces.King, 10, 10)[Point(5, 9)]
+    by_rook = {castle.rook: castle for castle in castles}
+
+    assert set(by_rook) == {Point(0, 9), Point(9, 9), Point(5, 0)}
+
+    short = by_rook[Point(9, 9)]
+    assert short.king_dest == Point(8, 9)
+    assert short.rook_dest == Point(7, 9)
+    assert short.between == (Point(6, 9), Point(7, 9), Point(8, 9))
+    assert short.between_mask == sum(1 << 9 * 10 + x for x in (6, 7, 8))
+    assert short.ghosts == (Point(7, 9),)
+    assert short.is_allowed(CastleRights(True, False))
+    assert not short.is_allowed(CastleRights(False, True))
+
+    vertical = by_rook[Point(5, 0)]
+    assert vertical.king_dest == Point(5, 7)
+    assert vertical.rook_dest == Point(5, 8)
+    assert (
+        vertical.move_info.notation_type == enums.NotationType.VERTICAL_CASTLE
+    )
+    assert vertical.is_allowed(CastleRights(False, True))
+    assert not vertical.is_allowed(CastleRights(False, False))
+
+
+def test_get_castles_skips_short_files():
+    """Test there is no vertical castling when the rook is too close"""
+
+    castles = get_castles(pieces.King, 10, 10)[Point(5, 1)]
+    assert {castle.rook for castle in castles} == {
+        Point(0, 1),
+        Point(9, 1),
+        Point(5, 9),
+    }
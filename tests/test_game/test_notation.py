@@ -0,0 +1,141 @@
+import pytest
+
+from app.types import MoveInfo, Point
+from app.game.board import Board
+from app.game import bitboard, notation
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+def notate(
+    fen: str, from_pos: Point, to_pos: Point, move_info: MoveInfo
+) -> str:
+    board = Board.from_fen(fen)
+    color = board.get_piece(from_pos).color
+    side_moves = bitboard.calc_legal_moves(board, color)
+    return notation.notate(board, from_pos, to_pos, move_info, side_moves)
+
+
+@pytest.mark.parametrize(
+    "fen, from_pos, to_pos, move_info, expected",
+    [
+        (
+            "10/10/10/10/10/10/10/10/10/R9",
+            Point(0, 9),
+            Point(0, 5),
+            MoveInfo(),
+            "Ra5",
+        ),
+        (
+            "10/10/10/10/r9/10/10/10/10/R9",
+            Point(0, 9),
+            Point(0, 4),
+            MoveInfo(is_capture=True),
+            "Rxa6",
+        ),
+        (
+            "10/10/10/10/10/10/10/10/4P5/10",
+            Point(4, 8),
+            Point(4, 6),
+            MoveInfo(),
+            "e4",
+        ),
+        (
+            "10/10/10/10/10/10/10/5p4/4P5/10",
+            Point(4, 8),
+            Point(5, 7),
+            MoveInfo(is_capture=True),
+            "exf3",
+        ),
+        (
+            "10/4P5/10/10/10/10/10/10/10/10",
+            Point(4, 1),
+            Point(4, 0),
+            MoveInfo(promote_to=enums.PieceType.QUEEN),
+            "e10=Q",
+        ),
+        (
+            "10/10/10/10/10/10/10/10/10/R4K3R",
+            Point(5, 9),
+            Point(8, 9),
+            MoveInfo(enums.NotationType.CASTLE),
+            notation.CASTLE_SHORT,
+        ),
+        (
+            "10/10/10/10/10/10/10/10/10/R4K3R",
+            Point(5, 9),
+            Point(2, 9),
+            MoveInfo(enums.NotationType.CASTLE),
+            notation.CASTLE_LONG,
+        ),
+        (
+            "5R4/10/10/10/10/10/10/10/10/5K4",
+            Point(5, 9),
+            Point(5, 7),
+            MoveInfo(enums.NotationType.VERTICAL_CASTLE),
+            notation.VERTICAL_CASTLE,
+        ),
+        (
+            "10/10/10/10/2BppB4/10/10/10/10/10",
+            Point(2, 4),
+            Point(5, 4),
+            MoveInfo(enums.NotationType.IL_VATICANO, is_capture=True),
+            notation.IL_VATICANO,
+        ),
+    ],
+    ids=[
+        "quiet",
+        "capture",
+        "pawn push",
+        "pawn capture",
+        "promotion",
+        "short castle",
+        "long castle",
+        "vertical castle",
+        "il vaticano",
+    ],
+)
+def test_notation(
+    fen: str,
+    from_pos: Point,
+    to_pos: Point,
+    move_info: MoveInfo,
+    expected: str,
+):
+    assert notate(fen, from_pos, to_pos, move_info) == expected
+
+
+@pytest.mark.parametrize(
+    "fen, from_pos, to_pos, expected",
+    [
+        ("10/10/10/10/10/10/10/10/10/R8R", Point(0, 9), Point(4, 9), "Rae1"),
+        ("R9/10/10/10/10/10/10/10/10/R9", Point(0, 9), Point(0, 5), "R1a5"),
+        ("10/10/10/10/10/10/Q9/10/Q1Q7/10", Point(0, 8), Point(1, 7), "Qa2b3"),
+        # the other rook can't reach the square
+        ("10/10/10/10/10/10/10/10/10/R3P4R", Point(0, 9), Point(2, 9), "Rc1"),
+    ],
+    ids=["by file", "by rank", "by both", "not needed"],
+)
+def test_disambiguation(
+    fen: str, from_pos: Point, to_pos: Point, expected: str
+):
+    assert notate(fen, from_pos, to_pos, MoveInfo()) == expected
+
+
+def test_reuses_side_moves(mocker):
+    """Test notating every move of a position doesn't generate moves again"""
+
+    board = Board.from_fen("10/10/10/10/10/10/10/10/10/R8R")
+    side_moves = bitboard.calc_legal_moves(board, enums.Color.WHITE)
+    calc_legal_moves = mocker.spy(bitboard.BitBoard, "calc_legal_moves")
+
+    notator = notation.Notator(board, side_moves)
+    notations = {
+        notator.notate(origin, target, MoveInfo())
+        for origin, targets in side_moves.items()
+        for target in targets
+    }
+
+    assert len(notations) == sum(map(len, side_moves.values()))
+    calc_legal_moves.assert_not_called()
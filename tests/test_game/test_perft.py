@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from app.game.board import Board
+from app.game import perft
+
+pytestmark = pytest.mark.unit
+
+
+def test_depth_zero_and_one():
+    board = Board.from_fen("10/10/10/10/4R5/10/10/10/10/10")
+
+    assert perft.perft(board, 0) == 1
+    assert perft.perft(board, 1) == 18
+
+
+def test_restores_board():
+    fen = "r4k3r/10/10/4q5/10/10/5Q4/10/10/R4K3R"
+    board = Board.from_fen(fen)
+    original_hash = board.zobrist_hash
+
+    perft.perft(board, 2)
+
+    assert board.to_fen() == fen
+    assert board.zobrist_hash == original_hash
+
+
+@pytest.mark.parametrize("fen", perft.PERFT_POSITIONS)
+def test_generators_agree(fen: str):
+    """Cross check the move generators on every perft position"""
+
+    nodes = {
+        name: perft.perft(Board.from_fen(fen), 2, generator)
+        for name, generator in perft.GENERATORS.items()
+    }
+    assert len(set(nodes.values())) == 1, nodes
+
+
+def test_cli_outputs_json(capsys: pytest.CaptureFixture[str]):
+    fen = "10/10/10/10/4R5/10/10/10/10/10"
+    perft.main(["--depth", "1", "--fen", fen, "--generator", "bitboard"])
+
+    results = json.loads(capsys.readouterr().out)
+    assert len(results) == 1
+    assert results[0]["fen"] == fen
+    assert results[0]["nodes"] == 18
+    assert results[0]["generator"] == "bitboard"
+    assert "nodes_per_second" in results[0]
@@ -2,9 +2,9 @@ from dataclasses import dataclass, field
 
 import pytest
 
+from app.types import PieceInfo, MoveInfo, Point
 from app.schemas.game_schema import MoveMetadata
 from app.game.board import Board
-from app.types import PieceInfo, Point
 from app.game import pieces
 from app import enums
 
@@ -80,12 +80,18 @@ class PieceTest:
     fen: str
 
     expected_moves: set[Point] = field(default_factory=set)
-    expected_metadata: dict[Point, MoveMetadata] = field(default_factory=dict)
+    expected_metadata: dict[Point, MoveInfo] = field(default_factory=dict)
     expected_ghosts: dict[Point, Point] = field(default_factory=dict)
 
 
 piece_edge_cases_ids = [
     "king: castling",
+    "king: vertical castling",
+    "pawn: double push from the start rank",
+    "pawn: captures diagonally when blocked",
+    "child pawn: no double push",
+    "pawn: promotion",
+    "antiqueen: slides along the horsie jumps",
     "general edge case: in the center, blocked by friendly and enemy pieces",
     "general edge case: in the corner (plotting world domination)",
     "general edge case: blocked by friendly pieces, no legal moves",
@@ -102,21 +108,74 @@ piece_edge_cases: list[PieceTest] = [
             Point(8, 0), # short castle
         }, {
             # long castle metadata
-            Point(2, 0): MoveMetadata(
+            Point(2, 0): MoveInfo(
                 notation_type=enums.NotationType.CASTLE,
-                side_effect_moves={Point(0, 0): Point(3, 0)}
+                side_effect_moves=((Point(0, 0), Point(3, 0)),)
             ),
 
             # short castle metadata
-            Point(8, 0): MoveMetadata(
+            Point(8, 0): MoveInfo(
                 notation_type=enums.NotationType.CASTLE,
-                side_effect_moves={Point(9, 0): Point(7, 0)}
+                side_effect_moves=((Point(9, 0), Point(7, 0)),)
             ),
         }, {
             Point(3, 0): Point(2, 0),
             Point(1, 0): Point(2, 0),
             Point(7, 0): Point(8, 0)
     }),
+    PieceTest(enums.PieceType.KING, Point(4, 9),
+        "4R5/10/10/10/10/10/10/10/10/4K5", {
+            # regular moves
+            Point(3, 9), Point(5, 9),
+            Point(3, 8), Point(4, 8), Point(5, 8),
+
+            Point(4, 7), # vertical castle
+        }, {
+            Point(4, 7): MoveInfo(
+                notation_type=enums.NotationType.VERTICAL_CASTLE,
+                side_effect_moves=((Point(4, 0), Point(4, 8)),)
+            ),
+        }, {
+            Point(4, 1): Point(4, 7), Point(4, 2): Point(4, 7),
+            Point(4, 3): Point(4, 7), Point(4, 4): Point(4, 7),
+            Point(4, 5): Point(4, 7), Point(4, 6): Point(4, 7),
+    }),
+
+    PieceTest(enums.PieceType.PAWN, Point(4, 8),
+        "10/10/10/10/10/10/10/10/4P5/10", {
+            Point(4, 7), Point(4, 6),
+        },
+    ),
+    PieceTest(enums.PieceType.PAWN, Point(4, 5),
+        "10/10/10/10/3ppP4/4P5/10/10/10/10", {
+            Point(3, 4),
+        }, {
+            Point(3, 4): MoveInfo(is_capture=True),
+        },
+    ),
+    PieceTest(enums.PieceType.CHILD_PAWN, Point(4, 8),
+        "10/10/10/10/10/10/10/10/4D5/10", {
+            Point(4, 7),
+        },
+    ),
+    PieceTest(enums.PieceType.PAWN, Point(4, 1),
+        "5r4/4P5/10/10/10/10/10/10/10/10", {
+            Point(4, 0), Point(5, 0),
+        }, {
+            Point(4, 0): MoveInfo(promote_to=enums.PieceType.QUEEN),
+            Point(5, 0): MoveInfo(
+                is_capture=True, promote_to=enums.PieceType.QUEEN
+            ),
+        },
+    ),
+    PieceTest(enums.PieceType.ANTIQUEEN, Point(0, 9),
+        "10/10/10/10/10/2p7/10/4P5/10/A9", {
+            Point(1, 7), Point(2, 5), # captures the enemy pawn
+            Point(2, 8), # blocked by the friendly pawn on (4, 7)
+        }, {
+            Point(2, 5): MoveInfo(is_capture=True),
+        },
+    ),
 
     # general edge cases
     PieceTest(
@@ -127,7 +186,7 @@ piece_edge_cases: list[PieceTest] = [
             Point(4, 5), # up, blocked by friendly piece
             Point(4, 3), Point(4, 2), # down, captures enemy piece
         }, {
-            Point(4, 2): MoveMetadata(is_capture=True)
+            Point(4, 2): MoveInfo(is_capture=True)
         },
     ),
     PieceTest(
@@ -175,7 +234,7 @@ def test_piece_movement(
     assert set(legal_moves.moves) == expected_moves
     assert not legal_moves.ghosts
 
-    regular_metadata = MoveMetadata()
+    regular_metadata = MoveInfo()
     for metadata in legal_moves.moves.values():
         assert metadata == regular_metadata
 
@@ -196,7 +255,7 @@ def test_piece_edge_cases(piece_test_data: PieceTest):
     assert set(legal_moves.moves) == piece_test_data.expected_moves
     assert legal_moves.ghosts == piece_test_data.expected_ghosts
 
-    regular_metadata = MoveMetadata()
+    regular_metadata = MoveInfo()
     for point, metadata in legal_moves.moves.items():
         expected = piece_test_data.expected_metadata.get(
             point, regular_metadata
@@ -204,3 +263,21 @@ def test_piece_edge_cases(piece_test_data: PieceTest):
         assert (
             expected == metadata
         ), f"Invalid metadata for {point}: {metadata} instead of {expected}"
+
+
+def test_move_info_schema_round_trip():
+    """Test move info is converted to and from the api schema"""
+
+    move_info = MoveInfo(
+        notation_type=enums.NotationType.CASTLE,
+        side_effect_captures=(Point(1, 1),),
+        side_effect_moves=((Point(9, 0), Point(7, 0)),),
+    )
+    metadata = MoveMetadata.from_move_info(move_info)
+
+    assert metadata == MoveMetadata(
+        notation_type=enums.NotationType.CASTLE,
+        side_effect_captures=[Point(1, 1)],
+        side_effect_moves={Point(9, 0): Point(7, 0)},
+    )
+    assert metadata.to_move_info() == move_info
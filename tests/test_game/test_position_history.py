@@ -0,0 +1,92 @@
+import pytest
+
+from app.game.position_history import (
+    FIFTY_MOVE_PLIES,
+    PositionHistory,
+    is_irreversible,
+)
+from app.types import MoveInfo, Point
+from app.game.board import Board
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+# the knights shuffle back and forth without any irreversible move
+FEN = "h9/10/10/10/10/10/10/10/10/9H"
+SHUFFLE = [
+    (Point(9, 9), Point(8, 7)),
+    (Point(0, 0), Point(1, 2)),
+    (Point(8, 7), Point(9, 9)),
+    (Point(1, 2), Point(0, 0)),
+]
+
+
+def play(board: Board, history: PositionHistory, moves) -> None:
+    for from_pos, to_pos in moves:
+        irreversible = is_irreversible(board, from_pos, MoveInfo())
+        board.make_move(from_pos, to_pos)
+        history.push(board.zobrist_hash, irreversible)
+
+
+def test_threefold_repetition():
+    board = Board.from_fen(FEN)
+    history = PositionHistory()
+    history.push(board.zobrist_hash)
+
+    play(board, history, SHUFFLE)
+    assert history.repetitions() == 2
+    assert history.draw_reason() is None
+
+    play(board, history, SHUFFLE)
+    assert history.repetitions() == 3
+    assert history.draw_reason() == enums.DrawReason.THREEFOLD_REPETITION
+
+
+def test_irreversible_move_resets():
+    board = Board.from_fen("h9/10/10/10/10/10/10/10/4P5/9H")
+    history = PositionHistory()
+    history.push(board.zobrist_hash)
+    play(board, history, SHUFFLE)
+
+    play(board, history, [(Point(4, 8), Point(4, 7))])
+
+    assert list(history.hashes) == [board.zobrist_hash]
+    assert history.halfmove_clock == 0
+
+
+def test_fifty_moves():
+    history = PositionHistory()
+    for position_hash in range(FIFTY_MOVE_PLIES):
+        history.push(position_hash)
+    assert history.draw_reason() is None
+
+    history.push(FIFTY_MOVE_PLIES)
+    assert history.halfmove_clock == FIFTY_MOVE_PLIES
+    assert history.draw_reason() == enums.DrawReason.FIFTY_MOVES
+
+
+@pytest.mark.parametrize(
+    "from_pos, move_info, expected",
+    [
+        (Point(9, 9), MoveInfo(), False),
+        (Point(9, 9), MoveInfo(is_capture=True), True),
+        (Point(4, 8), MoveInfo(), True),
+    ],
+    ids=["quiet", "capture", "pawn move"],
+)
+def test_is_irreversible(from_pos: Point, move_info: MoveInfo, expected: bool):
+    board = Board.from_fen("10/10/10/10/10/10/10/10/4P5/9H")
+    assert is_irreversible(board, from_pos, move_info) == expected
+
+
+def test_bytes_round_trip():
+    history = PositionHistory()
+    for position_hash in (0, 1, 2**64 - 1):
+        history.push(position_hash)
+
+    data = history.to_bytes()
+    assert len(data) == 3 * 8
+    assert PositionHistory.from_bytes(data).hashes == history.hashes
+
+    with pytest.raises(ValueError):
+        PositionHistory.from_bytes(b"\x00" * 7)
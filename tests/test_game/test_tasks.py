@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from tests.utils.boards import random_fen
+from app.game.bitboard import get_tables
+from app.types import CastleRights
+from app.game.board import Board
+from app.game import bitboard, tasks
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+def expand(moves: tasks.CompactMoves) -> dict:
+    points = get_tables(10, 10).points
+    return {
+        points[origin]: [points[target] for target in targets]
+        for origin, targets in moves.items()
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_legal_moves(seed: int):
+    rng = random.Random(seed)
+    fen = random_fen(rng, 0.2)
+    castle_rights = CastleRights(rng.random() < 0.5, rng.random() < 0.5)
+
+    board = Board.from_fen(fen)
+    board.castle_rights[enums.Color.BLACK] = castle_rights
+
+    assert expand(
+        tasks.legal_moves(fen, enums.Color.BLACK, castle_rights)
+    ) == bitboard.calc_legal_moves(board, enums.Color.BLACK)
+
+
+def test_batch_legal_moves():
+    rng = random.Random(0)
+    fens = [random_fen(rng, 0.2) for _ in range(10)]
+    colors = [rng.choice(list(enums.Color)) for _ in fens]
+
+    assert tasks.batch_legal_moves(fens, colors) == [
+        tasks.legal_moves(fen, color) for fen, color in zip(fens, colors)
+    ]
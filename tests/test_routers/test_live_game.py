@@ -45,6 +45,10 @@ class TestLoadGame:
 
         assert "turn_player_id" in data
 
+        # white moves first in the default position
+        assert data["legal_moves"]
+        assert "1,8" in data["legal_moves"]
+
     async def test_game_doesnt_exist(self, async_client: AsyncClient):
         """Test that 404 is returned when the game is not found"""
 
@@ -0,0 +1,33 @@
+import pytest
+
+from app.services.game_executor import GameExecutor
+from app.services.bot_service import BotService
+from app.types import CastleRights, Point
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+class TestChooseMove:
+    async def test_searches_in_worker(self):
+        """Test the move is searched in a worker process and recorded"""
+
+        executor = GameExecutor("process", workers=1)
+        bot_service = BotService(executor, max_depth=2)
+        try:
+            result = await bot_service.choose_move(
+                "5k4/10/10/10/10/10/5Q4/10/10/K9",
+                enums.Color.WHITE,
+                {color: CastleRights() for color in enums.Color},
+                time_remaining=60,
+                increment=0,
+            )
+        finally:
+            executor.shutdown()
+
+        assert result.move is not None
+        assert result.move[:2] == (Point(5, 6), Point(5, 0))
+        assert bot_service.metrics.searches == 1
+        assert bot_service.metrics.nodes == result.nodes
+        assert bot_service.metrics.nodes_per_second > 0
+        assert bot_service.metrics.max_rss_kb > 0
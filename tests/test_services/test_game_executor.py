@@ -0,0 +1,63 @@
+import pytest
+
+from app.services.game_executor import GameExecutor
+from app.game import tasks
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+FEN = "10/10/10/10/4R5/10/4p5/10/10/10"
+
+
+def fail() -> None:
+    raise ValueError()
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+async def test_run(mode):
+    """Test tasks return the same result in every mode and are timed"""
+
+    executor = GameExecutor(mode, workers=1)
+    try:
+        result = await executor.run(tasks.legal_moves, FEN, enums.Color.WHITE)
+    finally:
+        executor.shutdown()
+
+    assert result == tasks.legal_moves(FEN, enums.Color.WHITE)
+    timings = executor.metrics.tasks["legal_moves"]
+    assert timings.count == 1
+    assert timings.run_seconds > 0
+    assert executor.metrics.pending == 0
+    assert executor.metrics.max_pending == 1
+
+
+async def test_run_failure():
+    executor = GameExecutor("thread")
+
+    with pytest.raises(ValueError):
+        await executor.run(fail)
+
+    assert executor.metrics.failures == 1
+    assert executor.metrics.pending == 0
+    assert "fail" not in executor.metrics.tasks
+
+
+def test_queued():
+    executor = GameExecutor("process", workers=2)
+    executor.metrics.pending = 5
+
+    assert executor.queued == 3
+
+
+def test_start_warms_workers():
+    """Test every worker is started ahead of the first task, not forked"""
+
+    executor = GameExecutor("process", workers=2)
+    executor.start()
+    try:
+        pool = executor._executor
+        assert pool is not None
+        assert len(pool._processes) == 2
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        executor.shutdown()
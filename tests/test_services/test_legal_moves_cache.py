@@ -0,0 +1,103 @@
+from pytest_mock.plugin import AsyncMockType
+from pytest_mock import MockerFixture
+import redis.asyncio as aioredis
+import pytest
+
+from app.services.legal_moves_cache import (
+    MemoryLegalMovesCache,
+    RedisLegalMovesCache,
+)
+from app.game.board import Board
+from app.game import bitboard
+from app.types import Point
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+FEN = "10/10/10/10/4R5/10/4p5/10/10/10"
+
+
+@pytest.fixture
+def mock_redis(mocker: MockerFixture):
+    mock_redis = mocker.AsyncMock(spec=aioredis.Redis)
+    mock_redis.get = mocker.AsyncMock(return_value=None)
+    mock_redis.set = mocker.AsyncMock()
+    return mock_redis
+
+
+class TestMemoryCache:
+    async def test_caches_by_position(self, mocker: MockerFixture):
+        """Test moves are only generated once per position and color"""
+
+        cache = MemoryLegalMovesCache(10)
+        calc_legal_moves = mocker.spy(bitboard, "calc_legal_moves")
+
+        first = await cache.get_legal_moves(
+            Board.from_fen(FEN), enums.Color.WHITE
+        )
+        second = await cache.get_legal_moves(
+            Board.from_fen(FEN), enums.Color.WHITE
+        )
+        await cache.get_legal_moves(Board.from_fen(FEN), enums.Color.BLACK)
+
+        assert first is second
+        assert calc_legal_moves.call_count == 2
+        assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+
+    async def test_different_castle_rights(self):
+        """Test positions with different castling rights are cached separately"""
+
+        cache = MemoryLegalMovesCache(10)
+        fen = "10/10/10/10/10/10/10/10/10/R4K3R"
+
+        board = Board.from_fen(fen)
+        with_rights = await cache.get_legal_moves(board, enums.Color.WHITE)
+
+        board.castle_rights_short = False
+        without_rights = await cache.get_legal_moves(board, enums.Color.WHITE)
+
+        assert Point(8, 9) in with_rights[Point(5, 9)]
+        assert Point(8, 9) not in without_rights[Point(5, 9)]
+
+    async def test_evicts(self):
+        cache = MemoryLegalMovesCache(1)
+
+        await cache.get_legal_moves(Board.from_fen(FEN), enums.Color.WHITE)
+        await cache.get_legal_moves(Board.from_fen(FEN), enums.Color.BLACK)
+
+        assert cache.evictions == 1
+
+
+class TestRedisCache:
+    async def test_get_miss(self, mock_redis: AsyncMockType):
+        cache = RedisLegalMovesCache(mock_redis, ttl=60)
+        board = Board.from_fen(FEN)
+
+        legal_moves = await cache.get_legal_moves(board, enums.Color.WHITE)
+
+        assert legal_moves == bitboard.calc_legal_moves(
+            board, enums.Color.WHITE
+        )
+        mock_redis.set.assert_called_once()
+        assert mock_redis.set.call_args.kwargs == {"ex": 60}
+        assert cache.stats.misses == 1
+
+    async def test_get_hit(self, mock_redis: AsyncMockType):
+        """Test cached moves are parsed back into points"""
+
+        mock_redis.get.return_value = b'{"legal_moves": {"4,4": ["4,5"]}}'
+        cache = RedisLegalMovesCache(mock_redis)
+
+        legal_moves = await cache.get_legal_moves(
+            Board.from_fen(FEN), enums.Color.WHITE
+        )
+
+        assert legal_moves == {Point(4, 4): [Point(4, 5)]}
+        mock_redis.set.assert_not_called()
+        assert cache.stats.hits == 1
+
+    async def test_key(self, mock_redis: AsyncMockType):
+        cache = RedisLegalMovesCache(mock_redis, prefix="test")
+        assert cache._redis_key((255, enums.Color.BLACK)) == (
+            "test:00000000000000ff:black"
+        )
@@ -0,0 +1,28 @@
+from pytest_mock import MockerFixture
+import pytest
+
+from app.services.legal_moves_cache import MemoryLegalMovesCache
+from app.services import notation_service
+from app.types import MoveInfo, Point
+from app.game.board import Board
+from app.game import bitboard
+from app import enums
+
+pytestmark = pytest.mark.unit
+
+
+async def test_uses_cached_moves(mocker: MockerFixture):
+    """Test notating a move reuses the legal moves sent to the player"""
+
+    board = Board.from_fen("10/10/10/10/10/10/10/10/10/R8R")
+    cache = MemoryLegalMovesCache(10)
+    await cache.get_legal_moves(board, enums.Color.WHITE)
+    calc_legal_moves = mocker.spy(bitboard, "calc_legal_moves")
+
+    notation = await notation_service.move_notation(
+        board, Point(0, 9), Point(4, 9), MoveInfo(), cache
+    )
+
+    assert notation == "Rae1"
+    calc_legal_moves.assert_not_called()
+    assert cache.stats.hits == 1
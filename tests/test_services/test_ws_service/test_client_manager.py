@@ -22,10 +22,11 @@ def test_get_clients_from_user(
 ):
     """Test getting client from a user id"""
 
-    client_manager._clients = {1: ws_client}
+    client_manager._clients = {1: {ws_client}}
 
     assert list(client_manager.get_clients(1)) == [ws_client]
     assert list(client_manager.get_clients(str(1))) == [ws_client]
+    assert not list(client_manager.get_clients(2))
 
 
 @pytest.mark.unit
@@ -35,9 +36,10 @@ def test_get_clients_from_room(
 ):
     """Test getting clients from a room"""
 
-    client_manager._clients = {1: ws_client}
-    client_manager._rooms = {"test_room": {1}}
+    client_manager._clients = {1: {ws_client}}
+    client_manager._rooms = {"test_room": {1, 2}}
 
+    # user 2 is in the room but not connected to this worker
     assert list(client_manager.get_clients("test_room")) == [ws_client]
 
 
@@ -82,14 +84,56 @@ def test_add_client(
     ws_client: MockType,
 ):
     client_manager.add_client(1, ws_client)
-    assert client_manager._clients[1] == ws_client
+    assert client_manager._clients[1] == {ws_client}
+
+
+@pytest.mark.unit
+def test_multiple_clients_per_user(
+    client_manager: WebsocketClientManager,
+    mocker: MockerFixture,
+):
+    """Test every connection of a user gets the messages"""
+
+    first, second = mocker.Mock(), mocker.Mock()
+    client_manager.add_client(1, first)
+    client_manager.add_client(1, second)
+    client_manager.enter_room("test_room", 1)
+
+    assert set(client_manager.get_clients(1)) == {first, second}
+    assert set(client_manager.get_clients("test_room")) == {first, second}
 
 
 @pytest.mark.unit
 def test_remove_client(
+    client_manager: WebsocketClientManager,
+    mocker: MockerFixture,
+):
+    """Test the user stays connected until the last connection is removed"""
+
+    first, second = mocker.Mock(), mocker.Mock()
+    client_manager._clients = {1: {first, second}}
+
+    client_manager.remove_client(1, first)
+    assert client_manager._clients[1] == {second}
+    assert client_manager.is_hosting(1)
+
+    client_manager.remove_client(1, first)
+    client_manager.remove_client(1, second)
+    assert 1 not in client_manager._clients
+
+    client_manager.remove_client(1, second)
+
+
+@pytest.mark.unit
+def test_is_hosting(
     client_manager: WebsocketClientManager,
     ws_client: MockType,
 ):
-    client_manager._clients = {1: ws_client}
-    client_manager.remove_client(1)
-    assert not client_manager._clients.get(1)
+    client_manager._clients = {1: {ws_client}}
+    client_manager._rooms = {"test_room": {1}}
+
+    assert client_manager.is_hosting(1)
+    assert client_manager.is_hosting("1")
+    assert client_manager.is_hosting("test_room")
+    assert not client_manager.is_hosting(2)
+    assert not client_manager.is_hosting("other_room")
@@ -0,0 +1,80 @@
+import asyncio
+
+from pytest_mock.plugin import AsyncMockType
+from pytest_mock import MockerFixture
+from fastapi import status, WebSocket
+import pytest
+
+from app.services.ws_service.client_sender import ClientSender
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def mock_websocket(mocker: MockerFixture):
+    return mocker.AsyncMock(spec=WebSocket)
+
+
+async def test_sends_in_order(mock_websocket: AsyncMockType):
+    sender = ClientSender(mock_websocket)
+    sender.start()
+
+    for message in ["a:1", "b:2", "a:3"]:
+        sender.send(message)
+    await asyncio.sleep(0)
+
+    sent = [call.args[0] for call in mock_websocket.send_text.call_args_list]
+    assert sent == ["a:1", "b:2", "a:3"]
+    await sender.close()
+
+
+@pytest.mark.parametrize(
+    "overflow, expected",
+    [
+        ("drop_oldest", ["a:2", "c:3", "a:4"]),
+        ("coalesce", ["b:1", "c:3", "a:4"]),
+    ],
+)
+async def test_overflow_drops(
+    mock_websocket: AsyncMockType,
+    overflow: str,
+    expected: list[str],
+):
+    """Test a full queue gives up a message when the writer falls behind"""
+
+    sender = ClientSender(mock_websocket, max_queue=3, overflow=overflow)
+    for message in ["b:1", "a:2", "c:3", "a:4"]:
+        sender.send(message)
+
+    assert list(sender._queue) == expected
+    assert sender.dropped == 1
+
+
+async def test_overflow_disconnects(mock_websocket: AsyncMockType):
+    sender = ClientSender(mock_websocket, max_queue=2, overflow="disconnect")
+    for message in ["a:1", "b:2", "c:3"]:
+        sender.send(message)
+    sender.start()
+    await asyncio.sleep(0)
+
+    assert sender.closed
+    mock_websocket.send_text.assert_not_called()
+    mock_websocket.close.assert_called_once_with(
+        code=status.WS_1013_TRY_AGAIN_LATER,
+        reason="Too many unsent messages",
+    )
+
+    sender.send("d:4")
+    assert not sender._queue
+
+
+async def test_send_error_stops_writer(mock_websocket: AsyncMockType):
+    mock_websocket.send_text.side_effect = RuntimeError("disconnected")
+    sender = ClientSender(mock_websocket)
+    sender.start()
+
+    sender.send("a:1")
+    await asyncio.sleep(0)
+
+    assert sender.closed
+    await sender.close()
@@ -0,0 +1,182 @@
+import asyncio
+
+from pytest_mock.plugin import AsyncMockType, MockType
+from pytest_mock import MockerFixture
+import redis.asyncio as aioredis
+import pytest
+
+from app.services.ws_service.presence import PresenceRegistry
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def mock_pipeline(mocker: MockerFixture):
+    mock_pipeline = mocker.Mock()
+    mock_pipeline.execute = mocker.AsyncMock()
+    return mock_pipeline
+
+
+@pytest.fixture
+def mock_redis(mocker: MockerFixture, mock_pipeline: MockType):
+    mock_redis = mocker.AsyncMock(spec=aioredis.Redis)
+    mock_redis.pipeline = mocker.Mock(return_value=mock_pipeline)
+    mock_redis.hgetall = mocker.AsyncMock()
+    return mock_redis
+
+
+@pytest.fixture
+def presence(mocker: MockerFixture, mock_redis: AsyncMockType):
+    mocker.patch("time.time", return_value=1000.0)
+    return PresenceRegistry(mock_redis, "node", ttl=30, flush_interval=0)
+
+
+def written(mock_pipeline: MockType) -> list[tuple]:
+    return [
+        (name, *args)
+        for name, args, _ in mock_pipeline.method_calls
+        if name != "execute"
+    ]
+
+
+async def test_flushes_changes_together(
+    presence: PresenceRegistry,
+    mock_redis: AsyncMockType,
+    mock_pipeline: MockType,
+):
+    presence.add_user(1)
+    presence.enter_room("room", 1)
+    presence.enter_room("room", 2)
+    await presence.flush()
+
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    mock_pipeline.execute.assert_called_once()
+    assert written(mock_pipeline) == [
+        ("hset", "presence:user:1", "node", 1030.0),
+        ("hset", "presence:room:room", "1:node", 1030.0),
+        ("hset", "presence:room:room", "2:node", 1030.0),
+        ("expire", "presence:user:1", 30),
+        ("expire", "presence:room:room", 30),
+    ]
+
+    await presence.flush()
+    mock_redis.pipeline.assert_called_once()
+
+
+async def test_last_change_wins(
+    presence: PresenceRegistry, mock_pipeline: MockType
+):
+    presence.add_user(1)
+    presence.remove_user(1)
+    presence.enter_room("room", 1)
+    presence.close_room("room")
+    presence.enter_room("room", 2)
+    await presence.flush()
+
+    assert written(mock_pipeline) == [
+        ("hdel", "presence:user:1", "node"),
+        ("hdel", "presence:room:room", "1:node"),
+        ("hset", "presence:room:room", "2:node", 1030.0),
+        ("expire", "presence:room:room", 30),
+    ]
+
+
+async def test_close_room_keeps_other_workers_members(
+    presence: PresenceRegistry, mock_pipeline: MockType
+):
+    """
+    Test closing a room only removes the members of this worker,
+    so the heartbeats of other workers don't bring the room back
+    """
+
+    presence.enter_room("room", 1)
+    presence.enter_room("room", 2)
+    await presence.flush()
+    mock_pipeline.reset_mock()
+
+    presence.close_room("room")
+    await presence.flush()
+
+    assert written(mock_pipeline) == [
+        ("hdel", "presence:room:room", "1:node"),
+        ("hdel", "presence:room:room", "2:node"),
+    ]
+    assert not presence._rooms
+
+
+async def test_leave_room_keeps_other_workers_connections(
+    presence: PresenceRegistry,
+    mock_redis: AsyncMockType,
+    mock_pipeline: MockType,
+):
+    """Test a user stays in a room while another worker still has them"""
+
+    presence.enter_room("room", 1)
+    presence.leave_room("room", 1)
+    await presence.flush()
+
+    assert written(mock_pipeline) == [("hdel", "presence:room:room", "1:node")]
+
+    mock_redis.hgetall.return_value = {b"1:other": b"1030.0"}
+    assert await presence.room_members("room") == {1}
+
+
+async def test_failed_flush_is_retried(
+    presence: PresenceRegistry, mock_pipeline: MockType
+):
+    mock_pipeline.execute.side_effect = aioredis.ConnectionError()
+    presence.add_user(1)
+
+    with pytest.raises(aioredis.ConnectionError):
+        await presence.flush()
+    assert presence.failures == 1
+
+    mock_pipeline.execute.side_effect = None
+    presence.remove_user(1)
+    mock_pipeline.reset_mock()
+    await presence.flush()
+
+    assert written(mock_pipeline) == [("hdel", "presence:user:1", "node")]
+
+
+async def test_heartbeat_renews_hosted_entries(
+    presence: PresenceRegistry, mock_pipeline: MockType
+):
+    presence.add_user(1)
+    presence.enter_room("room", 1)
+    await presence.flush()
+    mock_pipeline.reset_mock()
+
+    presence.start()
+    await asyncio.sleep(0.01)
+    await presence.stop()
+
+    calls = written(mock_pipeline)
+    assert calls[:2] == [
+        ("hset", "presence:user:1", "node", 1030.0),
+        ("hset", "presence:room:room", "1:node", 1030.0),
+    ]
+    # stopping unregisters the worker
+    assert calls[-2:] == [
+        ("hdel", "presence:user:1", "node"),
+        ("hdel", "presence:room:room", "1:node"),
+    ]
+
+
+async def test_lookups_ignore_expired_entries(
+    presence: PresenceRegistry, mock_redis: AsyncMockType
+):
+    mock_redis.hgetall.return_value = {b"node": b"1030.0", b"dead": b"990.0"}
+
+    assert await presence.user_nodes(1) == ["node"]
+    assert await presence.is_online(1)
+    mock_redis.hgetall.assert_called_with("presence:user:1")
+
+    mock_redis.hgetall.return_value = {
+        b"1:node": b"1030.0",
+        b"2:node": b"999.0",
+    }
+    assert await presence.room_members("room") == {1}
+
+    mock_redis.hgetall.return_value = {}
+    assert not await presence.is_online(2)
@@ -77,7 +77,7 @@ class TestEmit:
         room = "test room"
 
         async with async_ws_client as ws:
-            test_ws_server.clients.enter_room(room, authed_user.user_id)
+            await test_ws_server.enter_room(room, authed_user.user_id)
             await test_ws_server.emit(self.event, self.data, room)
 
             assert await ws.receive_text(3) == self.expected_message
@@ -95,8 +95,8 @@ async def test_on_receive(
 
     @test_ws_server.on_event(event)
     async def _(ws_server: WSServer, data: dict):
-        websocket = list(ws_server.clients.get_clients(authed_user.user_id))[0]
-        await websocket.send_json(data)
+        client = list(ws_server.clients.get_clients(authed_user.user_id))[0]
+        await client.websocket.send_json(data)
 
     async with async_ws_client as ws:
         await ws.send_text(f"{event.value}:{json.dumps(message)}")
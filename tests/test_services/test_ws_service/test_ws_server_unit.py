@@ -1,4 +1,6 @@
+import asyncio
 import json
+import time
 
 from pytest_mock.plugin import AsyncMockType
 from pytest_mock import MockerFixture
@@ -6,8 +8,9 @@ from fastapi import WebSocketException, WebSocket
 import redis.asyncio as aioredis
 import pytest
 
-from app.services.ws_service.ws_server import WSServer
+from app.services.ws_service.ws_server import PubsubRouting, WSServer
 from app.services.ws_service.ws_router import WSRouter
+from app.services.game_executor import GameExecutor
 from tests.utils import dep_overrider
 from app.main import app
 from app import enums, deps
@@ -52,30 +55,252 @@ async def test_connect_websocket(
 
     await test_ws_server.connect_websocket(mock_websocket, user_id)
 
-    add_client_mock.assert_called_once_with(user_id, mock_websocket)
-    remove_client_mock.assert_called_once_with(user_id)
+    add_client_mock.assert_called_once()
+    added_id, client = add_client_mock.call_args.args
+    assert added_id == user_id
+    assert client.websocket is mock_websocket
+    remove_client_mock.assert_called_once_with(user_id, client)
+    assert client.closed
 
 
+async def test_registers_presence(
+    test_ws_server: WSServer,
+    mock_websocket: AsyncMockType,
+):
+    """Test the user is only unregistered when the last connection closes"""
+
+    presence = test_ws_server.presence
+    first = await test_ws_server.add_client(1, mock_websocket)
+    second = await test_ws_server.add_client(1, mock_websocket)
+    await test_ws_server.enter_room("room", 1)
+    assert presence._users == {1}
+    assert presence._rooms == {"room": {1}}
+
+    await test_ws_server.remove_client(1, first)
+    assert presence._users == {1}
+
+    await test_ws_server.remove_client(1, second)
+    await test_ws_server.close_room("room")
+    assert not presence._users
+    assert not presence._rooms
+
+
+@pytest.mark.parametrize(
+    "routing, to, expected_channel",
+    [
+        ("global", 1, "websocket_emits"),
+        ("targeted", 1, "websocket_emits:user:1"),
+        ("targeted", "room", "websocket_emits:room:room"),
+    ],
+)
 async def test_emit(
     mocker: MockerFixture,
     test_ws_server: WSServer,
     mock_redis: AsyncMockType,
+    routing: PubsubRouting,
+    to: str | int,
+    expected_channel: str,
 ):
     """Test the message is publish correctly when emitting"""
 
     publish_mock = mocker.AsyncMock()
     mock_redis.publish = publish_mock
+    test_ws_server.routing = routing
+    mocker.patch("time.time", return_value=100.0)
 
     event = enums.WSEventOut.NOTIFICATION
     data = {"test": "ing"}
-    to = 1
     await test_ws_server.emit(event, data, to)
 
     publish_mock.assert_called_once_with(
-        test_ws_server._pubsub_channel, f"{to}:{event.value}:{json.dumps(data)}"
+        expected_channel, f"100.0:{to}:{event.value}:{json.dumps(data)}"
     )
 
 
+class TestHandlePubsub:
+    @pytest.fixture
+    def mock_pubsub(self, test_ws_server: WSServer, mocker: MockerFixture):
+        mock_pubsub = mocker.AsyncMock()
+        test_ws_server._pubsub = mock_pubsub
+        return mock_pubsub
+
+    def queue_messages(
+        self,
+        mock_pubsub: AsyncMockType,
+        messages: list[dict | None],
+        buffered: int,
+    ):
+        """
+        Make the pubsub return messages,
+        with `buffered` of them readable without waiting
+        """
+
+        mock_pubsub.get_message.side_effect = messages
+        mock_pubsub.connection.can_read_destructive.side_effect = [
+            *[True] * buffered,
+            False,
+        ]
+
+    async def test_reads_available_messages_together(
+        self, test_ws_server: WSServer, mock_pubsub: AsyncMockType
+    ):
+        messages = [
+            {"type": "message", "data": b"1"},
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": b"2"},
+        ]
+        self.queue_messages(mock_pubsub, messages, buffered=2)
+
+        assert await test_ws_server._read_batch() == [b"1", b"2"]
+        mock_pubsub.get_message.assert_called_with(
+            ignore_subscribe_messages=True, timeout=None
+        )
+
+    async def test_batch_size(
+        self, test_ws_server: WSServer, mock_pubsub: AsyncMockType
+    ):
+        test_ws_server.batch_size = 2
+        messages = [{"type": "message", "data": b"1"}] * 3
+        self.queue_messages(mock_pubsub, messages, buffered=2)
+
+        assert await test_ws_server._read_batch() == [b"1", b"1"]
+
+    async def test_deliver(
+        self,
+        mocker: MockerFixture,
+        test_ws_server: WSServer,
+        mock_websocket: AsyncMockType,
+    ):
+        mocker.patch("time.time", return_value=101.0)
+        client = await test_ws_server.add_client(1, mock_websocket)
+
+        await test_ws_server._deliver(
+            [b"100.5:1:event:data", b"99.0:2:event:other"]
+        )
+        await asyncio.sleep(0)
+
+        mock_websocket.send_text.assert_called_once_with("event:data")
+        await test_ws_server.remove_client(1, client)
+
+        metrics = test_ws_server.pubsub_metrics
+        assert metrics.batches == 1
+        assert metrics.messages == metrics.max_batch == 2
+        assert metrics.max_lag_seconds == 2.0
+        assert metrics.average_lag_seconds == 1.25
+
+    async def test_slow_client_does_not_block_delivery(
+        self,
+        mocker: MockerFixture,
+        test_ws_server: WSServer,
+    ):
+        stalled = asyncio.Event()
+
+        async def stall(_):
+            await stalled.wait()
+
+        slow_websocket = mocker.AsyncMock(spec=WebSocket)
+        slow_websocket.send_text.side_effect = stall
+        fast_websocket = mocker.AsyncMock(spec=WebSocket)
+
+        slow_client = await test_ws_server.add_client(1, slow_websocket)
+        fast_client = await test_ws_server.add_client(2, fast_websocket)
+        await test_ws_server.enter_room("room", 1)
+        await test_ws_server.enter_room("room", 2)
+
+        for i in range(3):
+            await asyncio.wait_for(
+                test_ws_server._deliver([f"0:room:event:{i}".encode()]), 1
+            )
+        await asyncio.sleep(0)
+
+        assert fast_websocket.send_text.call_count == 3
+        slow_websocket.send_text.assert_called_once_with("event:0")
+
+        await test_ws_server.remove_client(1, slow_client)
+        await test_ws_server.remove_client(2, fast_client)
+
+
+class TestTargetedRouting:
+    @pytest.fixture
+    def mock_pubsub(self, test_ws_server: WSServer, mocker: MockerFixture):
+        test_ws_server.routing = "targeted"
+        mock_pubsub = mocker.AsyncMock()
+        test_ws_server._pubsub = mock_pubsub
+        return mock_pubsub
+
+    async def test_subscribes_to_hosted_users(
+        self,
+        test_ws_server: WSServer,
+        mock_pubsub: AsyncMockType,
+        mock_websocket: AsyncMockType,
+    ):
+        first = await test_ws_server.add_client(1, mock_websocket)
+        second = await test_ws_server.add_client(1, mock_websocket)
+        mock_pubsub.subscribe.assert_called_once_with("websocket_emits:user:1")
+
+        await test_ws_server.remove_client(1, first)
+        mock_pubsub.unsubscribe.assert_not_called()
+
+        await test_ws_server.remove_client(1, second)
+        mock_pubsub.unsubscribe.assert_called_once_with(
+            "websocket_emits:user:1"
+        )
+
+    async def test_subscribes_to_rooms_once(
+        self,
+        test_ws_server: WSServer,
+        mock_pubsub: AsyncMockType,
+    ):
+        await test_ws_server.enter_room("room", 1)
+        await test_ws_server.enter_room("room", 2)
+        mock_pubsub.subscribe.assert_called_once_with(
+            "websocket_emits:room:room"
+        )
+
+        # the room still has a member on this worker
+        await test_ws_server.leave_room("room", 1)
+        mock_pubsub.unsubscribe.assert_not_called()
+
+        await test_ws_server.leave_room("room", 2)
+        mock_pubsub.unsubscribe.assert_called_once_with(
+            "websocket_emits:room:room"
+        )
+
+    async def test_close_room(
+        self,
+        test_ws_server: WSServer,
+        mock_pubsub: AsyncMockType,
+    ):
+        await test_ws_server.enter_room("room", 1)
+        await test_ws_server.close_room("room")
+
+        mock_pubsub.unsubscribe.assert_called_once_with(
+            "websocket_emits:room:room"
+        )
+
+    async def test_connect_subscribes_to_hosted_channels(
+        self,
+        mocker: MockerFixture,
+        test_ws_server: WSServer,
+        mock_redis: AsyncMockType,
+    ):
+        """Test channels added before connecting are subscribed to on connect"""
+
+        test_ws_server.routing = "targeted"
+        await test_ws_server.enter_room("room", 1)
+
+        mock_pubsub = mocker.AsyncMock()
+        mock_redis.pubsub = mocker.Mock(return_value=mock_pubsub)
+        mocker.patch.object(test_ws_server, "_handle_pubsub", mocker.Mock())
+        mocker.patch.object(asyncio, "create_task")
+        await test_ws_server.connect_pubsub()
+
+        assert set(mock_pubsub.subscribe.call_args.args) == {
+            "websocket_emits:room:room",
+            test_ws_server.node_channel,
+        }
+
+
 def test_include_router(test_ws_server: WSServer):
     """Test routers are correctly added into the event handlers"""
 
@@ -150,3 +375,45 @@ class TestHandleMessage:
 
         correct_event_handler.assert_called_once()
         wrong_event_handler.assert_not_called()
+
+    async def test_heavy_handler_does_not_block_fan_out(
+        self,
+        mock_redis: AsyncMockType,
+        mock_websocket: AsyncMockType,
+    ):
+        """
+        Test messages are delivered to other clients
+        while a handler computes in a worker process
+        """
+
+        executor = GameExecutor("process", workers=1)
+        executor.start()
+        server = WSServer(mock_redis, game_executor=executor)
+        computed = asyncio.Event()
+
+        @server.on_event(enums.WSEventIn.MOVE)
+        async def _(ws_server: WSServer, data: dict):
+            await ws_server.compute(time.sleep, data["seconds"])
+            computed.set()
+
+        client = await server.add_client(1, mock_websocket)
+        try:
+            message = json.dumps({"seconds": 0.5})
+            handler = asyncio.create_task(
+                server._handle_message(
+                    f"{enums.WSEventIn.MOVE.value}:{message}"
+                )
+            )
+            await asyncio.sleep(0.05)
+
+            await server._deliver([f"{time.time()}:1:event:data".encode()])
+            await asyncio.sleep(0)
+            mock_websocket.send_text.assert_called_once_with("event:data")
+            assert not computed.is_set()
+
+            await handler
+            assert computed.is_set()
+            assert executor.metrics.tasks["sleep"].count == 1
+        finally:
+            await server.remove_client(1, client)
+            executor.shutdown()
@@ -0,0 +1,37 @@
+import random
+
+from app.game import pieces
+
+PIECE_TYPES = [piece_type.value for piece_type in pieces.PIECES]
+
+
+def random_fen(rng: random.Random, density: float) -> str:
+    """Generate a 10x10 fen with random pieces from `PIECES`"""
+
+    ranks = []
+    for y in range(10):
+        squares = []
+        for x in range(10):
+            if y in (0, 9) and x in (0, 9) and rng.random() < 0.5:
+                piece = "r"
+            elif rng.random() < density:
+                piece = rng.choice(PIECE_TYPES)
+            else:
+                squares.append(None)
+                continue
+
+            squares.append(piece.upper() if rng.random() < 0.5 else piece)
+
+        rank = ""
+        empty = 0
+        for square in squares:
+            if square is None:
+                empty += 1
+                continue
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += square
+        ranks.append(rank + (str(empty) if empty else ""))
+
+    return "/".join(ranks)